@@ -0,0 +1,91 @@
+"""
+Compare the read throughput of a config file that is compressed with gzip, bz2 or xz to the same file uncompressed.
+Throughput is in MB/s of the uncompressed config, and peak is the peak memory traced by tracemalloc while reading it
+again.
+
+Usage: python benchmarks/compressed_read.py [number of keys]
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from localconfig.manager import LocalConfig  # noqa
+
+OPENERS = {
+    'none': open,
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+
+MODES = {
+    'default': {},
+    'native': {'native_parser': True},
+}
+
+
+def write_config(path, keys, opener):
+    """ Write a host inventory like config with 10 keys per section and return its uncompressed size """
+    size = 0
+
+    with opener(path, 'wt') as fp:
+        for host in range(keys // 10):
+            lines = ['# Host %s\n' % host, '[host-%s.example.com]\n' % host]
+            lines.extend('key-%s = value %s for host %s\n' % (key, key, host) for key in range(10))
+            lines.append('\n')
+            for line in lines:
+                size += fp.write(line)
+
+    return size
+
+
+def load(path, kwargs):
+    config = LocalConfig(path, **kwargs)
+    config._read_sources()
+    return config
+
+
+def read(path, kwargs):
+    """ :return: Tuple of seconds to read the config and the peak memory in MB, which is traced in another read """
+    start = time.time()
+    load(path, kwargs)
+    seconds = time.time() - start
+
+    tracemalloc.start()
+    load(path, kwargs)
+    peak = tracemalloc.get_traced_memory()[1] / 1024.0 / 1024
+    tracemalloc.stop()
+
+    return seconds, peak
+
+
+def main():
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    path = tempfile.mkdtemp()
+
+    try:
+        header = ''.join('%16s%14s' % ('%s (MB/s)' % mode, 'peak (MB)') for mode in MODES)
+        print('%-12s%12s%s' % ('compression', 'file (MB)', header))
+
+        for compression, opener in OPENERS.items():
+            source = os.path.join(path, 'inventory-%s.cfg' % compression)
+            size = write_config(source, keys, opener) / 1024.0 / 1024
+
+            results = [read(source, kwargs) for kwargs in MODES.values()]
+            row = ''.join('%16.1f%14.1f' % (size / seconds, peak) for seconds, peak in results)
+            print('%-12s%12.1f%s' % (compression, os.path.getsize(source) / 1024.0 / 1024, row))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Compare reading many config fragment files one at a time with reading them in parallel (threads, and threads +
+processes for parsing), to show how the wall clock time scales with the number of sources.
+
+Usage: python benchmarks/parallel_read.py [keys per fragment]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from localconfig.manager import LocalConfig  # noqa
+
+SOURCE_COUNTS = [1, 10, 40, 80]
+
+MODES = {
+    'sequential': {'native_parser': True},
+    'threads': {'parallel': True},
+    'processes': {'parse_processes': True},
+}
+
+
+def write_fragments(path, count, keys):
+    """ Write config fragments with `keys` keys each and return their paths """
+    sources = []
+
+    for i in range(count):
+        source = os.path.join(path, 'fragment-%s.cfg' % i)
+        with open(source, 'w') as fp:
+            for section in range(keys // 20):
+                fp.write('# Section %s\n[section-%s]\n' % (section, section))
+                for key in range(20):
+                    fp.write('key-%s = value %s from fragment %s\n' % (key, key, i))
+                fp.write('\n')
+        sources.append(source)
+
+    return sources
+
+
+def read(sources, kwargs):
+    """ :return: Seconds to read the sources """
+    start = time.time()
+
+    config = LocalConfig(**kwargs)
+    config.read(sources)
+    config._read_sources()
+
+    return time.time() - start
+
+
+def main():
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    path = tempfile.mkdtemp()
+
+    try:
+        print('%-8s' % 'sources' + ''.join('%14s' % ('%s (s)' % mode) for mode in MODES))
+
+        for count in SOURCE_COUNTS:
+            sources = write_fragments(path, count, keys)
+            print('%-8s' % count + ''.join('%14.3f' % read(sources, kwargs) for kwargs in MODES.values()))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""
+Benchmark suite for the main config operations on synthetic configs of different scales and shapes, with baselines to
+catch performance regressions.
+
+Each config has comments and multi-line values. Wide configs have few sections with many keys, and deep configs have
+many sections with few keys. Section and key names have dashes, so dot notation names need to be resolved.
+
+Times are in seconds for whole config operations (read, first_access, items, str, save) and in microseconds per call
+for key operations (get, dot_get, attribute). Memory is the peak traced by tracemalloc while reading the config and
+what the read config holds afterwards, in KB.
+
+Usage: python benchmarks/suite.py [--scales 10,1000,100000] [--shapes wide,deep] [--modes default,native,lazy,...]
+                                  [--baseline benchmarks/baseline.json] [--save] [--check] [--tolerance 0.5]
+
+With --check, the run fails if a result is worse than its baseline by more than the tolerance (0.5 = 50% slower or
+bigger), or if there is no baseline. Save one with --save first. Baselines are machine specific, so they are not
+committed.
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from localconfig.manager import LocalConfig  # noqa
+
+#: Number of keys for each scale. 1M keys takes a few minutes, so it is not run by default.
+SCALES = [10, 1000, 100000, 1000000]
+DEFAULT_SCALES = [10, 1000, 100000]
+
+#: Number of keys per section for each shape
+SHAPES = {
+    'wide': 1000,
+    'deep': 5,
+}
+
+#: LocalConfig options for each mode
+MODES = {
+    'default': {},
+    'native': {'native_parser': True},
+    'lazy': {'lazy': True},
+    'read_only': {'read_only': True},
+    'native_read_only': {'native_parser': True, 'read_only': True},
+}
+
+#: Number of keys to sample for key operations
+SAMPLE_KEYS = 1000
+
+#: Number of times to repeat timings for configs up to this many keys, where the best time is used.
+REPEAT = 5
+REPEAT_MAX_KEYS = 10000
+
+#: Results that are times in seconds for whole config operations, as opposed to microseconds per call or KB.
+SECONDS_METRICS = {'read', 'first_access', 'items', 'str', 'save'}
+
+#: Times in seconds that are not checked against the baseline, as they are too small to time reliably.
+MIN_CHECKED_TIME = 0.01
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def write_config(path, keys, keys_per_section):
+    """
+    Write a config with the number of keys, where every 5th key has a comment and every 10th key has a multi-line value.
+
+    :return: List of (section, key) in the config
+    """
+    names = []
+
+    with open(path, 'w') as fp:
+        for section in range((keys + keys_per_section - 1) // keys_per_section):
+            section_name = 'section-%s' % section
+            fp.write('# Comment for %s\n[%s]\n' % (section_name, section_name))
+
+            for key in range(min(keys_per_section, keys - len(names))):
+                key_name = 'key-%s' % key
+                if key % 5 == 0:
+                    fp.write('# Comment for %s\n' % key_name)
+                if key % 10 == 0:
+                    fp.write('%s = first line of %s\n    second line\n' % (key_name, key))
+                else:
+                    fp.write('%s = %s\n' % (key_name, key * 3 if key % 2 else 'value %s' % key))
+                names.append((section_name, key_name))
+
+            fp.write('\n')
+
+    return names
+
+
+def timed(func, *args):
+    """ :return: Seconds to call the function """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def per_call(func, keys):
+    """ :return: Microseconds per call of the function for each key, after a warm up call for each key """
+    for section, key in keys:
+        func(section, key)
+    return timed(lambda: [func(section, key) for section, key in keys]) * 1000000.0 / len(keys)
+
+
+def dot_name(name):
+    return name.replace('-', '_')
+
+
+def load(path, kwargs):
+    config = LocalConfig(path, **kwargs)
+    config._read_sources()
+    return config
+
+
+def run(path, names, kwargs, save_path):
+    """ :return: Dict of benchmark name to result """
+    repeat = REPEAT if len(names) <= REPEAT_MAX_KEYS else 1
+    results = {}
+
+    for _ in range(repeat):
+        for name, result in run_once(path, names, kwargs, save_path).items():
+            results[name] = min(results.get(name, result), result)
+
+    return results
+
+
+def run_once(path, names, kwargs, save_path):
+    """ :return: Dict of benchmark name to result """
+    results = {}
+    keys = random.Random(0).sample(names, min(SAMPLE_KEYS, len(names)))
+    dot_keys = [(dot_name(section), dot_name(key)) for section, key in keys]
+
+    results['read'] = timed(load, path, kwargs)
+
+    gc.collect()
+    tracemalloc.start()
+    config = load(path, kwargs)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results['read_peak_kb'] = peak / 1024.0
+    results['config_kb'] = current / 1024.0
+
+    config = LocalConfig(path, **kwargs)
+    results['first_access'] = timed(config.get, *keys[0])
+
+    config = load(path, kwargs)
+    results['get'] = per_call(config.get, keys)
+    results['dot_get'] = per_call(config.get, dot_keys)
+    results['attribute'] = per_call(lambda section, key: getattr(getattr(config, section), key), dot_keys)
+    results['items'] = timed(lambda: [list(config.items(section)) for section in config])
+    results['str'] = timed(str, config)
+    if not kwargs.get('read_only'):
+        results['save'] = timed(config.save, save_path)
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """ :return: List of messages for results that are worse than the baseline by more than the tolerance """
+    regressions = []
+
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for metric, value in sorted(result.items()):
+            expected = baseline[name].get(metric)
+            if expected is None or metric in SECONDS_METRICS and expected < MIN_CHECKED_TIME:
+                continue
+            if value > expected * (1 + tolerance):
+                regressions.append('%s %s: %.3f vs baseline %.3f' % (name, metric, value, expected))
+
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark suite for localconfig')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='Comma separated number of keys, such as %s' % ','.join(map(str, SCALES)))
+    parser.add_argument('--shapes', default=','.join(SHAPES),
+                        help='Comma separated shapes from: %s' % ', '.join(SHAPES))
+    parser.add_argument('--modes', default='default', help='Comma separated modes from: %s' % ', '.join(MODES))
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file')
+    parser.add_argument('--save', action='store_true', help='Save the results as the baseline')
+    parser.add_argument('--check', action='store_true', help='Fail if a result regressed from the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed regression ratio (default: 0.5)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    path = tempfile.mkdtemp()
+    results = {}
+
+    try:
+        for scale in [int(scale) for scale in args.scales.split(',')]:
+            for shape in args.shapes.split(','):
+                config_path = os.path.join(path, 'config-%s-%s.cfg' % (scale, shape))
+                names = write_config(config_path, scale, SHAPES[shape])
+
+                for mode in args.modes.split(','):
+                    name = '%s-%s-%s' % (scale, shape, mode)
+                    results[name] = run(config_path, names, MODES[mode], os.path.join(path, 'saved.cfg'))
+
+                    if len(results) == 1:
+                        print('%-22s' % 'benchmark' + ''.join('%13s' % metric for metric in results[name]))
+                    print('%-22s' % name + ''.join('%13.3f' % value for value in results[name].values()))
+    finally:
+        shutil.rmtree(path)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fp:
+            baseline = json.load(fp)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as fp:
+            json.dump(baseline, fp, indent=2, sort_keys=True)
+        print('\nSaved baseline to %s' % args.baseline)
+
+    elif args.check:
+        if not baseline:
+            print('\nNo baseline to check against in %s. Run with --save to record one.' % args.baseline)
+            sys.exit(1)
+
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('\nRegressed by more than %d%%:\n  %s' % (args.tolerance * 100, '\n  '.join(regressions)))
+            sys.exit(1)
+        print('\nNo regressions from %s' % args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare :func:`localconfig.utils.typed_value` with the exception based type guessing it replaced.
+
+Usage: python benchmarks/typed_value.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from localconfig.utils import (is_bool, is_float, is_int, is_int_base_n, is_none, to_bool,  # noqa
+                               typed_value)
+
+VALUES = {
+    'string': ['Value', 'localhost', '/var/log/app.log', 'This line spans multiple lines\nand more'],
+    'int': ['1', '8080', '-42', '1_000'],
+    'int_base_n': ['0b11', '0o77', '0xabcd'],
+    'float': ['2.0', '1e-5', '.5'],
+    'bool': ['true', 'False', 'on', 'no'],
+    'none': ['None'],
+}
+
+
+def guess_typed_value(value):
+    if is_int(value):
+        return int(value)
+    elif is_int_base_n(value):
+        return int(value, 0)
+    elif is_float(value):
+        return float(value)
+    elif is_bool(value):
+        return to_bool(value)
+    elif is_none(value):
+        return None
+    return value
+
+
+def main():
+    print('%-12s %12s %12s %8s' % ('values', 'guess (us)', 'typed (us)', 'speedup'))
+
+    for name, values in VALUES.items():
+        number = 100000 // len(values)
+        guess = timeit.timeit(lambda: [guess_typed_value(v) for v in values], number=number)
+        typed = timeit.timeit(lambda: [typed_value(v) for v in values], number=number)
+        per_value = 1000000.0 / (number * len(values))
+        print('%-12s %12.3f %12.3f %7.1fx' % (name, guess * per_value, typed * per_value, guess / typed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,13 @@
-from localconfig.manager import LocalConfig
+from localconfig.lazy import LazyConfig
 
-config = LocalConfig()
+#: Config for the program. It is created on first access, see :class:`localconfig.manager.LocalConfig`
+config = LazyConfig()
+
+
+def __getattr__(name):
+    """ Import :class:`localconfig.manager.LocalConfig` when it is used, as importing it is slow """
+    if name == 'LocalConfig':
+        from localconfig.manager import LocalConfig
+        return LocalConfig
+
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
@@ -0,0 +1,84 @@
+"""
+Building blocks for the asyncio API of :class:`localconfig.manager.LocalConfig`: blocking file I/O runs in the default
+executor, and sources are parsed in chunks of lines that yield to the event loop in between, so a big config does not
+stall it.
+
+asyncio is imported when it is used, as it is slow to import and most programs that use the config don't need it.
+"""
+
+from io import StringIO
+from itertools import islice
+
+from localconfig.parser import SourceParser
+from localconfig.snapshot import source_key
+from localconfig.sources import cached_result, index_source, read_file
+from localconfig.utils import is_config
+
+#: Number of lines to parse before yielding to the event loop
+PARSE_CHUNK_LINES = 1000
+
+
+async def run_blocking(func, *args):
+    """ Run the blocking function in the default executor of the event loop and return its result """
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+async def parse_text(text, name=None, chunk_lines=PARSE_CHUNK_LINES, comments=True):
+    """
+    Parse the config content, yielding to the event loop after every `chunk_lines` lines
+
+    :param str text: Config content
+    :param str name: Name of the source, used in error messages.
+    :param int chunk_lines: Number of lines to parse at a time
+    :param bool comments: Collect comments
+    :rtype: localconfig.parser.ParsedSource
+    """
+    import asyncio
+
+    parser = SourceParser(name, comments)
+    fp = StringIO(text)
+
+    while True:
+        lines = list(islice(fp, chunk_lines))
+        if not lines:
+            break
+        parser.feed(lines)
+        await asyncio.sleep(0)
+
+    return parser.close()
+
+
+async def read_source(source, lazy=False, chunk_lines=PARSE_CHUNK_LINES, comments=True, cache=None):
+    """
+    Read and parse the config source without blocking the event loop or changing any config
+
+    :param str source: Config source string or file name
+    :param bool lazy: Only index the section headers, like :class:`localconfig.manager.LocalConfig` in lazy mode.
+    :param int chunk_lines: Number of lines to parse at a time
+    :param bool comments: Collect comments
+    :param dict cache: Parse cache from :func:`localconfig.sources.cached_result`. A file that is in it is not read
+                       again.
+    :return: Tuple of (signature, result). Signature is from :func:`localconfig.snapshot.source_key` for file
+             source, otherwise None. Result is the same as :func:`localconfig.sources.read_source`
+    """
+    if isinstance(source, str) and is_config(source):
+        if lazy:
+            return None, index_source(source, False, comments)
+        return None, await parse_text(source, chunk_lines=chunk_lines, comments=comments)
+
+    signature = await run_blocking(source_key, source, True)
+
+    if lazy:
+        return signature, await run_blocking(index_source, source, True, comments)
+
+    cached = cached_result(cache, source, signature)
+    if cached:
+        return signature, cached
+
+    text = await run_blocking(read_file, source)
+    if text is None:
+        return signature, None
+
+    return signature, await parse_text(text, source, chunk_lines, comments)
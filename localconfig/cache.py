@@ -0,0 +1,110 @@
+"""
+Caches for typed values, keyed by their string value.
+"""
+
+from collections import OrderedDict
+
+#: Default max number of values in :class:`LRUCache`
+DEFAULT_CACHE_SIZE = 4096
+
+#: Default value returned by :meth:`NoCache.get` for a value that is not cached, as None is a valid typed value.
+NOT_CACHED = object()
+
+
+class NoCache(object):
+    """ A cache that does not cache anything, but still counts misses. """
+
+    def __init__(self):
+        #: Number of lookups found in cache
+        self.hits = 0
+
+        #: Number of lookups not found in cache
+        self.misses = 0
+
+        #: Number of values removed to make room for new ones
+        self.evictions = 0
+
+    def get(self, key, default=NOT_CACHED):
+        """
+        Get the cached value
+
+        :param str key: String value
+        :param default: Value to return if key is not cached
+        """
+        self.misses += 1
+        return default
+
+    def set(self, key, value):
+        """
+        Cache the value
+
+        :param str key: String value
+        :param value: Typed value
+        """
+
+    def update(self, values):
+        """
+        Cache the values
+
+        :param dict values: Dict of string value to typed value
+        """
+        for key, value in values.items():
+            self.set(key, value)
+
+    def discard(self, key):
+        """ Remove the key from cache if it is cached """
+
+    def clear(self):
+        """ Remove all cached values """
+
+    def __len__(self):
+        return 0
+
+    def stats(self):
+        """
+        :return: Dict of hits, misses, evictions and size
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self)}
+
+
+class LRUCache(NoCache):
+    """ A cache that holds up to `maxsize` values, and evicts the least recently used value when it is full. """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        """
+        :param int maxsize: Max number of values to cache
+        """
+        super(LRUCache, self).__init__()
+
+        #: Max number of values to cache
+        self.maxsize = maxsize
+
+        self._values = OrderedDict()
+
+    def get(self, key, default=NOT_CACHED):
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            return default
+
+        self._values.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self._values[key] = value
+        self._values.move_to_end(key)
+
+        if len(self._values) > self.maxsize:
+            self._values.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key):
+        self._values.pop(key, None)
+
+    def clear(self):
+        self._values.clear()
+
+    def __len__(self):
+        return len(self._values)
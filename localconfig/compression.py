@@ -0,0 +1,84 @@
+"""
+Compressed config files (gzip, bz2 and xz), which are detected by their magic bytes and decompressed as they are read,
+so the decompressed content is never in memory all at once.
+"""
+
+import os
+
+#: Magic bytes at the start of the file for each compression
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+}
+
+#: File extension for each compression, used to pick the compression of new files when they are saved.
+EXTENSIONS = {
+    '.gz': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+}
+
+_MAGIC_SIZE = max(len(magic) for magic in MAGIC_BYTES.values())
+
+
+def detect_compression(path):
+    """
+    :param str path: Path to a file
+    :return: Compression of the file from its magic bytes ('gzip', 'bz2' or 'xz'), or None if it is not compressed or
+             does not exist.
+    """
+    try:
+        with open(path, 'rb') as fp:
+            start = fp.read(_MAGIC_SIZE)
+    except (FileNotFoundError, IsADirectoryError):
+        return None
+
+    return next((compression for compression, magic in MAGIC_BYTES.items() if start.startswith(magic)), None)
+
+
+def save_compression(path):
+    """
+    :param str path: Path of the file to save to
+    :return: Compression to save the file with, which is the compression of the existing file, or from its extension
+             if it does not exist. None if it should not be compressed.
+    """
+    if os.path.exists(path):
+        return detect_compression(path)
+
+    return EXTENSIONS.get(os.path.splitext(path)[1])
+
+
+def open_compressed(file, compression, mode='rt'):
+    """
+    Open a compressed file, which decompresses (or compresses) as it is read (or written)
+
+    :param file: Path or file object
+    :param str compression: 'gzip', 'bz2' or 'xz'
+    :param str mode: Same as :func:`open`
+    :return: File object
+    """
+    # Imported when used, as the modules are slow to import and most configs are not compressed.
+    if compression == 'gzip':
+        import gzip
+        return gzip.open(file, mode)
+    elif compression == 'bz2':
+        import bz2
+        return bz2.open(file, mode)
+    elif compression == 'xz':
+        import lzma
+        return lzma.open(file, mode)
+
+    raise ValueError('Unsupported compression: %s' % compression)
+
+
+def open_source(path, compression=None):
+    """
+    Open a config file for reading in text mode, which is decompressed as it is read if it is compressed.
+
+    :param str path: Path to config file
+    :param str compression: Compression of the file if it was detected already
+    :return: File object
+    """
+    compression = compression or detect_compression(path)
+    return open_compressed(path, compression) if compression else open(path)
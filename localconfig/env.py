@@ -0,0 +1,53 @@
+"""
+Overrides from environment variables, such as `MYAPP__WEB_SERVER__PORT=8080` for the `port` key of the `Web Server`
+section, which are indexed once so looking up a key does not scan the environment.
+"""
+
+from configparser import DEFAULTSECT
+import os
+
+from localconfig.utils import to_dot_key
+
+#: Separator between the prefix, section and key in environment variable names
+SEPARATOR = '__'
+
+
+def env_section(section):
+    """
+    :param str section: Section name or its dot notation name
+    :return: Section name in the index from :func:`scan_environ`
+    """
+    dot_section = to_dot_key(section)
+    return DEFAULTSECT if dot_section == to_dot_key(DEFAULTSECT) else dot_section
+
+
+def scan_environ(prefix, environ=None):
+    """
+    Index the environment variables that start with the prefix and :data:`SEPARATOR`.
+
+    `<PREFIX>__<SECTION>__<KEY>` overrides the key in the section, and `<PREFIX>__<KEY>` overrides the key in
+    DEFAULTSECT. Section and key names are matched by their dot notation names, so `WEB_SERVER` matches `Web Server`.
+
+    :param str prefix: Prefix of the environment variables, such as `MYAPP`
+    :param dict environ: Environment variables. Defaults to `os.environ`
+    :return: Dict of section (dot notation name or DEFAULTSECT) to a dict of dot notation key to value
+    """
+    environ = os.environ if environ is None else environ
+    prefix += SEPARATOR
+    index = {}
+
+    for name, value in environ.items():
+        if not name.startswith(prefix):
+            continue
+
+        names = name[len(prefix):].split(SEPARATOR)
+        if len(names) == 1:
+            names.insert(0, DEFAULTSECT)
+        elif len(names) != 2 or not names[0]:
+            continue
+
+        section, key = names
+        if key:
+            index.setdefault(env_section(section), {})[to_dot_key(key)] = value
+
+    return index
@@ -0,0 +1,163 @@
+"""
+Read-only snapshot of a config, where sections and keys are plain attributes stored in generated `__slots__` so a
+lookup costs the same as any other attribute read.
+"""
+
+from localconfig.utils import to_dot_key
+
+NOT_FOUND = object()
+
+
+class FrozenSection(object):
+    """
+    Base class for a frozen section. Each section gets its own generated subclass with a slot for each key.
+    Keys that are not valid attribute names are only available from iterating the section.
+    """
+
+    __slots__ = ()
+
+    #: Tuple of (key, value) for the section
+    _items = ()
+
+    #: A dict that maps key to value, so keys are found by their name before keys with the same dot notation name.
+    _names = {}
+
+    def __getattr__(self, key):
+        """ Non-existing key defaults to None """
+        if key.startswith('__'):
+            raise AttributeError(key)
+        return None
+
+    def __setattr__(self, key, value):
+        raise AttributeError('%s is read-only' % self.__class__.__name__)
+
+    def __delattr__(self, key):
+        raise AttributeError('%s is read-only' % self.__class__.__name__)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, dict(self._items))
+
+
+class FrozenConfig(FrozenSection):
+    """
+    Base class for a frozen config. Sections and keys from DEFAULTSECT are attributes in dot notation format,
+    and iterating over it yields the section names.
+    """
+
+    __slots__ = ()
+
+    def get(self, section, key, default=None):
+        """
+        Get config value
+
+        :param str section: Section to get config for.
+        :param str key: Key to get config for.
+        :param default: Default value for key if key was not found.
+        """
+        section = lookup(self, section)
+        if not isinstance(section, FrozenSection):
+            return default
+
+        value = lookup(section, key.lower())  # Keys are in lower case like ConfigParser stores them
+        return default if value is NOT_FOUND else value
+
+    def __iter__(self):
+        return iter(section for section, _ in self._items)
+
+
+def lookup(frozen, name, dot_name=True):
+    """
+    Look up the section/key by its name, or by its dot notation name if there is none with the name
+
+    :param FrozenSection frozen: Frozen section or config to look up in
+    :param str name: Name of the section/key
+    :param bool dot_name: Look up by the dot notation name too
+    :return: The frozen section / value, or :data:`NOT_FOUND`
+    """
+    value = frozen._names.get(name, NOT_FOUND)
+    if value is not NOT_FOUND or not dot_name:
+        return value
+
+    attr = to_dot_key(name)
+    if attr in frozen.__slots__:
+        return getattr(frozen, attr)
+
+    for item_name, value in frozen._items:
+        if to_dot_key(item_name) == attr:
+            return value
+
+    return NOT_FOUND
+
+
+def _new(base, name, attrs, items):
+    """
+    Create an instance of a generated subclass of base with a slot for each attribute
+
+    :param type base: :class:`FrozenSection` or :class:`FrozenConfig`
+    :param str name: Name of the subclass
+    :param dict attrs: Dict of attribute name to value
+    :param tuple items: Items to iterate over, and to look up by name
+    """
+    attrs = dict((attr, value) for attr, value in attrs.items()
+                 if attr.isidentifier() and not attr.startswith('_') and not hasattr(base, attr))
+    cls = type(name, (base,), {'__slots__': tuple(attrs), '_items': tuple(items), '_names': dict(items)})
+    instance = cls()
+    for attr, value in attrs.items():
+        object.__setattr__(instance, attr, value)
+
+    return instance
+
+
+def freeze(config):
+    """
+    Create a read-only snapshot of the config
+
+    :param LocalConfig config: Config to freeze
+    :rtype: FrozenConfig
+    """
+    sections = [(section, freeze_section(list(config.items(section)))) for section in config]
+    return freeze_config(list(config.items('DEFAULT')), sections)
+
+
+def freeze_section(items):
+    """
+    :param list items: List of (key, value) for the section
+    :rtype: FrozenSection
+    """
+    return _new(FrozenSection, 'FrozenSection', _attrs(items), items)
+
+
+def freeze_config(default_items, sections):
+    """
+    :param list default_items: List of (key, value) for DEFAULTSECT
+    :param list sections: List of (section, :class:`FrozenSection`), so unchanged sections can be reused from another
+                          frozen config.
+    :rtype: FrozenConfig
+    """
+    attrs = _attrs(default_items)
+    attrs.update(_attrs(sections))
+
+    return _new(FrozenConfig, 'FrozenConfig', attrs, sections)
+
+
+def _attrs(items):
+    """
+    :param list items: List of (name, value)
+    :return: Dict of dot notation name to value. When names have the same dot notation name, the value is from the
+             name that is in dot notation format already, otherwise the last name.
+    """
+    attrs = {}
+    exact = set()
+
+    for item_name, value in items:
+        attr = to_dot_key(item_name)
+        if attr == item_name:
+            exact.add(attr)
+        elif attr in exact:
+            continue
+        attrs[attr] = value
+
+    return attrs
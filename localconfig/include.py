@@ -0,0 +1,103 @@
+"""
+Directory and glob sources, such as `/etc/app/conf.d` or `/etc/app/conf.d/*.ini`, and `include = path` directives that
+read other config files from a config.
+"""
+
+import glob
+import os
+import re
+
+from localconfig.snapshot import source_key
+from localconfig.utils import is_config, to_dot_key
+
+#: Key of the include directive
+INCLUDE_KEY = 'include'
+
+GLOB_RE = re.compile(r'[*?[]')
+
+
+def is_pattern(source):
+    """ Checks if the source is a glob pattern of files, and not a file with glob characters in its name """
+    if not isinstance(source, str) or is_config(source) or not GLOB_RE.search(source):
+        return False
+    return not os.path.exists(source)
+
+
+def is_directory(source):
+    """ Checks if the source is a directory of files """
+    return isinstance(source, str) and not is_config(source) and os.path.isdir(source)
+
+
+def expand_source(source):
+    """
+    Expand a directory or glob source into the files in it, in the order they should be read.
+
+    :param str source: Directory, glob pattern, or any other config source
+    :return: List of file paths sorted by name for a directory (without hidden files or files ending with ~) or glob
+             pattern (without directories), otherwise a list of the source itself.
+    """
+    if is_directory(source):
+        names = [name for name in sorted(os.listdir(source)) if not name.startswith('.') and not name.endswith('~')]
+        return [path for path in (os.path.join(source, name) for name in names) if os.path.isfile(path)]
+
+    if is_pattern(source):
+        return sorted(path for path in glob.glob(os.path.expanduser(source)) if os.path.isfile(path))
+
+    return [source]
+
+
+def expand_sources(sources):
+    """
+    :param list sources: List of config sources
+    :return: List of sources with directory and glob sources expanded by :func:`expand_source`
+    """
+    return [path for source in sources for path in expand_source(source)]
+
+
+def include_key(source):
+    """
+    Key that identifies the content of a source from an include directive
+
+    :param str source: File, directory or glob pattern
+    :return: Tuple of (tuple of files from :func:`expand_source`, tuple of their keys from
+             :func:`localconfig.snapshot.source_key`)
+    """
+    paths = tuple(expand_source(source))
+    return paths, tuple(source_key(path, True) for path in paths)
+
+
+def include_paths(parsed, path=None):
+    """
+    :param ParsedSource parsed: Parsed source from :func:`localconfig.parser.parse`
+    :param str path: Path of the parsed file, which relative includes are resolved against. Defaults to the current
+                     directory.
+    :return: List of included paths from the include directives in the order they appear, without removing them.
+             A multi-line value includes a path from each line.
+    """
+    base_dir = os.path.dirname(path) if path else ''
+
+    return [os.path.join(base_dir, os.path.expanduser(line.strip()))
+            for section_dict in parsed.sections.values()
+            for line in section_dict.get(INCLUDE_KEY, '').split('\n') if line.strip()]
+
+
+def pop_includes(parsed, path=None):
+    """
+    Remove the include directives from the parsed source
+
+    :param ParsedSource parsed: Parsed source from :func:`localconfig.parser.parse`
+    :param str path: Path of the parsed file, which relative includes are resolved against. Defaults to the current
+                     directory.
+    :return: Same as :func:`include_paths`
+    """
+    includes = include_paths(parsed, path)
+
+    for section, section_dict in parsed.sections.items():
+        if section_dict.pop(INCLUDE_KEY, None) is None:
+            continue
+
+        target = parsed.dot_keys.pop(to_dot_key(section, INCLUDE_KEY), None)
+        if target:
+            parsed.comments.pop(target, None)
+
+    return includes
@@ -0,0 +1,130 @@
+"""
+Section offset index for lazy loading: config sources are scanned for section headers only, and each section is
+parsed by :mod:`localconfig.parser` the first time it is needed.
+"""
+
+from collections import namedtuple
+from configparser import DEFAULTSECT, DuplicateSectionError
+from io import StringIO
+import locale
+import mmap
+import os
+import re
+
+from localconfig.parser import SourceParser
+
+HEADER_RE = re.compile(r'^\[(?P<header>.+)\]', re.MULTILINE)
+HEADER_BYTES_RE = re.compile(br'^\[(?P<header>.+)\]', re.MULTILINE)
+
+#: A section's text in a source: the config string or file path, and its start/end offsets (bytes for files).
+#: Section is None when the source has no section header.
+Span = namedtuple('Span', 'section source is_file start end')
+
+
+def index_text(text):
+    """
+    Index the section headers in a config string
+
+    :param str text: Config content
+    :return: List of :class:`Span` in the order they appear
+    :raise DuplicateSectionError: If a section header is repeated, like the parser does
+    """
+    return _index(text, text, False, HEADER_RE, '\n', '#', None)
+
+
+def index_file(path, encoding=None):
+    """
+    Index the section headers in a config file without reading it into memory
+
+    :param str path: Path to config file
+    :param str encoding: Encoding of the file. Defaults to the same encoding used by :func:`open`
+    :return: List of :class:`Span` in the order they appear
+    :raise DuplicateSectionError: If a section header is repeated, like the parser does
+    """
+    encoding = encoding or locale.getpreferredencoding(False)
+
+    with open(path, 'rb') as fp:
+        if not os.fstat(fp.fileno()).st_size:
+            return []
+
+        buf = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return _index(buf, path, True, HEADER_BYTES_RE, b'\n', b'#', encoding)
+        finally:
+            buf.close()
+
+
+def _index(buf, source, is_file, header_re, newline, comment, encoding):
+    """
+    Each span is parsed on its own later, so repeated options are caught when their section is loaded, but a
+    repeated section header has to be caught here while the whole source is being scanned.
+    """
+    spans = []
+    seen = set()
+    section = None
+    start = 0
+    limit = 0
+
+    for match in header_re.finditer(buf):
+        span_start = _comment_start(buf, match.start(), limit, newline, comment)
+        if section is not None:
+            spans.append(Span(section, source, is_file, start, span_start))
+            start = span_start
+
+        section = match.group('header')
+        if encoding:
+            section = section.decode(encoding)
+        if section in seen:
+            lineno = buf[:match.start()].count(newline) + 1
+            raise DuplicateSectionError(section, source if is_file else None, lineno)
+        if section != DEFAULTSECT:
+            seen.add(section)
+        limit = match.end()
+
+    spans.append(Span(section, source, is_file, start, len(buf)))
+
+    return spans
+
+
+def _comment_start(buf, pos, limit, newline, comment):
+    """
+    The comment block right before a section header belongs to that section, so walk back from the header to where
+    the block starts, using the same rules as :meth:`LocalConfig._parse_extra`.
+    """
+    start = pos
+
+    while pos > limit:
+        end = pos - 1
+        line_start = max(buf.rfind(newline, limit, end) + 1, limit)
+        line = buf[line_start:end]
+
+        if line[:1] == comment:
+            start = line_start
+        elif line.strip():
+            break
+
+        pos = line_start
+
+    return start
+
+
+def read_span(span, encoding=None):
+    """ Read the text for the span """
+    if not span.is_file:
+        return span.source[span.start:span.end]
+
+    with open(span.source, 'rb') as fp:
+        fp.seek(span.start)
+        return fp.read(span.end - span.start).decode(encoding or locale.getpreferredencoding(False))
+
+
+def parse_span(span, encoding=None, comments=True):
+    """
+    Parse the span
+
+    :param bool comments: Collect comments
+    :rtype: localconfig.parser.ParsedSource
+    """
+    parser = SourceParser(span.source if span.is_file else None, comments)
+    parser.feed(StringIO(read_span(span, encoding)))
+    return parser.close()
@@ -0,0 +1,146 @@
+"""
+Interpolation that caches interpolated values, with a reverse dependency graph so changing a key only invalidates the
+values that reference it, directly or through other keys.
+"""
+
+from configparser import BasicInterpolation, DEFAULTSECT, InterpolationDepthError
+
+
+class _RecordingMap(object):
+    """ Mapping that records the keys that are looked up in it """
+
+    def __init__(self, mapping, keys):
+        self._mapping = mapping
+        self._keys = keys
+
+    def __getitem__(self, key):
+        self._keys.add(key)
+        return self._mapping[key]
+
+
+class CachingInterpolation(BasicInterpolation):
+    """
+    Same as :class:`configparser.BasicInterpolation`, but interpolated values are cached until the raw value or a
+    value that it references is set.
+
+    Values that are interpolated with `vars` are not cached.
+    """
+
+    def __init__(self):
+        #: A dict that maps (section, option) to (raw value, interpolated value)
+        self._values = {}
+
+        #: A dict that maps an option to a dict of section to the set of options in that section whose cached value
+        #: references it.
+        self._dependents = {}
+
+    def before_get(self, parser, section, option, value, defaults):
+        maps = getattr(defaults, 'maps', None)
+        if maps and maps[0]:  # vars was passed to get()
+            return super(CachingInterpolation, self).before_get(parser, section, option, value, defaults)
+
+        key = (section, option)
+        cached = self._values.get(key)
+        if cached and cached[0] == value:
+            return cached[1]
+
+        references = set()
+        interpolated = super(CachingInterpolation, self).before_get(parser, section, option, value,
+                                                                    _RecordingMap(defaults, references))
+
+        self._values[key] = (value, interpolated)
+        for reference in references:
+            self._dependents.setdefault(reference, {}).setdefault(section, set()).add(option)
+
+        return interpolated
+
+    def before_set(self, parser, section, option, value):
+        value = super(CachingInterpolation, self).before_set(parser, section, option, value)
+        self.invalidate(section or DEFAULTSECT, parser.optionxform(option))
+        return value
+
+    def invalidate(self, section, option):
+        """
+        Remove the cached value for the option and the values that depend on it.
+
+        :param str section: Section of the option. Options in DEFAULTSECT are referenced from all sections.
+        :param str option: Option that changed
+        """
+        changed = [(section, option)]
+
+        while changed:
+            section, option = changed.pop()
+            self._values.pop((section, option), None)
+
+            dependents = self._dependents.get(option)
+            if not dependents:
+                continue
+
+            for dependent_section in list(dependents) if section == DEFAULTSECT else [section]:
+                changed.extend((dependent_section, dependent) for dependent in dependents.pop(dependent_section, ()))
+
+    def clear(self):
+        """ Remove all cached values, such as when options are changed without :meth:`before_set` """
+        self._values.clear()
+        self._dependents.clear()
+
+    def check_cycles(self, parser, sections=None, changes=None):
+        """
+        Check that no option references itself, directly or through other options.
+
+        :param ConfigParser parser: Parser with the options to check
+        :param iter sections: Sections to check. Defaults to DEFAULTSECT and all sections.
+        :param dict changes: Dict of (section, option) to raw value that is about to be set, which is checked in place
+                             of the current value.
+        :raise InterpolationDepthError: if an option references itself
+        """
+        changes = changes or {}
+        if sections is None:
+            sections = [DEFAULTSECT] + parser.sections()
+
+        for section in sections:
+            options = set(parser.defaults())
+            if section != DEFAULTSECT:
+                options.update(parser._sections.get(section, ()))
+            options.update(option for change_section, option in changes if change_section in (section, DEFAULTSECT))
+
+            visited = {}
+            for option in options:
+                self._check_option(parser, section, option, changes, visited)
+
+    def _check_option(self, parser, section, option, changes, visited):
+        """
+        Depth first search for a reference cycle from the option
+
+        :param dict visited: A dict that maps option to True if it has been checked, or False if it is being checked.
+        """
+        if visited.get(option):
+            return
+
+        value = _raw_value(parser, section, option, changes)
+
+        if option in visited:
+            raise InterpolationDepthError(option, section, value)
+
+        if not value or '%' not in value:
+            visited[option] = True
+            return
+
+        visited[option] = False
+        for reference in self._KEYCRE.findall(value.replace('%%', '')):
+            self._check_option(parser, section, parser.optionxform(reference), changes, visited)
+        visited[option] = True
+
+
+def _raw_value(parser, section, option, changes):
+    """ Raw value of the option as seen from the section, or None if it does not exist """
+    if (section, option) in changes:
+        return changes[(section, option)]
+
+    if section != DEFAULTSECT and option in parser._sections.get(section, ()):
+        return parser._sections[section][option]
+
+    if (DEFAULTSECT, option) in changes:
+        return changes[(DEFAULTSECT, option)]
+
+    return parser.defaults().get(option)
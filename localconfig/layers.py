@@ -0,0 +1,63 @@
+"""
+Parsed sources kept as layers, so a changed source can be re-applied without re-reading the others.
+"""
+
+from localconfig.compression import open_source
+from localconfig.parser import parse, ParsedSource
+
+
+class Layer(object):
+    """ A parsed config source """
+
+    def __init__(self, source, is_file, parsed, name=None):
+        """
+        :param str source: File path, or None if it is not a file source.
+        :param bool is_file: True if source is a file path
+        :param ParsedSource parsed: Parsed source
+        :param str name: Name of the layer. Defaults to the file path, or '<string>' if it is not a file source.
+        """
+        #: File path, or None if it is not a file source.
+        self.source = source
+
+        #: True if source is a file path
+        self.is_file = is_file
+
+        #: Parsed source
+        self.parsed = parsed
+
+        #: Name of the layer
+        self.name = name or (source if is_file else '<string>')
+
+    def __repr__(self):
+        return '<Layer %s>' % self.name
+
+
+def parse_file(path, comments=True):
+    """
+    Parse the config file
+
+    :param str path: Path to config file
+    :param bool comments: Collect comments
+    :return: Parsed source, which is empty if the file does not exist.
+    :rtype: ParsedSource
+    """
+    try:
+        with open_source(path) as fp:
+            return parse(fp, comments=comments)
+    except FileNotFoundError:
+        return ParsedSource(path)
+
+
+def topmost_layer(layers, section, key=None):
+    """
+    Find the last layer that has the section/key, which is the one that its value is from.
+
+    :param list layers: List of :class:`Layer` in the order they were read
+    :param str section: Section to find
+    :param str key: Key to find. If not set, find the layer that has the section.
+    :rtype: Layer or None
+    """
+    for layer in reversed(layers):
+        section_dict = layer.parsed.sections.get(section)
+        if section_dict is not None and (key is None or key in section_dict):
+            return layer
@@ -0,0 +1,48 @@
+"""
+Proxy for the module level config, which creates the config on first access, so importing localconfig stays cheap in
+programs that don't use it.
+"""
+
+import _thread
+
+
+class LazyConfig(object):
+    """
+    Proxy for a :class:`localconfig.manager.LocalConfig` that is created with the given arguments the first time any
+    of its attributes are accessed.
+    """
+
+    __slots__ = ('_lazy_args', '_lazy_instance', '_lazy_lock')
+
+    def __init__(self, *args, **kwargs):
+        """ :param args/kwargs: Arguments for :class:`localconfig.manager.LocalConfig` """
+        object.__setattr__(self, '_lazy_args', (args, kwargs))
+        object.__setattr__(self, '_lazy_instance', None)
+        object.__setattr__(self, '_lazy_lock', _thread.allocate_lock())
+
+    def _lazy_config(self):
+        """ :return: The config, which is created once even if many threads access it at the same time """
+        config = self._lazy_instance
+
+        if config is None:
+            with self._lazy_lock:
+                if self._lazy_instance is None:
+                    from localconfig.manager import LocalConfig
+
+                    args, kwargs = self._lazy_args
+                    object.__setattr__(self, '_lazy_instance', LocalConfig(*args, **kwargs))
+                config = self._lazy_instance
+
+        return config
+
+    def __getattr__(self, attr):
+        return getattr(self._lazy_config(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._lazy_config(), attr, value)
+
+    def __iter__(self):
+        return iter(self._lazy_config())
+
+    def __str__(self):
+        return str(self._lazy_config())
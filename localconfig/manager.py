@@ -1,15 +1,55 @@
-from configparser import ConfigParser, BasicInterpolation, DuplicateSectionError, DEFAULTSECT
+from configparser import (ConfigParser, BasicInterpolation, DuplicateSectionError, InterpolationError,
+                          NoSectionError, DEFAULTSECT)
+from contextlib import contextmanager
+from functools import wraps
 from io import StringIO, IOBase
+from itertools import islice
+import locale
 import os
-import re
 import sys
+import threading
+import time
+
+from localconfig.aio import read_source, run_blocking
+from localconfig.cache import LRUCache, NOT_CACHED
+from localconfig.compression import detect_compression, open_compressed, open_source, save_compression
+from localconfig.env import env_section, scan_environ
+from localconfig.frozen import freeze, freeze_config, freeze_section, lookup, FrozenSection, NOT_FOUND
+from localconfig.include import (expand_source, expand_sources, include_key, include_paths, is_directory, is_pattern,
+                                 pop_includes)
+from localconfig.index import index_file, index_text, parse_span
+from localconfig.interpolation import CachingInterpolation
+from localconfig.layers import Layer, parse_file, topmost_layer
+from localconfig.parser import parse, ParsedSource
+from localconfig.schema import Schema, SchemaError
+from localconfig.snapshot import load_snapshot, save_snapshot, source_key
+from localconfig.stats import source_size, Stats
+from localconfig.sources import parse_spans, write_file, write_lines
+from localconfig.subscriptions import Subscriptions
+from localconfig.utils import is_config, CONFIG_KEY_RE, to_dot_key, typed_value
 
-from localconfig.utils import is_float, is_int, is_int_base_n, is_bool, is_none, is_config, CONFIG_KEY_RE, to_bool
-
-NON_ALPHA_NUM = re.compile('[^A-Za-z0-9]')
 NO_DEFAULT_VALUE = 'NO-DEFAULT-VALUE'
 
 
+def template_lines(lines):
+    """ Comment out the lines that are not comments already, for :meth:`LocalConfig.save` with `as_template` """
+    for line in lines:
+        yield '# ' + line if line and not line.startswith('#') else line
+
+
+def synchronized(method):
+    """ Run the :class:`LocalConfig` method as a write (see :meth:`LocalConfig._writing`) in concurrent mode """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._concurrent:
+            return method(self, *args, **kwargs)
+
+        with self._writing():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class LocalConfig(object):
     """
     Wrapper for ConfigParser that allows configs to be accessed thru a dot notion method with data type support.
@@ -49,7 +89,10 @@ class LocalConfig(object):
         def __iter__(self):
             return self._config.items(self._section)
 
-    def __init__(self, last_source=None, interpolation=None, kv_sep=' = ', indent_spaces=4, compact_form=False):
+    def __init__(self, last_source=None, interpolation=None, kv_sep=' = ', indent_spaces=4, compact_form=False,
+                 native_parser=False, lazy=False, snapshot=None, value_cache=None, parallel=None, parse_processes=None,
+                 concurrent=False, stats_hook=None, overlay=False, schema=None, env_prefix=None, read_only=False,
+                 includes=False):
         """
         :param file/str last_source: Last config source file name. This source is read last when an attempt to read a
                                      config value is made (delayed reading, hence "last") if it exists.
@@ -58,12 +101,65 @@ class LocalConfig(object):
                                      Defaults to ~/.config/<PROGRAM_NAME>
 
         :param Interpolation|bool|None interpolation: Support interpolation using the given :cls:`Interpolation`
-                                                      instance, or if True, then defaults to :cls:`BasicInterpolation`
+                                                      instance, or if True, then defaults to
+                                                      :cls:`localconfig.interpolation.CachingInterpolation`, which is
+                                                      :cls:`BasicInterpolation` with cached values. Reference cycles
+                                                      are detected when sources are read or a value is set.
         :param str kv_sep: When serializing, separator used for key and value.
         :param int indent_spaces: When serializing, number of spaces to use when indenting a value spanning multiple
                                   lines.
         :param bool compact_form: Serialize in compact form, such as no new lines between each config key.
+        :param bool native_parser: Parse config sources using the built-in single pass parser from
+                                   :mod:`localconfig.parser` instead of ConfigParser + a second pass for comments.
+        :param bool lazy: Only index section headers when sources are read, and parse each section the first time it is
+                          accessed. Implies `native_parser`.
+        :param bool|str snapshot: Save a compiled snapshot of the config after its sources are read, and load from it
+                                  instead of parsing the sources next time if none of them has changed.
+                                  If True, the snapshot is saved next to `last_source` as `<last_source>.snapshot`.
+                                  Otherwise, it is the snapshot file path or a cache directory to save it in.
+        :param value_cache: Cache for typed values, such as :class:`localconfig.cache.LRUCache` with a custom size or
+                            :class:`localconfig.cache.NoCache` to disable caching. Defaults to
+                            :class:`localconfig.cache.LRUCache`
+        :param int|bool parallel: Read and parse the queued sources concurrently using a thread pool with this many
+                                  threads, or True for the default number of threads. They are still merged in the
+                                  order they were queued. Sources are parsed by the built-in parser, and the files
+                                  they include are read concurrently after them.
+        :param int|bool parse_processes: Parse the queued sources in a process pool with this many processes, or True
+                                         for one per CPU. Implies `parallel`. Only pays off for big sources as starting
+                                         the processes has a cost.
+        :param bool concurrent: Make the config safe to share between threads. Readers get values from an immutable
+                                published state without taking a lock, while writers (including the first read of
+                                the sources and lazy loading of sections) hold a lock and publish a new state when done.
+        :param callable stats_hook: Function to call with the event name and a dict of its stats after sources are read
+                                    ('read' with time and sources, see :meth:`stats`) and after the config is saved
+                                    ('save' with file and time), such as to export them to a metrics pipeline.
+        :param bool overlay: Keep each source as its own layer with an index of which layer each key is from, so
+                             :meth:`source_of` is a dict lookup and layers can be added or removed at runtime using
+                             :meth:`add_layer` and :meth:`remove_layer`. Implies `native_parser`, and can't be used
+                             with `lazy` or `snapshot`.
+        :param Schema|dict schema: :class:`localconfig.schema.Schema` (or the dict to create it with) with the type,
+                                   default and constraints of keys. Values of keys in it are converted and validated
+                                   once per section when the sources are read, which raises
+                                   :class:`localconfig.schema.SchemaError` with all invalid values, and their types are
+                                   not guessed. Sections in it are parsed when the sources are read in lazy mode.
+        :param str env_prefix: Override keys with environment variables that start with this prefix, such as
+                               `MYAPP__WEB_SERVER__PORT` for `port` in `Web Server` or `MYAPP__PORT` for `port` in
+                               DEFAULTSECT (see :func:`localconfig.env.scan_environ`). The environment is indexed when
+                               the config is created, and again by :meth:`refresh_env`.
+        :param bool read_only: The config is only read, so comments are not collected from the sources (which also
+                               skips the second pass over them for comments when ConfigParser parses them), and
+                               :meth:`set`, :meth:`add_section` and :meth:`save` raise AttributeError.
+        :param bool includes: Read the files from `include = path` directives (any section, with a path, directory or
+                              glob on each line of the value) after the config that has them. Relative paths are
+                              resolved against the directory of that config. Implies `native_parser`, and can't be
+                              used with `lazy`. Sources can be directories or globs of files without this.
         """
+        if overlay and (lazy or snapshot):
+            raise ValueError('Overlay mode can not be used with lazy or snapshot')
+
+        if includes and lazy:
+            raise ValueError('Includes can not be used with lazy')
+
         if not last_source and sys.argv and sys.argv[0] and not sys.argv[0].endswith('/pytest'):
             last_source = os.path.join('~', '.config', os.path.basename(sys.argv[0]))
 
@@ -76,16 +172,38 @@ class LocalConfig(object):
         #: Indicate if `self._sources` has been read
         self._sources_read = False
 
+        #: Config sources read after `self._sources` has been read, which are read after `self._last_source`
+        self._sources_read_later = []
+
+        #: Future for the in-flight read of `self._sources` from :meth:`_aread_sources`, shared by concurrent awaiters
+        self._loading = None
+
+        #: A dict that maps file source to its signature from :func:`localconfig.snapshot.source_key` when it was read
+        self._file_signatures = {}
+
         #: Parser instance from ConfigParser that does the underlying config parsing
-        interpolation = BasicInterpolation() if interpolation is True else interpolation
+        interpolation = CachingInterpolation() if interpolation is True else interpolation
         self._parser = ConfigParser(interpolation=interpolation) if interpolation else ConfigParser(interpolation=None)
 
+        #: Interpolation instance if values are interpolated when they are read, so raw values can't be used as is.
+        self._interpolation = interpolation or None
+
+        #: Interpolation may reference keys from other sections, which need to be parsed too in lazy mode.
+        self._cross_section_interpolation = interpolation and not isinstance(interpolation, BasicInterpolation)
+
         #: A dict that maps (section, key) to its comment.
         self._comments = {}
 
         #: A dict that maps dot notation section.key to its actual (section, key)
         self._dot_keys = {}
 
+        #: Tuple of (file, signature, as_template) for the last :meth:`save`
+        self._saved_file = None
+
+        #: A dict that maps section to its (start, end) byte offsets in the last saved file, which is removed when the
+        #: section is changed.
+        self._saved_spans = {}
+
         #: Seperator for key/value. Used for save only.
         self._kv_sep = kv_sep
 
@@ -96,15 +214,133 @@ class LocalConfig(object):
         self._compact_form = compact_form
 
         #: Cache to avoid transforming value too many times
-        self._value_cache = {}
+        self._value_cache = LRUCache() if value_cache is None else value_cache
+
+        #: Use the built-in single pass parser
+        self._native_parser = native_parser or lazy or overlay or includes
+
+        #: Number of threads to read sources with, True for default number of threads, or None to read them in order.
+        self._parallel = parallel or parse_processes
+
+        #: Number of processes to parse sources with, or True for one per CPU.
+        self._parse_processes = parse_processes
+
+        #: Parse sections on first access
+        self._lazy = lazy
+
+        #: A dict that maps section to list of (order, :class:`localconfig.index.Span`) that are not parsed yet.
+        self._pending = {}
+
+        #: Number of spans indexed, used to parse pending spans in the order they were read.
+        self._spans_indexed = 0
+
+        #: A dict that maps file source to its signature from :func:`localconfig.snapshot.source_key` when its spans
+        #: were indexed, as they are read by their byte offsets.
+        self._indexed = {}
+
+        #: List of :class:`localconfig.layers.Layer` for each source read, in the order they were read, so a changed
+        #: source can be re-applied incrementally on reload. None if the config can't be rebuilt from them, such as
+        #: when the sources are not parsed by the native parser or the config was loaded from snapshot.
+        self._layers = [] if self._native_parser and not lazy else None
+
+        #: A dict that maps (section, key) to the :class:`localconfig.layers.Layer` its value is from in overlay mode,
+        #: otherwise None. Keys set using :meth:`set` are not from any layer.
+        self._provenance = {} if overlay else None
+
+        #: Subscriptions to config changes
+        self._subscriptions = Subscriptions()
+
+        #: A dict that maps (section, key) to its typed value before the changes in the current batch.
+        self._changes = {}
+
+        #: Number of nested :meth:`batch` calls
+        self._batch_depth = 0
+
+        #: Share the config between threads, see :meth:`_publish`
+        self._concurrent = concurrent
+
+        #: Lock held by writers in concurrent mode
+        self._lock = threading.RLock()
+
+        #: Number of nested :meth:`_writing` calls
+        self._write_depth = 0
+
+        #: Tuple of (:class:`localconfig.frozen.FrozenConfig`, :class:`localconfig.frozen.FrozenSection` for
+        #: DEFAULTSECT) that readers get values from in concurrent mode. It is replaced as a whole by :meth:`_publish`.
+        self._state = None
+
+        #: Set of sections that changed since the state was published, or None if all of them may have changed.
+        self._unpublished = None
+
+        #: Schema for keys with declared types
+        self._schema = Schema(schema) if isinstance(schema, dict) else schema
+
+        #: A dict that maps section to a dict of key to converted value for keys in the schema. Sections are removed
+        #: when they change, and converted again on next access or by :meth:`_validate`.
+        self._schema_values = {}
+
+        #: Prefix of environment variables that override keys
+        self._env_prefix = env_prefix
+
+        #: Index of environment variables from :func:`localconfig.env.scan_environ`, which is empty if there are none.
+        self._env = scan_environ(env_prefix) if env_prefix else {}
+
+        #: A dict that maps section/key name as given to its name in `self._env`
+        self._env_names = {}
+
+        #: Config is only read, so comments are not collected
+        self._read_only = read_only
+
+        #: Read the files from include directives
+        self._includes = includes
+
+        #: List of real paths of files whose includes are being read, to detect include cycles.
+        self._including = []
+
+        #: A dict that maps directory/glob source to the list of files it had when it was read
+        self._expanded = {}
+
+        #: List of paths from include directives that were read, including directories and globs, so a snapshot can
+        #: tell if the included files changed.
+        self._included = []
+
+        #: A dict that maps file source to (signature, :class:`localconfig.parser.ParsedSource`, includes) from when it
+        #: was parsed by the native parser, so it is only parsed again if it changed.
+        self._parse_cache = {}
+
+        #: Layers added by :meth:`add_layer`, which are added again when the config is rebuilt.
+        self._added_layers = []
+
+        #: A dict that maps (section, key) set using :meth:`set` to its raw value from the sources before it was set,
+        #: or None if it was not in them, so it is set again when the config is rebuilt on reload unless the sources
+        #: changed it. Keys are removed when they are replaced with values from the sources.
+        self._set_keys = {}
+
+        #: List of sections added using :meth:`add_section`, which are added again when the config is rebuilt.
+        self._added_sections = []
+
+        #: Timings and counters for :meth:`stats`
+        self._stats = Stats()
+
+        #: Function to call with stats after sources are read and after save
+        self._stats_hook = stats_hook
+
+        #: Snapshot file for the compiled config
+        self._snapshot = None
+        if snapshot is True:
+            if not self._last_source:
+                raise ValueError('Snapshot location is required when last source is not set during instantiation')
+            self._snapshot = self._last_source + '.snapshot'
+        elif snapshot and os.path.isdir(os.path.expanduser(snapshot)):
+            name = os.path.basename(self._last_source) if self._last_source else 'localconfig'
+            self._snapshot = os.path.join(os.path.expanduser(snapshot), name + '.snapshot')
+        elif snapshot:
+            self._snapshot = os.path.expanduser(snapshot)
 
     @classmethod
     def _to_dot_key(cls, section, key=None):
         """ Return the section and key in dot notation format. """
-        if key:
-            return (NON_ALPHA_NUM.sub('_', section.lower()), NON_ALPHA_NUM.sub('_', key.lower()))
-        else:
-            return NON_ALPHA_NUM.sub('_', section.lower())
+        return to_dot_key(section, key)
 
     def _add_dot_key(self, section, key=None):
         """
@@ -116,6 +352,7 @@ class LocalConfig(object):
         else:
             self._dot_keys[self._to_dot_key(section)] = section
 
+    @synchronized
     def read(self, sources):
         """
         Queues the config sources to be read later (when config is accessed), or reads immediately if config has already
@@ -131,111 +368,714 @@ class LocalConfig(object):
         if not isinstance(sources, list):
             sources = [sources]
 
+        for i, source in enumerate(sources):
+            if isinstance(source, IOBase):
+                sources[i] = source.read()
+
         if self._sources_read:
             for source in sources:
                 all_read &= self._read(source)
+            self._sources_read_later.extend(sources)
+            self._check_interpolation()
+            self._validate()
         else:
-            for i, source in enumerate(sources):
-                if isinstance(source, IOBase):
-                    sources[i] = source.read()
             self._sources.extend(sources)
 
         return all_read
 
     def _read(self, source):
         """
-        Reads and parses the config source
+        Reads and parses the config source, and records its stats
 
         :param file/str source: Config source string, file name, or file pointer. If file name does not exist, it is
                                 ignored.
         :return: True if source was successfully read, otherwise False
         """
+        start, lines = time.perf_counter(), self._stats.lines_parsed
+
+        read = self._read_source(source)
+
+        self._stats.add_source(source, time.perf_counter() - start,
+                               source_size(source, self._file_signatures.get(source)),
+                               self._stats.lines_parsed - lines)
+        return read
 
+    def _read_source(self, source):
+        """ Same as :meth:`_read` without recording stats """
         if isinstance(source, str) and is_config(source):
+            if self._lazy:
+                self._add_spans(index_text(source))
+                return True
             source_fp = StringIO(source)
         elif isinstance(source, IOBase) or isinstance(source, StringIO):
+            if self._lazy:
+                self._add_spans(index_text(source.read()))
+                return True
             source_fp = source
-        elif os.path.exists(source):
-            source_fp = open(source)
+        elif is_directory(source) or is_pattern(source):
+            paths = self._expanded[source] = expand_source(source)
+            return all([self._read(path) for path in paths])
+        else:
+            signature = self._file_signatures[source] = source_key(source, True)
+
+            if not os.path.exists(source):
+                if self._layers is not None:
+                    self._add_layer(Layer(source, True, ParsedSource(source)))
+                return False
+
+            # Compressed files can't be indexed by their byte offsets, so they are parsed right away in lazy mode.
+            compression = detect_compression(source)
+
+            if self._lazy and not compression:
+                self._indexed[source] = signature
+                self._add_spans(index_file(source))
+                return True
+
+            if self._native_parser:
+                self._add_parsed(*self._parse_file(source, signature, compression), path=source)
+                return True
+
+            with open_source(source, compression) as source_fp:
+                self._read_fp(source_fp, source)
+            return True
+
+        self._read_fp(source_fp)
+
+        return True
+
+    def _read_fp(self, fp, path=None):
+        """
+        Parse the config from the file pointer
+
+        :param file fp: File pointer to parse
+        :param str path: Path of the file if it was opened from a file source
+        """
+        if self._native_parser:
+            parsed = parse(fp, comments=not self._read_only)
+            self._add_parsed(parsed, pop_includes(parsed, path) if self._includes else [], path)
+        elif self._read_only:
+            key_counts = dict((section, len(options)) for section, options in self._own_sections())
+            self._parser.read_file(fp)
+            self._add_dot_keys(key_counts)
+            self._mark_dirty()
         else:
+            self._parser.read_file(self._parse_extra(fp), getattr(fp, 'name', '<???>'))
+            self._mark_dirty()
+
+    def _parse_file(self, path, signature, compression=None):
+        """
+        Parse the file with the native parser, or get it from the parse cache if it has not changed since it was parsed.
+
+        :param str path: Path of the file
+        :param tuple signature: Signature of the file from :func:`localconfig.snapshot.source_key`
+        :param str compression: Compression of the file from :func:`localconfig.compression.detect_compression`
+        :return: Tuple of :class:`localconfig.parser.ParsedSource` and list of paths from its include directives
+        """
+        cached = self._parse_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1:]
+
+        with open_source(path, compression) as fp:
+            parsed = parse(fp, comments=not self._read_only)
+
+        return self._cache_parsed_file(path, signature, parsed)
+
+    def _cache_parsed_file(self, path, signature, parsed):
+        """
+        Put the parsed file into the parse cache of :meth:`_parse_file`, unless it came from there
+
+        :param str path: Path of the file
+        :param tuple signature: Signature of the file from :func:`localconfig.snapshot.source_key`
+        :param ParsedSource parsed: Result from :func:`localconfig.parser.parse`
+        :return: Same as :meth:`_parse_file`
+        """
+        cached = self._parse_cache.get(path)
+        if not cached or cached[1] is not parsed:
+            includes = pop_includes(parsed, path) if self._includes else []
+            cached = self._parse_cache[path] = (signature, parsed, includes)
+        return cached[1:]
+
+    def _cache_parsed(self, results, seen):
+        """
+        Put the files that were read by :func:`localconfig.sources.read_source` and parsed by the native parser into
+        the parse cache, so :meth:`_add_source` merges them (and the files they include) from the cache like
+        :meth:`_read` does.
+
+        :param list results: List of (source, signature, result) from reading the sources
+        :param set seen: Sources that were read already. The returned files are added to it.
+        :return: List of files from the include directives of the parsed sources that still need to be read
+        """
+        includes = []
+
+        for source, signature, result in results:
+            if self._lazy or not self._native_parser or result is None:
+                continue
+            if signature:
+                includes.extend(self._cache_parsed_file(source, signature, result)[1])
+            elif self._includes:
+                includes.extend(include_paths(result))
+
+        unread = []
+        for path in expand_sources(includes):
+            if path not in seen:
+                seen.add(path)
+                unread.append(path)
+
+        return unread
+
+    def _add_parsed(self, parsed, includes, path=None):
+        """
+        Merge the parsed source into the config, and read the files that it includes after it
+
+        :param ParsedSource parsed: Result from :func:`localconfig.parser.parse`
+        :param list includes: Paths from its include directives
+        :param str path: Path of the file if it is from a file source
+        """
+        self._merge(parsed)
+        if self._layers is not None:
+            self._add_layer(Layer(path, bool(path), parsed))
+
+        if not includes:
+            return
+
+        self._included.extend(includes)
+        self._including.append(os.path.realpath(path) if path else None)
+        try:
+            for include in self._expand(includes):
+                real_path = os.path.realpath(include)
+                if real_path in self._including:
+                    cycle = [including for including in self._including if including] + [real_path]
+                    raise ValueError('Include cycle: %s' % ' -> '.join(cycle))
+                self._read(include)
+        finally:
+            self._including.pop()
+
+    def _merge(self, parsed):
+        """
+        Merge a parsed source into the config
+
+        :param ParsedSource parsed: Result from :func:`localconfig.parser.parse`
+        """
+        self._set_raw_sections(parsed.sections)
+        self._stats.lines_parsed += parsed.lines
+        if not self._read_only:
+            self._comments.update(parsed.comments)
+        self._dot_keys.update(parsed.dot_keys)
+
+        for section in parsed.sections:
+            self._mark_dirty(section)
+
+    def _set_raw_sections(self, sections):
+        """
+        Set the raw values of the sections as they are, like ConfigParser does when it parses a source, which skips the
+        checks of :meth:`ConfigParser.set` (such as for a % in values with interpolation) that slow down reading.
+
+        :param dict sections: Dict of section to a dict of key (in lower case) to raw value
+        """
+        invalidate = self._interpolation.invalidate if isinstance(self._interpolation, CachingInterpolation) else None
+
+        for section, options in sections.items():
+            if section == DEFAULTSECT:
+                self._parser.defaults().update(options)
+            else:
+                if not self._parser.has_section(section):
+                    self._parser.add_section(section)
+                self._parser._sections[section].update(options)
+
+            if invalidate:
+                for key in options:
+                    invalidate(section, key)
+
+    def _add_source(self, source, signature, result):
+        """
+        Add the source that was read by :func:`localconfig.sources.read_source`
+
+        :param str source: Config source string or file name
+        :param tuple signature: Signature of file source, otherwise None
+        :param result: Result from :func:`localconfig.sources.read_source`
+        :return: True if source was successfully read, otherwise False
+        """
+        start, lines = time.perf_counter(), self._stats.lines_parsed
+
+        read = self._add_result(source, signature, result)
+
+        # Sources were read and parsed before, so only the time to merge them is known.
+        self._stats.add_source(source, time.perf_counter() - start, source_size(source, signature),
+                               self._stats.lines_parsed - lines)
+        return read
+
+    def _add_result(self, source, signature, result):
+        """ Same as :meth:`_add_source` without recording stats """
+        if signature:
+            self._file_signatures[source] = signature
+
+        if result is None:
+            if self._layers is not None:
+                self._add_layer(Layer(source, True, ParsedSource(source)))
             return False
 
-        self._parser.read_file(source_fp)
-        self._parse_extra(source_fp)
+        if self._lazy:
+            if signature and any(span.is_file for span in result[0]):
+                self._indexed[source] = signature
+            self._add_spans(*result)
+        elif signature and self._native_parser:
+            self._add_parsed(*self._cache_parsed_file(source, signature, result), path=source)
+        else:
+            path = source if signature else None
+            self._add_parsed(result, pop_includes(result, path) if self._includes else [], path)
 
         return True
 
+    def _add_layer(self, layer):
+        """
+        Add the layer that was merged into the config as the topmost layer
+
+        :param Layer layer: Layer to add
+        """
+        self._layers.append(layer)
+
+        if self._provenance is not None:
+            self._provenance.update(((section, key), layer)
+                                    for section, section_dict in layer.parsed.sections.items() for key in section_dict)
+
+    def _add_spans(self, spans, parsed_spans=None):
+        """
+        Add indexed sections to be parsed when they are accessed. The sections are added right away so they are
+        available in the same order as if they were parsed.
+
+        :param list spans: List of :class:`localconfig.index.Span`
+        :param dict parsed_spans: Dict of span to its :class:`localconfig.parser.ParsedSource` for spans that were
+                                  parsed already
+        """
+        self._mark_dirty()
+
+        for span in spans:
+            if span.section is None or span.section == DEFAULTSECT:
+                parsed = parsed_spans and parsed_spans.get(span)
+                self._merge(parsed or parse_span(span, comments=not self._read_only))
+                continue
+
+            if not self._parser.has_section(span.section):
+                self._parser.add_section(span.section)
+            self._add_dot_key(span.section)
+
+            self._pending.setdefault(span.section, []).append((self._spans_indexed, span))
+            self._spans_indexed += 1
+
+    def _load_section(self, section, parsed_spans=None):
+        """
+        Parse the pending spans for the section
+
+        :param str section: Section name or its dot notation name
+        :param dict parsed_spans: Dict of span to its :class:`localconfig.parser.ParsedSource` for spans that were
+                                  parsed already
+        """
+        if self._cross_section_interpolation:
+            return self._load_all()
+
+        section = self._dot_keys.get(section, section)
+        if section not in self._pending:
+            return
+
+        self._reindex_changed([section])
+        spans = self._pending.pop(section, None)
+
+        if spans:
+            for _, span in spans:
+                parsed = parsed_spans and parsed_spans.get(span)
+                self._merge(parsed or parse_span(span, comments=not self._read_only))
+            self._check_interpolation([section])
+
+    def _load_all(self):
+        """ Parse all pending spans """
+        self._reindex_changed(self._pending)
+        spans = [span for spans in self._pending.values() for span in spans]
+        sections = list(self._pending)
+        self._pending = {}
+
+        for _, span in sorted(spans, key=lambda s: s[0]):
+            self._merge(parse_span(span, comments=not self._read_only))
+
+        if sections:
+            self._check_interpolation(sections)
+
+    def _reindex_changed(self, sections):
+        """
+        Index the files of the pending spans of the sections again if they changed since they were indexed, and replace
+        their pending spans (for all sections) with the new ones. Sections that were parsed already are left as is,
+        and so are sections that were added to the files, which :meth:`reload` updates.
+
+        :param iter sections: Sections whose pending spans are about to be parsed
+        """
+        paths = set(span.source for section in sections for _, span in self._pending.get(section, ()) if span.is_file)
+
+        for path in paths:
+            signature = source_key(path, True)
+            if signature == self._indexed.get(path):
+                continue
+            self._indexed[path] = signature
+
+            try:
+                spans = index_file(path)
+            except FileNotFoundError:
+                spans = []
+
+            new_spans = {}
+            for span in spans:
+                new_spans.setdefault(span.section, []).append(span)
+
+            for section, pending in self._pending.items():
+                order = next((order for order, span in pending if span.is_file and span.source == path), None)
+                if order is None:
+                    continue
+
+                pending[:] = [(span_order, span) for span_order, span in pending
+                              if not span.is_file or span.source != path]
+                pending.extend((order, span) for span in new_spans.get(section, []))
+                pending.sort(key=lambda s: s[0])
+
+    @synchronized
     def __str__(self):
+        return '\n'.join(self.iter_lines())
+
+    def iter_lines(self, as_template=False):
+        """
+        Serialize the config one line at a time, without building the whole output in memory.
+
+        :param bool as_template: Comment out all keys and sections
+        :return: Generator of lines without line endings
+        """
+        if as_template:
+            for line in template_lines(self.iter_lines()):
+                yield line
+            return
+
         self._read_sources()
+        self._load_all()
+
+        first = True
 
-        output = []
-        extra_newline = '' if self._compact_form else '\n'
-        default_keys = set()
+        for section, proxy in self._iter_sections():
+            if section not in self._comments and not first:
+                yield ''
+            first = False
 
+            for line in self._iter_section_lines(section, proxy):
+                yield line
+
+        for line in self._iter_last_comment_lines():
+            yield line
+
+    @synchronized
+    def write(self, fp, as_template=False):
+        """
+        Write the config to the file object in chunks, without building the whole output in memory.
+
+        :param file fp: File object to write to, opened in text mode.
+        :param bool as_template: Comment out all keys and sections
+        """
+        write_lines(fp, self.iter_lines(as_template))
+
+    def _iter_sections(self):
+        """ :return: Generator of (section, proxy) for sections to serialize, which are the non-empty ones. """
         for section, proxy in self._parser.items():
-            if not len(proxy):
-                continue
+            if len(proxy):
+                yield section, proxy
 
-            if section == DEFAULTSECT:
-                default_keys = set(proxy)
+    def _iter_section_lines(self, section, proxy, as_template=False):
+        """
+        Serialize the section with its comment one line at a time. Keys from DEFAULTSECT are not included.
+
+        :param str section: Section to serialize
+        :param SectionProxy proxy: Section proxy from the parser
+        :param bool as_template: Comment out all keys and sections
+        :return: Generator of lines without line endings
+        """
+        lines = self._section_lines(section, proxy)
+        return template_lines(lines) if as_template else lines
 
-            if section in self._comments:
-                output.append(self._comments[section])
-            elif output:
-                output.append('')
+    def _section_lines(self, section, proxy):
+        """ Generator for :meth:`_iter_section_lines` """
+        default_keys = self._parser.defaults() if section != DEFAULTSECT else {}
+        indent = ' ' * self._indent_spaces
 
-            output.append('[%s]%s' % (section, extra_newline))
+        if section in self._comments:
+            for line in self._comments[section].split('\n'):
+                yield line
 
-            for key, value in proxy.items():
-                if section != DEFAULTSECT and key in default_keys:
-                    continue
+        yield '[%s]' % section
+        if not self._compact_form:
+            yield ''
+
+        for key, value in proxy.items():
+            if key in default_keys:
+                continue
+
+            if (section, key) in self._comments:
+                for line in self._comments[(section, key)].split('\n'):
+                    yield line
+
+            lines = value.split('\n')
+            yield '%s%s%s' % (key, self._kv_sep, lines[0])
+            for line in lines[1:]:
+                yield indent + line
 
-                if (section, key) in self._comments:
-                    output.append(self._comments[(section, key)])
-                value = ('\n' + ' ' * self._indent_spaces).join(value.split('\n'))
-                output.append('%s%s%s%s' % (key, self._kv_sep, value, extra_newline))
+            if not self._compact_form:
+                yield ''
 
+    def _iter_last_comment_lines(self):
+        """ Lines of the comment at the end of the config """
         if self.LAST_COMMENT_KEY in self._comments:
-            output.append(self._comments[self.LAST_COMMENT_KEY])
+            for line in self._comments[self.LAST_COMMENT_KEY].split('\n'):
+                yield line
+
+    def _mark_dirty(self, section=None):
+        """
+        Mark the section as changed, so :meth:`save` serializes it again, while the other sections are copied from
+        the file that was saved last time. In concurrent mode, it is also frozen again by :meth:`_publish`.
+
+        :param str section: Section that changed. All sections are marked if it is None or DEFAULTSECT (as other
+                            sections inherit its keys), or if interpolation can reference other sections.
+        """
+        if section is None or section == DEFAULTSECT or self._cross_section_interpolation:
+            self._saved_spans.clear()
+            self._unpublished = None
+            self._schema_values.clear()
+        else:
+            self._saved_spans.pop(section, None)
+            if self._unpublished is not None:
+                self._unpublished.add(section)
+            self._schema_values.pop(section, None)
+
+        # Options may have been changed without going thru ConfigParser.set, which invalidates the cached values.
+        if section is None and isinstance(self._interpolation, CachingInterpolation):
+            self._interpolation.clear()
+
+    def _check_interpolation(self, sections=None):
+        """
+        Check for interpolation reference cycles after sources are read, so they fail up front instead of on access.
+
+        :param list sections: Sections to check. Defaults to DEFAULTSECT and all sections.
+        :raise InterpolationDepthError: if an option references itself
+        """
+        if isinstance(self._interpolation, CachingInterpolation):
+            self._interpolation.check_cycles(self._parser, sections)
+
+    def _validate(self):
+        """
+        Convert and validate sections in the schema that changed since they were validated, so invalid values fail up
+        front instead of on access.
+
+        :raise SchemaError: with the invalid values from all sections.
+        """
+        if not self._schema:
+            return
+
+        errors = []
+        for section in self._schema.sections:
+            try:
+                self._schema_section(self._dot_keys.get(section, section))
+            except SchemaError as e:
+                errors.extend(e.errors)
 
-        return '\n'.join(output)
+        if errors:
+            raise SchemaError(errors)
 
-    def save(self, target_file=None, as_template=False):
+    def _schema_section(self, section):
         """
-        Save the config
+        :param str section: Actual section name, or the name as given if it doesn't exist.
+        :return: Dict of key to converted value for keys of the section in the schema, or None if it is not in it.
+        :raise SchemaError: if a value of the section is invalid.
+        """
+        values = self._schema_values.get(section)
+        if values is not None:
+            return values
+
+        if not self._schema.table(section):
+            return None
+
+        if self._pending:
+            self._load_section(section)
+
+        exists = section == DEFAULTSECT or self._parser.has_section(section)
+        values = self._schema.apply(section, dict(self._raw_items(section)) if exists else {})
+        self._schema_values[section] = values
+
+        return values
+
+    def _schema_key(self, section, key):
+        """
+        :return: Key for the default value from the schema of the key, which is stored by its name in the schema as it
+                 is not set in the config, or None if it is not in the schema.
+        """
+        name = self._schema.key_name(section, key)
+        return name and self._parser.optionxform(name)
+
+    @synchronized
+    def save(self, target_file=None, as_template=False, compression=None):
+        """
+        Save the config atomically (see :func:`localconfig.sources.write_file`). Sections that have not changed since
+        the last save to the same file are copied from it instead of being serialized again, unless the file has been
+        changed since then or it is compressed.
 
         :param str target_file: File to save to. Defaults to `self._last_source` if set
         :param bool as_template: Save the config with all keys and sections commented out for user to modify
-        :raise AttributeError: if target file is not provided and `self._last_source` is not set
+        :param str compression: Compress the file with 'gzip', 'bz2' or 'xz' as it is written. Defaults to the
+                                compression of the existing file, or from the extension of a new file (.gz, .bz2 or
+                                .xz). See :func:`localconfig.compression.save_compression`.
+        :raise AttributeError: if target file is not provided and `self._last_source` is not set, or the config is
+                               read-only.
         """
+        self._check_writable()
+
         self._read_sources()
+        self._load_all()
+
+        self._save(target_file, as_template, compression)
+
+    @synchronized
+    def _save(self, target_file, as_template, compression):
+        """ Same as :meth:`save` after the sources are read and all sections are parsed """
+        start = time.perf_counter()
+        target_file = self._save_target(target_file)
+        compression = compression or save_compression(target_file)
+        spans = {}
+
+        if compression:
+            write_file(target_file, lambda fp: self._write_compressed(fp, compression, self.iter_lines(as_template)))
+        else:
+            write_file(target_file, lambda fp: self._write_spliced(fp, target_file, as_template, spans))
+
+        self._saved_file = (target_file, source_key(target_file, True), as_template)
+        self._saved_spans = spans
+        self._record_save(start, target_file)
+
+    def _record_save(self, start, target_file):
+        """
+        Record the time to save, and call the stats hook
+
+        :param float start: Time from :func:`time.perf_counter` when the save started
+        :param str target_file: File that was saved to
+        """
+        seconds = time.perf_counter() - start
+        self._stats.add_save(seconds)
+
+        if self._stats_hook:
+            self._stats_hook('save', {'file': target_file, 'time': seconds})
+
+    def _write_spliced(self, fp, target_file, as_template, spans):
+        """
+        Write the config to the file, copying the sections that have not changed from the last saved file.
+
+        :param file fp: File object to write to, opened in binary mode.
+        :param str target_file: File that is being saved to
+        :param bool as_template: Comment out all keys and sections
+        :param dict spans: Dict to update with section to its (start, end) byte offsets in the file
+        """
+        saved_spans = self._saved_spans
+        if saved_spans and self._saved_file != (target_file, source_key(target_file, True), as_template):
+            saved_spans = {}
+
+        encoding = locale.getpreferredencoding(False)
+        saved_fp = open(target_file, 'rb') if saved_spans else None
+        position = 0
+
+        try:
+            for section, proxy in self._iter_sections():
+                if position:
+                    position += fp.write(b'\n' if section in self._comments else b'\n\n')
+
+                if section in saved_spans:
+                    start, end = saved_spans[section]
+                    saved_fp.seek(start)
+                    size = fp.write(saved_fp.read(end - start))
+                else:
+                    size = write_lines(fp, self._iter_section_lines(section, proxy, as_template), encoding)
+
+                spans[section] = (position, position + size)
+                position += size
+
+            if self.LAST_COMMENT_KEY in self._comments and position:
+                fp.write(b'\n')
+            lines = self._iter_last_comment_lines()
+            write_lines(fp, template_lines(lines) if as_template else lines, encoding)
+
+        finally:
+            if saved_fp:
+                saved_fp.close()
+
+    @staticmethod
+    def _write_compressed(fp, compression, lines):
+        """
+        Compress the lines as they are written to the file
+
+        :param file fp: File object to write to, opened in binary mode.
+        :param str compression: 'gzip', 'bz2' or 'xz'
+        :param iter lines: Iterable of lines without line endings
+        """
+        with open_compressed(fp, compression, 'wb') as compressed_fp:
+            write_lines(compressed_fp, lines, locale.getpreferredencoding(False))
 
+    def _save_target(self, target_file=None):
+        """
+        :param str target_file: File to save to. Defaults to `self._last_source` if set
+        :raise AttributeError: if target file is not provided and `self._last_source` is not set
+        """
         if not target_file:
             if not self._last_source:
                 raise AttributeError('Target file is required when last source is not set during instantiation')
             target_file = self._last_source
 
-        output = str(self)
+        return target_file
 
-        if as_template:
-            output_tmpl = []
-            for line in output.split('\n'):
-                if line and not line.startswith('#'):
-                    line = '# %s' % line
-                output_tmpl.append(line)
-            output = '\n'.join(output_tmpl)
+    def _own_options(self, section):
+        """ :return: Dict of the own keys and raw values of the section, which is empty if it doesn't exist """
+        return self._parser.defaults() if section == DEFAULTSECT else self._parser._sections.get(section, {})
+
+    def _own_sections(self):
+        """ :return: List of (section, dict of its own keys and raw values), with DEFAULTSECT first if it has keys """
+        sections = [(DEFAULTSECT, self._parser.defaults())] if self._parser.defaults() else []
+        sections.extend(self._parser._sections.items())
+        return sections
+
+    def _add_dot_keys(self, key_counts):
+        """
+        Create maps for dot notation lookup for the sections and keys that were parsed from a source, like
+        :meth:`_parse_extra` without comments. Parsing only adds keys to the end of a section, so only the keys after
+        the number that the section had before are new.
 
-        with open(target_file, 'w') as fp:
-            fp.write(output)
+        :param dict key_counts: Dict of section to its number of keys from :meth:`_own_sections` before the source was
+                                parsed
+        """
+        for section, options in self._own_sections():
+            count = key_counts.get(section)
+            if count == len(options):
+                continue
+
+            if count is None:
+                self._add_dot_key(section)
+            for key in islice(options, count or 0, None):
+                self._add_dot_key(section, key)
+
+    def _check_writable(self):
+        """ :raise AttributeError: if the config is read-only """
+        if self._read_only:
+            raise AttributeError('Config is read-only')
 
     def _parse_extra(self, fp):
-        """ Parse and store the config comments and create maps for dot notion lookup """
+        """
+        Parse and store the config comments and create maps for dot notion lookup, while passing the lines thru to
+        ConfigParser, so the source is only read once and does not have to be seekable (like a compressed file).
 
+        :param iter fp: File pointer or any iterable of lines
+        :return: Generator of the lines as is
+        """
         comment = ''
         section = ''
 
-        fp.seek(0)
-        for line in fp:
+        lines = 0
+        for lines, line in enumerate(fp, 1):
+            yield line
             line = line.rstrip()
 
             if not line:
@@ -264,6 +1104,8 @@ class LocalConfig(object):
         if comment:
             self._comments[self.LAST_COMMENT_KEY] = comment
 
+        self._stats.lines_parsed += lines
+
     def get(self, section, key, default=NO_DEFAULT_VALUE):
         """
         Get config value with data type transformation (from str)
@@ -274,11 +1116,30 @@ class LocalConfig(object):
         :return: Value for the section/key or `default` if set and key does not exist.
                  If not default is set, then return None.
         """
+        if self._concurrent:
+            return self._get_published(section, key, default)
+
         self._read_sources()
 
+        if self._pending:
+            self._load_section(section)
+
         if (section, key) in self._dot_keys:
             section, key = self._dot_keys[(section, key)]
 
+        if self._env:
+            value = self._env_value(self._dot_keys.get(section, section), key)
+            if value is not None:
+                return self._env_typed_value(section, key, value)
+
+        if self._schema:
+            values = self._schema_section(self._dot_keys.get(section, section))
+            key = self._parser.optionxform(key)
+            if values:
+                name = key if key in values else self._schema_key(section, key)
+                if name in values:
+                    return values[name]
+
         try:
             value = self._parser.get(section, key)
         except Exception:
@@ -289,6 +1150,7 @@ class LocalConfig(object):
 
         return self._typed_value(value)
 
+    @synchronized
     def set(self, section, key, value, comment=None):
         """
         Set config value with data type transformation (to str)
@@ -297,10 +1159,15 @@ class LocalConfig(object):
         :param str key: Key to set config for
         :param value: Value for key. It can be any primitive type.
         :param str comment: Comment for the key
+        :raise AttributeError: if the config is read-only.
         """
+        self._check_writable()
 
         self._read_sources()
 
+        if self._pending:
+            self._load_section(section)
+
         if (section, key) in self._dot_keys:
             section, key = self._dot_keys[(section, key)]
         elif section in self._dot_keys:
@@ -309,7 +1176,30 @@ class LocalConfig(object):
         if not isinstance(value, str):
             value = str(value)
 
-        self._parser.set(section, key, value)
+        if self._schema:
+            self._schema.convert(section, key, value)
+
+        if isinstance(self._interpolation, CachingInterpolation):
+            self._interpolation.check_cycles(self._parser, None if section == DEFAULTSECT else [section],
+                                             {(section, self._parser.optionxform(key)): value})
+
+        with self.batch():
+            self._track_changes([(section, key)])
+
+            if self._parser.has_option(section, key):
+                self._value_cache.discard(self._parser.get(section, key, raw=True))
+
+            set_key = (section, self._parser.optionxform(key))
+            source_value = self._own_options(section).get(set_key[1])
+
+            self._parser.set(section, key, value)
+            self._mark_dirty(section)
+
+            if set_key not in self._set_keys:
+                self._set_keys[set_key] = source_value
+
+            if self._provenance:
+                self._provenance.pop((section, self._parser.optionxform(key)), None)
 
         self._add_dot_key(section, key)
         if comment:
@@ -319,32 +1209,1005 @@ class LocalConfig(object):
         if self._sources_read:
             return
 
-        for source in self._sources:
-            self._read(source)
-
-        if self._last_source:
-            self._read(self._last_source)
+        # Sources are read once even if many threads get here at the same time in concurrent mode
+        with self._writing():
+            if not self._sources_read:
+                start, first_source = time.perf_counter(), len(self._stats.sources)
+                self._load_sources()
+                self._record_read(start, first_source)
+                self._validate()
 
-        self._sources_read = True
+    def _record_read(self, start, first_source):
+        """
+        Record the time to read the sources, and call the stats hook
+
+        :param float start: Time from :func:`time.perf_counter` when the read started
+        :param int first_source: Index of the first source read in `self._stats.sources`
+        """
+        seconds = time.perf_counter() - start
+        self._stats.read_time += seconds
+
+        if self._stats_hook:
+            self._stats_hook('read', {'time': seconds, 'sources': self._stats.sources[first_source:]})
+
+    def _load_sources(self):
+        """ Read `self._sources` and `self._last_source` """
+        if self._snapshot:
+            snapshot_key = self._snapshot_key()
+            if self._load_snapshot(snapshot_key):
+                self._sources_read = True
+                return
+
+        if self._parallel:
+            for result in self._read_parallel(self._all_sources()):
+                self._add_source(*result)
+        else:
+            for source in self._sources:
+                self._read(source)
+
+            if self._last_source:
+                self._read(self._last_source)
+
+        self._sources_read = True
+        self._check_interpolation()
+
+        if self._snapshot:
+            self._save_snapshot(snapshot_key)
+
+    def _read_parallel(self, sources):
+        """
+        Read and parse the sources, and then the files that they include, concurrently without changing the config
+
+        :param list sources: Config sources that were expanded by :meth:`_expand`
+        :return: List of (source, signature, result) for :meth:`_add_source`
+        """
+        from localconfig.parallel import read_sources  # concurrent.futures is slow to import
+
+        threads = None if self._parallel is True else self._parallel
+
+        def read(sources):
+            results = read_sources(sources, self._lazy, threads, self._parse_processes, not self._read_only,
+                                   self._parse_cache)
+            return [(source,) + result for source, result in zip(sources, results)]
+
+        results = read(sources)
+        seen = set(sources)
+        includes = self._cache_parsed(results, seen)
+        while includes:
+            includes = self._cache_parsed(read(includes), seen)
+
+        return results
+
+    def _all_sources(self):
+        """ :return: List of `self._sources` and `self._last_source`, in the order they are read """
+        return self._expand(self._sources + [self._last_source] if self._last_source else self._sources)
+
+    def _expand(self, sources):
+        """
+        :param list sources: List of config sources
+        :return: List of sources with directory/glob sources expanded into their files, which are remembered so
+                 :meth:`reload` can find files that are added or removed.
+        """
+        for source in sources:
+            if is_directory(source) or is_pattern(source):
+                self._expanded[source] = expand_source(source)
+        return expand_sources(sources)
+
+    def _snapshot_key(self):
+        """ Key that identifies the content of all sources, and if comments are collected from them """
+        return tuple(source_key(source, not (isinstance(source, str) and is_config(source)))
+                     for source in self._all_sources()) + (('comments', not self._read_only),)
+
+    def _load_snapshot(self, key, snapshot=None):
+        """
+        Load the config from snapshot
+
+        :param key: Key from :meth:`self._snapshot_key`
+        :param dict snapshot: Snapshot that was loaded for the key already
+        :return: True if snapshot was loaded, or False if it does not exist or is out of date.
+        """
+        snapshot = snapshot or self._find_snapshot(key)
+        if not snapshot:
+            return False
+
+        includes = snapshot['includes']
+        self._layers = None
+        self._file_signatures = dict((source_key[1], source_key) for source_key in key if source_key[0] == 'file')
+        for include, (paths, keys) in includes:
+            if is_directory(include) or is_pattern(include):
+                self._expanded[include] = list(paths)
+            self._file_signatures.update((path, key) for path, key in zip(paths, keys))
+        self._included = [include for include, _ in includes]
+
+        self._set_raw_sections(snapshot['sections'])
+        self._comments.update(snapshot['comments'])
+        self._dot_keys.update(snapshot['dot_keys'])
+        self._value_cache.update(snapshot['values'])
+        self._mark_dirty()
+
+        return True
+
+    def _find_snapshot(self, key):
+        """
+        :param key: Key from :meth:`self._snapshot_key`
+        :return: Snapshot for the key from :func:`localconfig.snapshot.load_snapshot`, or None if it does not exist or
+                 is out of date. Included files are only known after the sources are parsed, so they are not in the
+                 key and are checked against the snapshot instead.
+        """
+        snapshot = load_snapshot(self._snapshot, key)
+        if snapshot and all(include_key(include) == paths_keys for include, paths_keys in snapshot['includes']):
+            return snapshot
+
+    def _save_snapshot(self, key):
+        """
+        Save the config to snapshot. Failure is ignored as the snapshot is only an optimization.
+
+        :param key: Key from :meth:`self._snapshot_key`
+        """
+        self._load_all()
+        self._write_snapshot(key, self._snapshot_content())
+
+    def _snapshot_content(self):
+        """ :return: Dict of content to save in snapshot """
+        sections = self._raw_sections()
+        values = dict((value, self._typed_value(value)) for section in sections.values() for value in section.values())
+
+        return dict(sections=sections, comments=dict(self._comments), dot_keys=dict(self._dot_keys), values=values,
+                    includes=[(include, include_key(include)) for include in self._included])
+
+    def _write_snapshot(self, key, content):
+        """ Write the snapshot content. Failure is ignored as the snapshot is only an optimization. """
+        try:
+            save_snapshot(self._snapshot, key, **content)
+        except OSError:
+            pass
+
+    def _raw_sections(self):
+        """
+        :return: Dict of section (including DEFAULTSECT) to a dict of its own keys and their raw values
+        """
+        sections = {DEFAULTSECT: dict(self._parser.defaults())}
+        sections.update((section, dict(self._parser._sections[section])) for section in self._parser.sections())
+        return sections
+
+    @synchronized
+    def reload(self):
+        """
+        Reload file sources (including `last_source`) that have changed since they were read, based on their mtime,
+        size and inode. Only the changed files are parsed again, and only the keys from them are updated when the
+        sources are parsed by the native parser (non-lazy). Otherwise, the config is rebuilt from all sources.
+
+        Values set using :meth:`set` for keys in changed files are replaced with values from the sources. Other values
+        set using :meth:`set` and sections added using :meth:`add_section` are kept.
+
+        :return: Set of (section, key) that were changed, added or removed.
+        """
+        if not self._sources_read:
+            return set()
+
+        changed = self._changed_files()
+        if not changed:
+            return set()
+
+        with self.batch():
+            if self._rebuild_on_reload(changed):
+                changed_keys = self._rebuild(changed)
+            else:
+                changed_keys = self._reload_layers(changed)
+
+            if self._subscriptions:
+                for key in changed_keys:
+                    self._changes.setdefault(key, None)
+
+        self._validate()
+
+        return changed_keys
+
+    @synchronized
+    def add_layer(self, source, name=None):
+        """
+        Add a config source as the topmost layer in overlay mode, such as settings for a tenant, and apply its keys.
+
+        :param str source: Config source string or file name
+        :param str name: Name of the layer, which is returned by :meth:`source_of` for its keys and can be used to
+                         remove it. Defaults to the file name, or '<string>' for config strings.
+        :return: The added layer
+        :rtype: :class:`localconfig.layers.Layer`
+        """
+        if self._provenance is None:
+            raise ValueError('Layers can only be added in overlay mode')
+
+        self._read_sources()
+
+        if is_config(source):
+            layer = Layer(None, False, parse(StringIO(source), comments=not self._read_only), name=name)
+        else:
+            self._file_signatures[source] = source_key(source, True)
+            layer = Layer(source, True, parse_file(source, comments=not self._read_only), name=name)
+
+        self._stats.lines_parsed += layer.parsed.lines
+        self._layers.append(layer)
+        self._added_layers.append(layer)
+
+        with self.batch():
+            changed_keys = self._apply_layers([layer], [])
+
+            if self._subscriptions:
+                for key in changed_keys:
+                    self._changes.setdefault(key, None)
+
+        self._validate()
+
+        return layer
+
+    @synchronized
+    def remove_layer(self, layer):
+        """
+        Remove a layer in overlay mode, and restore the values of its keys from the layers below it.
+
+        :param layer: :class:`localconfig.layers.Layer` from :meth:`add_layer`, or its name or file name
+        :return: Set of (section, key) that were changed or removed.
+        :raise ValueError: if the layer doesn't exist.
+        """
+        self._read_sources()
+
+        found = next((existing for existing in reversed(self._layers or [])
+                      if existing is layer or layer in (existing.name, existing.source)), None)
+        if not found:
+            raise ValueError('Layer %r does not exist' % (layer,))
+
+        self._layers.remove(found)
+        if found in self._added_layers:
+            self._added_layers.remove(found)
+        if found.is_file and not any(existing.source == found.source for existing in self._layers):
+            self._file_signatures.pop(found.source, None)
+
+        with self.batch():
+            changed_keys = self._apply_layers([], [found.parsed])
+
+            if self._subscriptions:
+                for key in changed_keys:
+                    self._changes.setdefault(key, None)
+
+        self._validate()
+
+        return changed_keys
+
+    def source_of(self, section, key):
+        """
+        Find where the value of the key is from in overlay mode
+
+        :param str section: Section of the key. It can be in dot notation format.
+        :param str key: Key to find. It can be in dot notation format.
+        :return: Name of the layer that the value is from, which is the file name or '<string>' for config strings by
+                 default, or None if the key doesn't exist or its value was set using :meth:`set`.
+        """
+        if self._provenance is None:
+            raise ValueError('Sources of keys are only tracked in overlay mode')
+
+        self._read_sources()
+
+        if (section, key) in self._dot_keys:
+            section, key = self._dot_keys[(section, key)]
+        elif section in self._dot_keys:
+            section = self._dot_keys[section]
+
+        key = self._parser.optionxform(key)
+        layer = self._provenance.get((section, key))
+        if layer is None and section != DEFAULTSECT and key not in self._parser._sections.get(section, {}):
+            layer = self._provenance.get((DEFAULTSECT, key))
+
+        return layer.name if layer else None
+
+    def _changed_files(self):
+        """ :return: Set of file sources that have changed since they were read, and directory/glob sources that have
+            files added or removed. """
+        changed = set(path for path, signature in self._file_signatures.items() if source_key(path, True) != signature)
+        changed.update(source for source, paths in self._expanded.items() if expand_source(source) != paths)
+        return changed
+
+    def _rebuild_on_reload(self, changed):
+        """
+        :param set changed: Sources that changed from :meth:`_changed_files`
+        :return: True if the config should be rebuilt from all sources instead of only updating the keys from changed
+                 layers, such as when files are added to a directory source or includes may have changed. Files that
+                 have not changed are not parsed again when the native parser is used.
+        """
+        return self._layers is None or self._includes or any(source in self._expanded for source in changed)
+
+    def _reload_layers(self, changed, parsed=None):
+        """
+        Parse the changed file layers and apply their changes
+
+        :param set changed: File sources that have changed
+        :param dict parsed: Dict of file source to (signature, :class:`localconfig.parser.ParsedSource`) for changed
+                            files that were parsed already. The parsed source is None if the file does not exist.
+        :return: Set of (section, key) that were changed, added or removed.
+        """
+        parsed = dict(parsed or {})
+
+        # Parse all of them before any layer is updated, so the config is unchanged if one of them is broken.
+        for source in set(layer.source for layer in self._layers if layer.is_file and layer.source in changed):
+            if source not in parsed:
+                parsed[source] = (source_key(source, True), parse_file(source, comments=not self._read_only))
+
+        old_layers = {}
+        for layer in self._layers:
+            if layer.is_file and layer.source in changed:
+                old_layers[id(layer)] = layer.parsed
+                signature, layer.parsed = parsed[layer.source]
+                layer.parsed = layer.parsed or ParsedSource(layer.source)
+                self._file_signatures[layer.source] = signature
+
+        return self._apply_layers([layer for layer in self._layers if id(layer) in old_layers],
+                                  list(old_layers.values()))
+
+    def _rebuild(self, changed, results=None, parsed_spans=None):
+        """
+        Rebuild the config from all sources. In lazy mode, sections that were not loaded before are not loaded.
+
+        :param set changed: Sources that changed from :meth:`_changed_files`
+        :param list results: List of (source, signature, result) for :meth:`_add_source` when all sources were read
+                             already by :meth:`areload`, otherwise they are read here.
+        :param dict parsed_spans: Dict of span to its :class:`localconfig.parser.ParsedSource` for the spans of
+                                  sections that were loaded, when they were parsed already in lazy mode
+        :return: Set of (section, key) that were changed, added or removed.
+        """
+        old_sections = self._loaded_sections()
+        self._track_changes((section, key) for section, keys in old_sections.items() for key in keys)
+
+        # The sources are parsed as they are read, so keep the current config to put back if one of them is broken.
+        state = self._save_state()
+        try:
+            self._reset()
+            if results is None:
+                self._read_sources()
+                for source in self._sources_read_later:
+                    self._read(source)
+            else:
+                for result in results:
+                    self._add_source(*result)
+                self._sources_read = True
+                self._check_interpolation()
+                self._validate()
+            self._read_added_layers()
+
+            # Only report changes for sections that were loaded before in lazy mode
+            for section in old_sections:
+                self._load_section(section, parsed_spans)
+
+            self._restore_runtime_changes(changed, old_sections, state['comments'])
+        except Exception:
+            self._restore_state(state)
+            raise
+
+        return self._changed_keys(old_sections, self._loaded_sections())
+
+    def _save_state(self):
+        """ :return: State of the config that :meth:`_reset` clears, which can be put back by :meth:`_restore_state` """
+        return dict(sections=[(section, self._parser._sections[section]) for section in self._parser.sections()],
+                    defaults=dict(self._parser.defaults()), comments=self._comments, dot_keys=self._dot_keys,
+                    pending=self._pending, indexed=self._indexed, file_signatures=self._file_signatures,
+                    included=self._included, stats_sources=self._stats.sources,
+                    expanded=dict(self._expanded), layers=self._layers, provenance=self._provenance,
+                    added_layers=[(layer, layer.parsed) for layer in self._added_layers],
+                    set_keys=dict(self._set_keys))
+
+    def _restore_state(self, state):
+        """
+        Put back the state of the config from before it was reset
+
+        :param dict state: State from :meth:`_save_state`
+        """
+        self._parser.clear()
+        self._parser.defaults().clear()
+        self._parser.defaults().update(state['defaults'])
+        for section, options in state['sections']:
+            self._parser.add_section(section)
+            self._parser._sections[section] = options
+
+        self._comments = state['comments']
+        self._dot_keys = state['dot_keys']
+        self._pending = state['pending']
+        self._indexed = state['indexed']
+        self._file_signatures = state['file_signatures']
+        self._included = state['included']
+        self._stats.sources = state['stats_sources']
+        self._expanded = state['expanded']
+        self._layers = state['layers']
+        self._provenance = state['provenance']
+        for layer, parsed in state['added_layers']:
+            layer.parsed = parsed
+        self._set_keys = state['set_keys']
+
+        self._value_cache.clear()
+        self._sources_read = True
+        self._mark_dirty()
+
+    def _read_added_layers(self):
+        """ Add the layers from :meth:`add_layer` again after the config was reset """
+        for layer in self._added_layers:
+            if layer.is_file:
+                self._file_signatures[layer.source] = source_key(layer.source, True)
+                layer.parsed = parse_file(layer.source, comments=not self._read_only)
+            self._merge(layer.parsed)
+            self._add_layer(layer)
+
+    def _restore_runtime_changes(self, changed, old_sections, old_comments):
+        """
+        Set the keys from :meth:`set` and add the sections from :meth:`add_section` again after the config was rebuilt,
+        except for keys in changed files or keys that the sources changed, which are replaced with the values from the
+        sources like :meth:`_reload_layers` does.
+
+        :param set changed: Sources that changed from :meth:`_changed_files`
+        :param dict old_sections: Sections from :meth:`_raw_sections` before the rebuild
+        :param dict old_comments: Comments from before the rebuild
+        """
+        for section in self._added_sections:
+            if not self._parser.has_section(section):
+                self._parser.add_section(section)
+                self._add_dot_key(section)
+                if section in old_comments:
+                    self._comments[section] = old_comments[section]
+
+        if not self._set_keys:
+            return
+
+        replaced = set()
+        for source in changed:
+            if source not in self._expanded:
+                parsed = parse_file(source, comments=False)
+                replaced.update((section, key) for section, options in parsed.sections.items() for key in options)
+
+        sections = {}
+        for (section, key), source_value in list(self._set_keys.items()):
+            value = old_sections.get(section, {}).get(key)
+            if value is None or (section, key) in replaced or self._own_options(section).get(key) != source_value:
+                del self._set_keys[(section, key)]
+                continue
+
+            sections.setdefault(section, {})[key] = value
+            self._add_dot_key(section, key)
+            if (section, key) in old_comments:
+                self._comments[(section, key)] = old_comments[(section, key)]
+
+        self._set_raw_sections(sections)
+        for section in sections:
+            self._add_dot_key(section)
+            self._mark_dirty(section)
+
+    def _loaded_sections(self):
+        """ :return: Same as :meth:`_raw_sections` without sections that are pending to be parsed in lazy mode """
+        sections = self._raw_sections()
+        for section in self._pending:
+            del sections[section]
+        return sections
+
+    def _reset(self):
+        """
+        Clear the config so its sources can be read again. Containers are replaced instead of cleared, so
+        :meth:`_save_state` can keep them as they are.
+        """
+        self._parser.clear()
+        self._parser.defaults().clear()
+        self._comments = {}
+        self._dot_keys = {}
+        self._value_cache.clear()
+        self._pending = {}
+        self._indexed = {}
+        self._file_signatures = {}
+        self._included = []
+        self._stats.sources = []
+        self._sources_read = False
+        self._mark_dirty()
+
+        if self._layers is not None:
+            self._layers = []
+        if self._provenance is not None:
+            self._provenance = {}
+
+    @staticmethod
+    def _changed_keys(old_sections, new_sections):
+        """
+        :param dict old_sections: Sections from :meth:`_raw_sections` before the change
+        :param dict new_sections: Sections from :meth:`_raw_sections` after the change
+        :return: Set of (section, key) that were changed, added or removed.
+        """
+        return set((section, key)
+                   for section in set(old_sections) | set(new_sections)
+                   for key in set(old_sections.get(section, {})) | set(new_sections.get(section, {}))
+                   if old_sections.get(section, {}).get(key) != new_sections.get(section, {}).get(key))
+
+    def _apply_layers(self, layers, old_parsed):
+        """
+        Apply changes from the layers, which were updated from the old parsed sources, to the config.
+
+        :param list layers: Layers that were updated
+        :param list old_parsed: :class:`localconfig.parser.ParsedSource` that the layers had before
+        :return: Set of (section, key) that were changed, added or removed.
+        """
+        keys = set()
+        sections = set()
+        comment_keys = set()
+        dot_keys = set()
+
+        for parsed in [layer.parsed for layer in layers] + old_parsed:
+            sections.update(parsed.sections)
+            keys.update((section, key) for section, section_dict in parsed.sections.items() for key in section_dict)
+            if not self._read_only:
+                comment_keys.update(parsed.comments)
+            dot_keys.update(parsed.dot_keys)
+
+        self._track_changes(keys)
+        for section in sections:
+            self._mark_dirty(section)
+
+        for section in sections:
+            if section != DEFAULTSECT and not self._parser.has_section(section):
+                self._parser.add_section(section)
+
+        changed = set()
+
+        for section, key in keys:
+            layer = topmost_layer(self._layers, section, key)
+            options = self._parser.defaults() if section == DEFAULTSECT else self._parser._sections[section]
+            old_value = options.get(key)
+            new_value = layer.parsed.sections[section][key] if layer else None
+
+            if self._provenance is not None:
+                if layer:
+                    self._provenance[(section, key)] = layer
+                else:
+                    self._provenance.pop((section, key), None)
+            self._set_keys.pop((section, key), None)
+
+            if old_value == new_value:
+                continue
+
+            if old_value is not None:
+                self._value_cache.discard(old_value)
+
+            if new_value is None:
+                del options[key]
+            else:
+                options[key] = new_value
+            if isinstance(self._interpolation, CachingInterpolation):
+                self._interpolation.invalidate(section, key)
+            changed.add((section, key))
+
+        for section in sections:
+            if section == DEFAULTSECT or topmost_layer(self._layers, section):
+                continue
+            if not self._parser._sections[section]:
+                self._parser.remove_section(section)
+
+        self._check_interpolation(None if DEFAULTSECT in sections else
+                                  [section for section in sections if self._parser.has_section(section)])
+
+        for key in comment_keys:
+            comment = next((layer.parsed.comments[key] for layer in reversed(self._layers)
+                            if key in layer.parsed.comments), None)
+            if comment is None:
+                self._comments.pop(key, None)
+            else:
+                self._comments[key] = comment
+
+        for key in dot_keys:
+            target = next((layer.parsed.dot_keys[key] for layer in reversed(self._layers)
+                           if key in layer.parsed.dot_keys), None)
+            if target is not None:
+                self._dot_keys[key] = target
+            elif key in self._dot_keys:
+                target = self._dot_keys[key]
+                if isinstance(target, tuple):
+                    exists = self._parser.has_option(*target)
+                else:
+                    exists = target == DEFAULTSECT or self._parser.has_section(target)
+                if not exists:
+                    del self._dot_keys[key]
+
+        return changed
+
+    def subscribe(self, pattern, callback):
+        """
+        Subscribe to changes from :meth:`set`, :meth:`add_section` and :meth:`reload` (including from :meth:`watch`)
+        for keys that match the pattern. The callback is called once per batch of changes (see :meth:`batch`).
+
+        :param str pattern: Key pattern in `section.key` format, where section or key can be `*` to match any, such as
+                            `web_server.port`, `web_server.*`, `*.port` or `*`. Names can be in dot notation format.
+        :param callable callback: Function to call with a dict of `section.key` (in dot notation format) to
+                                  (old value, new value) for the matching keys that changed. A value is None if the
+                                  key does not exist.
+        :return: Subscription that can be passed to :meth:`unsubscribe`
+        :rtype: :class:`localconfig.subscriptions.Subscription`
+        """
+        return self._subscriptions.subscribe(pattern, callback)
+
+    def unsubscribe(self, subscription):
+        """
+        Unsubscribe from changes
+
+        :param subscription: Subscription from :meth:`subscribe`
+        """
+        self._subscriptions.unsubscribe(subscription)
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager to notify subscribers once for all changes made within it::
+
+            with config.batch():
+                config.web_server.host = 'localhost'
+                config.web_server.port = 8080
+
+        In concurrent mode, the batch holds the lock and its changes are published all at once when it ends.
+        """
+        with self._writing():
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if not self._batch_depth and self._changes:
+                    self._notify()
+
+    def _track_changes(self, keys):
+        """
+        Remember the typed value of the keys before they are changed to notify subscribers after the batch.
+        Changes to DEFAULTSECT also change the keys in other sections that don't override it.
+
+        :param iter keys: Iterable of (section, key) that will be changed
+        """
+        if not self._subscriptions:
+            return
+
+        keys = list(keys)
+        for section, key in list(keys):
+            if section == DEFAULTSECT:
+                keys.extend((other_section, key) for other_section in self._parser.sections()
+                            if key not in self._parser._sections[other_section])
+
+        for key in keys:
+            if key not in self._changes:
+                self._changes[key] = self.get(*key)
+
+    def _notify(self):
+        """ Notify subscribers with the changes from :meth:`_track_changes` """
+        if self._concurrent:
+            self._publish()
+
+        changes = {}
+
+        for (section, key), old_value in self._changes.items():
+            new_value = self.get(section, key)
+            if old_value != new_value or type(old_value) is not type(new_value):
+                changes[self._to_dot_key(section, key)] = (old_value, new_value)
+        self._changes = {}
+
+        if changes:
+            self._subscriptions.dispatch(changes)
+
+    def watch(self, interval=1.0, callback=None, error_callback=None):
+        """
+        Watch file sources (including `last_source`) in a background thread and :meth:`reload` them when they
+        change. Uses inotify if available, otherwise polls every `interval` seconds.
+
+        The config is changed from the background thread, so this turns on concurrent mode (see `concurrent` in
+        :meth:`__init__`) for other threads to keep reading it while it is reloaded.
+
+        :param float interval: Seconds between polls, or the max delay to notice a change when inotify is used.
+        :param callable callback: Function to call with the set of (section, key) that changed after a reload.
+        :param callable error_callback: Function to call with the exception when a reload fails, such as when a file
+                                        is broken. Defaults to logging it. Watching continues either way.
+        :return: Watcher that is already started. Call its `stop` method to stop watching.
+        :rtype: :class:`localconfig.watch.Watcher`
+        """
+        from localconfig.watch import Watcher  # Imported when used to keep the import of this module fast
+
+        self._read_sources()
+
+        if not self._concurrent:
+            with self._lock:
+                self._concurrent = True
+                self._publish()
+
+        watcher = Watcher(self, interval=interval, callback=callback, error_callback=error_callback)
+        watcher.start()
+        return watcher
+
+    async def aread(self, sources=None):
+        """
+        Same as :meth:`read`, except the sources are read right away (along with queued sources and `last_source` if
+        they were not read yet) without blocking the event loop: file I/O runs in the default executor and sources are
+        parsed in chunks of lines. Sources are always parsed by the built-in parser from :mod:`localconfig.parser`,
+        and the files they include are read the same way before any of them is merged.
+
+        Concurrent calls share the same read of the queued sources.
+
+        :param file/str/list sources: Config source string, file name, or file pointer, or list of the other sources.
+                                      If file source does not exist, it is ignored. If None, only the queued sources
+                                      are read.
+        :return: True if all sources were successfully read, otherwise False
+        """
+        if sources is None:
+            sources = []
+        elif not isinstance(sources, list):
+            sources = [sources]
+
+        sources = [source.read() if isinstance(source, IOBase) else source for source in sources]
+
+        if not self._sources_read and not self._loading:
+            self._sources.extend(sources)
+            sources = []
+
+        await self._aread_sources()
+
+        all_read = True
+
+        if sources:
+            results = await self._aread_results(self._expand(sources))
+            with self._writing():
+                for result in results:
+                    all_read &= self._add_source(*result)
+                self._sources_read_later.extend(sources)
+                self._check_interpolation()
+                self._validate()
+
+        return all_read
+
+    async def aget_section(self, section):
+        """
+        Get a section after its sources are read (and it is parsed in lazy mode) without blocking the event loop.
+        Accessing its keys does not block after that.
+
+        :param str section: Section to get
+        :rtype: :class:`LocalConfig.SectionAccessor` or None if section doesn't exist.
+        """
+        await self._aread_sources()
+
+        if self._pending:
+            await self._aload_section(section)
+
+        if section in self._dot_keys:
+            return self.SectionAccessor(self, section)
+
+    async def asave(self, target_file=None, as_template=False, compression=None):
+        """
+        Same as :meth:`save`, but without blocking the event loop. The config is written in the default executor, so
+        it should not be changed until this returns unless it is in concurrent mode.
+
+        :param str target_file: File to save to. Defaults to `self._last_source` if set
+        :param bool as_template: Save the config with all keys and sections commented out for user to modify
+        :param str compression: Compress the file with 'gzip', 'bz2' or 'xz', see :meth:`save`.
+        :raise AttributeError: if target file is not provided and `self._last_source` is not set, or the config is
+                               read-only.
+        """
+        self._check_writable()
+
+        await self._aread_sources()
+
+        if self._pending:
+            await self._aload_sections(list(self._pending))
+
+        await run_blocking(self._save, target_file, as_template, compression)
+
+    async def areload(self):
+        """
+        Same as :meth:`reload`, but without blocking the event loop. Changed sources (and the files they include) are
+        read and parsed before the config is locked and any key is updated.
+
+        :return: Set of (section, key) that were changed, added or removed.
+        """
+        if not self._sources_read:
+            return set()
+
+        changed = await run_blocking(self._changed_files)
+        if not changed:
+            return set()
+
+        results = parsed_spans = parsed = None
+        if self._rebuild_on_reload(changed):
+            results = await self._aread_results(self._all_sources() + self._expand(self._sources_read_later))
+            if self._lazy:
+                parsed_spans = await self._aparse_loaded_spans(results)
+        else:
+            parsed = dict([(path, await read_source(path, comments=not self._read_only)) for path in changed])
+
+        with self.batch():
+            if results is not None:
+                changed_keys = self._rebuild(changed, results, parsed_spans)
+            else:
+                changed_keys = self._reload_layers(changed, parsed)
+
+            if self._subscriptions:
+                for key in changed_keys:
+                    self._changes.setdefault(key, None)
+
+        self._validate()
+
+        return changed_keys
+
+    async def _aread_results(self, sources):
+        """
+        Read and parse the sources, and then the files that they include, without changing the config
+
+        :param list sources: Config sources that were expanded by :meth:`_expand`
+        :return: List of (source, signature, result) for :meth:`_add_source`
+        """
+        comments = not self._read_only
+        results = [(source,) + await read_source(source, self._lazy, comments=comments, cache=self._parse_cache)
+                   for source in sources]
+
+        seen = set(sources)
+        includes = self._cache_parsed(results, seen)
+        while includes:
+            include_results = [(path,) + await read_source(path, comments=comments, cache=self._parse_cache)
+                               for path in includes]
+            includes = self._cache_parsed(include_results, seen)
+
+        return results
+
+    async def _aparse_loaded_spans(self, results):
+        """
+        Parse the spans of the sections that are loaded in the default executor, so :meth:`_rebuild` loads them again
+        without parsing them in lazy mode.
+
+        :param list results: List of (source, signature, result) from :meth:`_aread_results`
+        :return: Dict of span to its :class:`localconfig.parser.ParsedSource`
+        """
+        with self._lock:
+            loaded = set(self._loaded_sections())
+
+        spans = [span for _, _, result in results if result for span in result[0] if span.section in loaded]
+        return dict(zip(spans, await run_blocking(parse_spans, spans, not self._read_only)))
+
+    async def _aread_sources(self):
+        """ Same as :meth:`_read_sources`, but concurrent awaiters share the same in-flight read. """
+        if self._sources_read:
+            return
+
+        import asyncio  # Slow to import, so only when the async API is used
+
+        if not self._loading:
+            self._loading = asyncio.ensure_future(self._aload_sources())
+
+        await asyncio.shield(self._loading)
+
+    async def _aload_sources(self):
+        """
+        Read `self._sources` and `self._last_source`. They are parsed before any of them is added, so the config is
+        unchanged if it is accessed in the meantime, and the result is dropped if that read them synchronously.
+        """
+        start, first_source = time.perf_counter(), len(self._stats.sources)
+        try:
+            while not self._sources_read:
+                sources = self._all_sources()
+
+                if self._snapshot:
+                    snapshot_key = await run_blocking(self._snapshot_key)
+                    snapshot = await run_blocking(self._find_snapshot, snapshot_key)
+
+                    if snapshot and not self._sources_read and sources == self._all_sources():
+                        with self._writing():
+                            self._load_snapshot(snapshot_key, snapshot)
+                            self._sources_read = True
+                            self._validate()
+                        self._record_read(start, first_source)
+                        return
+
+                results = await self._aread_results(sources)
+
+                # Sources were read synchronously or more sources were queued while reading
+                if self._sources_read or sources != self._all_sources():
+                    continue
+
+                with self._writing():
+                    for result in results:
+                        self._add_source(*result)
+                    self._sources_read = True
+                    self._check_interpolation()
+                    self._validate()
+                self._record_read(start, first_source)
+
+                if self._snapshot:
+                    await self._aload_sections(list(self._pending))
+                    await run_blocking(self._write_snapshot, snapshot_key, self._snapshot_content())
+        finally:
+            self._loading = None
+
+    async def _aload_section(self, section):
+        """
+        Same as :meth:`_load_section`, but spans are parsed in the default executor.
+
+        :param str section: Section name or its dot notation name
+        """
+        if self._cross_section_interpolation:
+            return await self._aload_sections(list(self._pending))
+
+        await self._aload_sections([self._dot_keys.get(section, section)])
+
+    async def _aload_sections(self, sections):
+        """
+        Parse the pending spans for the sections in the default executor. Sections that were loaded or got more spans
+        in the meantime are left as is.
+
+        :param list sections: Sections to load
+        """
+        if not any(section in self._pending for section in sections):
+            return
+
+        with self._writing():
+            self._reindex_changed(sections)
+        pending = dict((section, list(self._pending[section])) for section in sections if section in self._pending)
+        if not pending:
+            return
+
+        spans = sorted((span for spans in pending.values() for span in spans), key=lambda s: s[0])
+        parsed_spans = await run_blocking(parse_spans, [span for _, span in spans], not self._read_only)
+
+        with self._writing():
+            loaded = set(section for section, spans in pending.items() if self._pending.get(section) == spans)
+            for section in loaded:
+                del self._pending[section]
+
+            for (_, span), parsed in zip(spans, parsed_spans):
+                if span.section in loaded:
+                    self._merge(parsed)
+
+            self._check_interpolation(loaded)
 
     def _typed_value(self, value):
         """ Transform string value to an actual data type of the same value. """
 
-        if value not in self._value_cache:
-            new_value = value
-            if is_int(value):
-                new_value = int(value)
-            elif is_int_base_n(value):
-                new_value = int(value, 0)
-            elif is_float(value):
-                new_value = float(value)
-            elif is_bool(value):
-                new_value = to_bool(value)
-            elif is_none(value):
-                new_value = None
-            self._value_cache[value] = new_value
-
-        return self._value_cache[value]
+        new_value = self._value_cache.get(value)
+
+        if new_value is NOT_CACHED:
+            new_value = typed_value(value)
+            self._value_cache.set(value, new_value)
+
+        return new_value
+
+    def freeze(self):
+        """
+        Create a read-only snapshot of the config with typed values stored as plain attributes, which is faster to
+        access than this config. Changes made to this config after the snapshot is created are not reflected in it.
+
+        In concurrent mode, this is the published state, which is not copied.
+
+        :rtype: :class:`localconfig.frozen.FrozenConfig`
+        """
+        if self._concurrent:
+            with self._lock:
+                self._read_sources()
+                self._load_all()
+                self._publish()
+                return self._state[0]
+
+        self._read_sources()
+        self._load_all()
+
+        return freeze(self)
+
+    def stats(self):
+        """
+        Get stats for where the config spends its time, such as to find out why the first access is slow. Sources are
+        not read by this. Times are in seconds.
+
+        :return: Dict of:
+
+                 * read_time: Time spent reading the sources, including parsing them.
+                 * sources: List of dict of source (file name or '<string>'), time, bytes and lines for each source
+                   read since the config was last read or rebuilt from all its sources (see :meth:`reload`). Time is
+                   only for merging the source when they are read by :meth:`aread` or in parallel.
+                 * bytes_read / lines_parsed: Totals for all sources. Lines include sections parsed on first access in
+                   lazy mode.
+                 * dot_keys / comments: Number of dot notation names and comments.
+                 * value_cache: Dict of hits, misses, evictions and size for the typed value cache.
+                 * saves / save_time: Number of saves and the time spent on them.
+        """
+        stats = self._stats.as_dict()
+        stats.update(dot_keys=len(self._dot_keys), comments=len(self._comments), value_cache=self._value_cache.stats())
+        return stats
 
     def __getattr__(self, section):
         """
@@ -353,10 +2216,14 @@ class LocalConfig(object):
         :param str section: Section to get
         :rtype: :class:`LocalConfig.SectionAccessor` or None if section doesn't exist.
         """
-        self._read_sources()
+        if self._concurrent:
+            if self._published_section(section) is not None:
+                return self.SectionAccessor(self, section)
+        else:
+            self._read_sources()
 
-        if section in self._dot_keys:
-            return self.SectionAccessor(self, section)
+            if section in self._dot_keys:
+                return self.SectionAccessor(self, section)
 
         # Default section
         attr = section
@@ -375,24 +2242,38 @@ class LocalConfig(object):
             setattr(self.SectionAccessor(self, DEFAULTSECT), attr, value)
 
     def __iter__(self):
+        if self._concurrent:
+            for section in self._published_state()[0]:
+                yield section
+            return
+
         self._read_sources()
 
         for section in self._parser.sections():
             yield section
 
+    @synchronized
     def add_section(self, section, comment=None):
         """
         Add a section
 
         :param str section: Section to add
         :raise DuplicateSectionError: if section already exist.
+        :raise AttributeError: if the config is read-only.
         """
+        self._check_writable()
+
         self._read_sources()
 
         if self._to_dot_key(section) in self._dot_keys:
             raise DuplicateSectionError(section)
 
-        self._parser.add_section(section)
+        with self.batch():
+            self._track_changes([(section, key) for key in self._parser.defaults()])
+            self._parser.add_section(section)
+            self._mark_dirty(section)
+            self._added_sections.append(section)
+
         self._add_dot_key(section)
         if comment:
             self._set_comment(section, comment)
@@ -415,6 +2296,8 @@ class LocalConfig(object):
         else:
             self._comments[section] = comment
 
+        self._mark_dirty(section)
+
     def items(self, section):
         """
         Items for section with data type transformation (from str)
@@ -422,12 +2305,346 @@ class LocalConfig(object):
         :param str section: Section to get items for.
         :return: Generator of (key, value) for the section
         """
+        if self._concurrent:
+            frozen_section = self._published_section(section)
+            if frozen_section is None:
+                raise NoSectionError(section)
+            for item in frozen_section:
+                yield item
+            return
+
         self._read_sources()
 
+        if self._pending:
+            self._load_section(section)
+
         if section in self._dot_keys:
             section = self._dot_keys[section]
 
+        values = self._schema_section(section) if self._schema else None
+        env_values = self._env_section(section) if self._env else None
+        keys = set()
+
         for item in self._parser.items(section):
             key, value = item
-            value = self._typed_value(value)
+            if env_values and key in env_values:
+                value = env_values[key]
+            else:
+                value = values[key] if values and key in values else self._typed_value(value)
+            keys.add(key)
             yield (key, value)
+
+        # Defaults from the schema and environment variables for keys that are not set
+        for extra_values in (values, env_values):
+            for key, value in (extra_values or {}).items():
+                if key not in keys:
+                    keys.add(key)
+                    yield (key, value)
+
+    def section_dict(self, section):
+        """
+        Get all items for the section in one pass, which is faster than :meth:`get` for each key or :meth:`items`.
+
+        :param str section: Section to get items for. It can be in dot notation format.
+        :return: Dict of key to value with data type transformation (from str), including keys from DEFAULTSECT,
+                 or None if section doesn't exist.
+        """
+        if self._concurrent:
+            frozen_section = self._published_section(section)
+            return None if frozen_section is None else dict(frozen_section._items)
+
+        self._read_sources()
+
+        if self._pending:
+            self._load_section(section)
+
+        return self._section_dict(self._dot_keys.get(section, section))
+
+    def get_many(self, keys, default=None):
+        """
+        Get the values for many keys in one pass, which is faster than :meth:`get` for each key.
+
+        :param iter keys: Iterable of (section, key), which can be in dot notation format.
+        :param default: Default value for keys that were not found.
+        :return: Dict of (section, key) as given to its value with data type transformation (from str)
+        """
+        keys = list(keys)
+
+        if self._concurrent:
+            return dict((section_key, self._get_published(section_key[0], section_key[1], default))
+                        for section_key in keys)
+
+        self._read_sources()
+
+        if self._pending:
+            for section in set(section for section, _ in keys):
+                self._load_section(section)
+
+        values = {}
+        sections = {}
+
+        for section_key in keys:
+            section, key = self._dot_keys.get(section_key, section_key)
+            section = self._dot_keys.get(section, section)
+
+            if section not in sections:
+                sections[section] = self._section_dict(section) or {}
+
+            name = self._parser.optionxform(key)
+            if name not in sections[section] and self._schema:
+                name = self._schema_key(section, key) or name
+            values[section_key] = sections[section].get(name, default)
+
+        return values
+
+    def as_dict(self):
+        """
+        Get the whole config in one pass.
+
+        :return: Dict of section to a dict of key to value with data type transformation (from str), which includes
+                 keys from DEFAULTSECT. DEFAULTSECT is only included if it has keys.
+        """
+        if self._concurrent:
+            config, default_section = self.freeze(), self._state[1]
+            sections = [(DEFAULTSECT, default_section)] if default_section._items else []
+            sections.extend(config._items)
+            return dict((section, dict(frozen_section._items)) for section, frozen_section in sections)
+
+        self._read_sources()
+        self._load_all()
+
+        sections = [DEFAULTSECT] if self._parser.defaults() else []
+        sections.extend(self._parser.sections())
+
+        return dict((section, self._section_dict(section)) for section in sections)
+
+    def _section_dict(self, section):
+        """
+        :param str section: Actual section name
+        :return: Dict of key to typed value for the section, including keys from DEFAULTSECT, or None if section
+                 doesn't exist.
+        """
+        if section != DEFAULTSECT and not self._parser.has_section(section):
+            return None
+
+        typed_value = self._typed_value
+        section_dict = dict((key, typed_value(value)) for key, value in self._raw_items(section))
+
+        if self._schema:
+            section_dict.update(self._schema_section(section) or ())
+
+        if self._env:
+            section_dict.update(self._env_section(section))
+
+        return section_dict
+
+    def _raw_items(self, section):
+        """
+        :param str section: Actual section name that exists
+        :return: Iterable of (key, value) for the section, including keys from DEFAULTSECT, with interpolated values
+                 if interpolation is enabled.
+        """
+        if self._interpolation:
+            return self._parser.items(section)
+        elif section == DEFAULTSECT:
+            return self._parser.defaults().items()
+        else:
+            items = dict(self._parser.defaults())
+            items.update(self._parser._sections[section])
+            return items.items()
+
+    @synchronized
+    def refresh_env(self):
+        """
+        Index the environment variables again, such as after they were changed by the program.
+
+        :return: Set of (section, key) in dot notation format that were changed, added or removed.
+        """
+        if not self._env_prefix:
+            return set()
+
+        env = scan_environ(self._env_prefix)
+        changed = set((section, key)
+                      for section in set(self._env) | set(env)
+                      for key in set(self._env.get(section, {})) | set(env.get(section, {}))
+                      if self._env.get(section, {}).get(key) != env.get(section, {}).get(key))
+
+        if changed:
+            with self.batch():
+                self._track_changes(changed)
+                self._env = env
+                self._mark_dirty()
+
+        return changed
+
+    def _env_name(self, name):
+        """ :return: Section/key name in `self._env` for the name """
+        env_name = self._env_names.get(name)
+        if env_name is None:
+            env_name = self._env_names[name] = env_section(name)
+        return env_name
+
+    def _env_value(self, section, key):
+        """
+        :param str section: Actual section name, or the name as given if it doesn't exist.
+        :param str key: Actual key name, or the name as given if it doesn't exist.
+        :return: Value from environment variables for the key, or None if there is none. Values for DEFAULTSECT
+                 are used for sections that don't set the key.
+        """
+        env_key = self._env_name(key)
+        env_values = self._env.get(self._env_name(section))
+        if env_values and env_key in env_values:
+            return env_values[env_key]
+
+        env_values = self._env.get(DEFAULTSECT)
+        if env_values and env_key in env_values and (
+                section == DEFAULTSECT or self._parser.optionxform(key) not in self._parser._sections.get(section, {})):
+            return env_values[env_key]
+
+        return None
+
+    def _env_section(self, section):
+        """
+        :param str section: Actual section name
+        :return: Dict of key to typed value from environment variables for the section, where keys are the names in
+                 the config if they are set in it.
+        """
+        env_values = self._env.get(self._env_name(section))
+        default_values = self._env.get(DEFAULTSECT) if section != DEFAULTSECT else None
+        if not env_values and not default_values:
+            return {}
+
+        own_keys = self._parser._sections.get(section, {}) if section != DEFAULTSECT else {}
+        keys = dict((self._env_name(key), key) for key in list(self._parser.defaults()) + list(own_keys))
+        values = {}
+
+        for env_key, value in (default_values or {}).items():
+            key = keys.get(env_key, env_key)
+            if key not in own_keys:
+                values[key] = self._env_typed_value(section, key, value)
+
+        for env_key, value in (env_values or {}).items():
+            key = keys.get(env_key, env_key)
+            values[key] = self._env_typed_value(section, key, value)
+
+        return values
+
+    def _env_typed_value(self, section, key, value):
+        """ :return: Value from environment variable converted by the schema if the key is in it, or typed value. """
+        convert = self._schema and self._schema.converter(section, key)
+        return self._schema.convert(section, key, value) if convert else self._typed_value(value)
+
+    @contextmanager
+    def _writing(self):
+        """
+        Context manager for changes to the config. In concurrent mode, it holds the lock and publishes the changes
+        when the outermost write ends. Otherwise, it does nothing.
+        """
+        if not self._concurrent:
+            yield
+            return
+
+        with self._lock:
+            self._write_depth += 1
+            try:
+                yield
+            finally:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._publish()
+
+    def _publish(self):
+        """
+        Freeze the config into a new state for readers in concurrent mode, and replace the published state with it.
+        Sections that have not changed since the last publish are reused from the published state. Must be called with
+        the lock held.
+        """
+        if not self._sources_read or self._state and self._unpublished is not None and not self._unpublished:
+            return
+
+        published = dict(self._state[0]._items) if self._state and self._unpublished is not None else {}
+        sections = [(section, published[section] if section in published and section not in self._unpublished
+                     else self._frozen_section(section))
+                    for section in self._parser.sections()]
+        default_section = self._state[1] if published else self._frozen_section(DEFAULTSECT)
+
+        self._state = (freeze_config(list(default_section), sections), default_section)
+        self._unpublished = set()
+
+    def _frozen_section(self, section):
+        """
+        :param str section: Actual section name
+        :return: Frozen section with typed values, which leaves out keys that fail to interpolate.
+        :rtype: :class:`localconfig.frozen.FrozenSection`
+        """
+        try:
+            return freeze_section(list(self._section_dict(section).items()))
+        except InterpolationError:
+            pass
+
+        items = []
+        for key in self._parser.defaults() if section == DEFAULTSECT else self._parser.options(section):
+            try:
+                items.append((key, self._typed_value(self._parser.get(section, key))))
+            except InterpolationError:
+                pass
+
+        return freeze_section(items)
+
+    def _published_state(self, section=None):
+        """
+        Published state from :meth:`_publish`. Readers only take the lock when the sources have not been read or the
+        section has not been parsed yet in lazy mode.
+
+        :param str section: Section that will be read from the state
+        """
+        state = self._state
+
+        if state is None or self._pending and self._dot_keys.get(section, section) in self._pending:
+            with self._lock:
+                self._read_sources()
+                if self._pending and section is not None:
+                    self._load_section(section)
+                self._publish()
+                state = self._state
+
+        return state
+
+    def _published_section(self, section):
+        """
+        :param str section: Section name or its dot notation name, which is resolved like :meth:`items` does.
+        :return: Frozen section from the published state, or None if section doesn't exist.
+        """
+        config, default_section = self._published_state(section)
+
+        if section == DEFAULTSECT:
+            return default_section
+
+        frozen_section = lookup(config, self._dot_keys.get(section, section), dot_name=False)
+        return frozen_section if isinstance(frozen_section, FrozenSection) else None
+
+    def _get_published(self, section, key, default=NO_DEFAULT_VALUE):
+        """ Same as :meth:`get`, but from the published state """
+        self._published_state(section)
+
+        if (section, key) in self._dot_keys:
+            section, key = self._dot_keys[(section, key)]
+
+        frozen_section = self._published_section(section)
+        value = NOT_FOUND
+        if frozen_section is not None:
+            name = self._parser.optionxform(key)
+            value = lookup(frozen_section, name, dot_name=False)
+            if value is NOT_FOUND and self._schema:
+                value = lookup(frozen_section, self._schema_key(section, key) or name, dot_name=False)
+
+        # Published sections have the keys from environment variables, except for sections that don't exist.
+        if value is NOT_FOUND and self._env:
+            env_value = self._env_value(self._dot_keys.get(section, section), key)
+            if env_value is not None:
+                return self._env_typed_value(section, key, env_value)
+
+        if value is NOT_FOUND:
+            return None if default == NO_DEFAULT_VALUE else default
+
+        return value
@@ -0,0 +1,42 @@
+"""
+Read and parse many config sources concurrently, using a thread pool for file I/O and optionally a process pool for
+parsing. Results are returned in the same order as the sources, so merging them keeps the same override semantics as
+reading the sources one at a time.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from localconfig.sources import parse_content, read_source
+
+
+def read_sources(sources, lazy=False, threads=None, processes=None, comments=True, cache=None):
+    """
+    Read and parse the config sources concurrently
+
+    :param list sources: Config source strings or file names
+    :param bool lazy: Only index the section headers, like :class:`localconfig.manager.LocalConfig` in lazy mode.
+    :param int threads: Max number of threads to read sources with. Defaults to the default of
+                        :class:`concurrent.futures.ThreadPoolExecutor`
+    :param int|bool processes: Parse the sources in a process pool with this many processes, or True for one per CPU.
+                               Starting the processes has a cost, so this only pays off for big sources.
+                               Ignored in lazy mode as sources are only indexed.
+    :param bool comments: Collect comments
+    :param dict cache: Parse cache from :func:`localconfig.sources.cached_result`. Files that are in it are not read
+                       again.
+    :return: List of (signature, result) from :func:`localconfig.sources.read_source` in the same order as sources
+    """
+    if not processes or lazy:
+        with ThreadPoolExecutor(threads) as thread_pool:
+            return list(thread_pool.map(partial(read_source, lazy=lazy, comments=comments, cache=cache), sources))
+
+    with ProcessPoolExecutor(None if processes is True else processes) as process_pool:
+        with ThreadPoolExecutor(threads) as thread_pool:
+            parse_func = partial(_parse_in_pool, process_pool)
+            return list(thread_pool.map(partial(read_source, parse_func=parse_func, comments=comments, cache=cache),
+                                        sources))
+
+
+def _parse_in_pool(pool, content, name=None, comments=True):
+    """ Parse the config content in the process pool and wait for the result """
+    return pool.submit(parse_content, content, name, comments).result()
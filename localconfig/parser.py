@@ -0,0 +1,228 @@
+"""
+Built-in single pass parser for the ini dialect supported by :class:`configparser.ConfigParser` (with its default
+options), which also collects the comments and dot notation keys that :class:`localconfig.manager.LocalConfig`
+needs, so each line is only tokenized once.
+"""
+
+from configparser import (DEFAULTSECT, DuplicateOptionError, DuplicateSectionError, MissingSectionHeaderError,
+                          ParsingError)
+import re
+
+from localconfig.utils import CONFIG_KEY_RE, to_dot_key
+
+LAST_COMMENT_KEY = 'LAST_COMMENT_KEY'
+SECTION_RE = re.compile(r'\[(?P<header>.+)\]')
+OPTION_RE = re.compile(r'(?P<option>.*?)\s*(?P<vi>[=:])\s*(?P<value>.*)$')
+COMMENT_PREFIXES = ('#', ';')
+
+
+class ParsedSource(object):
+    """
+    Result of parsing a config source. It is a plain container so it can be merged into a :class:`ConfigParser`,
+    cached or sent to another process.
+    """
+
+    def __init__(self, name=None):
+        #: Name of the source, used in error messages
+        self.name = name
+
+        #: A dict that maps section to a dict of key/value, in the order they were read.
+        self.sections = {}
+
+        #: A dict that maps (section, key) to its comment. Same format as :attr:`LocalConfig._comments`
+        self.comments = {}
+
+        #: A dict that maps dot notation section.key to its actual (section, key)
+        self.dot_keys = {}
+
+        #: Number of lines parsed
+        self.lines = 0
+
+
+class SourceParser(object):
+    """
+    Incremental parser that builds a :class:`ParsedSource` from lines fed to it.
+
+    Lines can be fed in any number of chunks using :meth:`feed`, and :meth:`close` returns the result.
+    """
+
+    def __init__(self, name=None, comments=True):
+        """
+        :param str name: Name of the source, used in error messages.
+        :param bool comments: Collect comments. Skip them if they are not needed, such as when the config is not saved.
+        """
+        self._result = ParsedSource(name)
+
+        #: Collect comments
+        self._comments = comments
+
+        # Parser state, carried over between calls to :meth:`feed`
+        self._section = None
+        self._section_dict = None
+        self._key = None
+        self._indent_level = 0
+        self._blank_lines = 0
+        self._elements_added = set()
+        self._multi_line = []
+        self._errors = None
+
+        # Comment / dot key state, which follows the same rules as :meth:`LocalConfig._parse_extra`
+        self._comment = ''
+        self._extra_section = ''
+
+    def feed(self, lines):
+        """
+        Parse the given lines
+
+        :param iter lines: Iterable of lines, such as a file pointer.
+        """
+        result = self._result
+        sections = result.sections
+        comments = result.comments
+        dot_keys = result.dot_keys
+        elements_added = self._elements_added
+        multi_line = self._multi_line
+
+        section = self._section
+        section_dict = self._section_dict
+        key = self._key
+        indent_level = self._indent_level
+        blank_lines = self._blank_lines
+        comment = self._comment
+        extra_section = self._extra_section
+        lineno = result.lines
+        keep_comments = self._comments
+
+        section_match = SECTION_RE.match
+        option_match = OPTION_RE.match
+        config_key_match = CONFIG_KEY_RE.match
+        dot_key = to_dot_key
+
+        for line in lines:
+            lineno += 1
+            value = line.strip()
+
+            if not value:
+                if comment:
+                    comment += '\n'
+                if key:
+                    blank_lines += 1
+                continue
+
+            if value.startswith(COMMENT_PREFIXES):
+                if keep_comments and line.startswith('#'):
+                    comment += line.rstrip() + '\n'
+                else:
+                    comment = ''
+                continue
+
+            line_indent = len(line) - len(line.lstrip())
+
+            if key and line_indent > indent_level:
+                value_lines = section_dict[key]
+                if isinstance(value_lines, str):
+                    value_lines = section_dict[key] = [value_lines]
+                    multi_line.append((section_dict, key))
+                if blank_lines:
+                    value_lines.extend([''] * blank_lines)
+                    blank_lines = 0
+                value_lines.append(value)
+                comment = ''
+                continue
+
+            indent_level = line_indent
+            blank_lines = 0
+
+            if value[0] == '[':
+                match = section_match(value)
+                if match:
+                    section = match.group('header')
+                    if section in elements_added:
+                        raise DuplicateSectionError(section, result.name, lineno)
+                    if section != DEFAULTSECT:
+                        elements_added.add(section)
+                    section_dict = sections.setdefault(section, {})
+                    key = None
+
+                    if not line_indent:
+                        extra_section = line.rstrip().strip('[]')
+                        dot_keys[dot_key(extra_section)] = extra_section
+                        if comment:
+                            comments[extra_section] = comment.rstrip()
+                    comment = ''
+                    continue
+
+            if section_dict is None:
+                raise MissingSectionHeaderError(result.name or '<???>', lineno, line)
+
+            # Most keys are simple enough for CONFIG_KEY_RE, which also tells us to add a dot key / comment for it.
+            match = config_key_match(line)
+            if match:
+                raw_key = line[:match.end() - 1].rstrip()
+                key = raw_key.lower()
+                value = line[match.end():].strip()
+
+                dot_keys[dot_key(extra_section, raw_key)] = (extra_section, raw_key)
+                if comment:
+                    comments[(extra_section, raw_key)] = comment.rstrip()
+            else:
+                match = option_match(value)
+                if not match or not match.group('option'):
+                    if self._errors is None:
+                        self._errors = ParsingError(result.name or '<???>')
+                    self._errors.append(lineno, repr(line))
+                    comment = ''
+                    continue
+                key = match.group('option').rstrip().lower()
+                value = match.group('value').strip()
+
+            if (section, key) in elements_added:
+                raise DuplicateOptionError(section, key, result.name, lineno)
+            elements_added.add((section, key))
+            section_dict[key] = value
+
+            comment = ''
+
+        self._section = section
+        self._section_dict = section_dict
+        self._key = key
+        self._indent_level = indent_level
+        self._blank_lines = blank_lines
+        self._comment = comment
+        self._extra_section = extra_section
+        result.lines = lineno
+
+    def close(self):
+        """
+        Finish parsing
+
+        :return: The parsed result
+        :rtype: ParsedSource
+        :raise ParsingError: if any line could not be parsed.
+        """
+        for section_dict, key in self._multi_line:
+            section_dict[key] = '\n'.join(section_dict[key]).rstrip()
+        self._multi_line = []
+
+        if self._comment:
+            self._result.comments[LAST_COMMENT_KEY] = self._comment
+            self._comment = ''
+
+        if self._errors:
+            raise self._errors
+
+        return self._result
+
+
+def parse(fp, name=None, comments=True):
+    """
+    Parse a config source in one pass
+
+    :param iter fp: File pointer or any iterable of lines
+    :param str name: Name of the source, used in error messages. Defaults to the name of the file pointer.
+    :param bool comments: Collect comments
+    :rtype: ParsedSource
+    """
+    parser = SourceParser(name or getattr(fp, 'name', None), comments)
+    parser.feed(fp)
+    return parser.close()
@@ -0,0 +1,241 @@
+"""
+Schema with the type, default and constraints of config keys, so values are converted and validated once per section
+when the sources are read instead of having their types guessed on access.
+
+The schema is compiled into a table of converters for each section, which is applied to all keys of a section in one
+pass, and all invalid values are reported together in one :class:`SchemaError`.
+"""
+
+from localconfig.utils import to_dot_key
+
+#: Values that are accepted for bool keys (case insensitive)
+BOOL_VALUES = {
+    'true': True,
+    'false': False,
+    'yes': True,
+    'no': False,
+    'on': True,
+    'off': False,
+    '1': True,
+    '0': False,
+}
+
+
+class SchemaError(ValueError):
+    """ Raised when config values don't match the schema. It has all the invalid values, not just the first one. """
+
+    def __init__(self, errors):
+        """
+        :param list errors: List of error messages, such as 'web_server.port: invalid literal for int(): 80a'
+        """
+        super().__init__('Config does not match schema:\n  ' + '\n  '.join(errors))
+
+        #: List of error messages
+        self.errors = errors
+
+
+class Key(object):
+    """ Type, default and constraints of a config key """
+
+    def __init__(self, type=str, default=None, required=False, choices=None, min=None, max=None):
+        """
+        :param callable type: Type of the value: str, int, float, bool, or any function that converts the string value
+                              and raises ValueError if it is invalid.
+        :param default: Value if the key is not set
+        :param bool required: Key must be set
+        :param iter choices: Values that are allowed, after conversion.
+        :param min: Smallest value that is allowed, after conversion.
+        :param max: Biggest value that is allowed, after conversion.
+        """
+        #: Type of the value
+        self.type = type
+
+        #: Value if the key is not set
+        self.default = default
+
+        #: Key must be set
+        self.required = required
+
+        #: Values that are allowed, or None to allow any.
+        self.choices = frozenset(choices) if choices is not None else None
+
+        #: Smallest value that is allowed, or None
+        self.min = min
+
+        #: Biggest value that is allowed, or None
+        self.max = max
+
+    def converter(self):
+        """ :return: Function that converts and checks a string value, which raises ValueError if it is invalid. """
+        convert = CONVERTERS.get(self.type, self.type)
+        choices, min_value, max_value = self.choices, self.min, self.max
+
+        if choices is None and min_value is None and max_value is None:
+            return convert
+
+        def convert_and_check(value):
+            value = convert(value)
+            if choices is not None and value not in choices:
+                raise ValueError('%r is not one of %s' % (value, ', '.join(sorted(map(repr, choices)))))
+            if min_value is not None and value < min_value:
+                raise ValueError('%r is less than %r' % (value, min_value))
+            if max_value is not None and value > max_value:
+                raise ValueError('%r is greater than %r' % (value, max_value))
+            return value
+
+        return convert_and_check
+
+
+def to_int(value):
+    """ Convert to int, which can have a base prefix, such as 0x1F. Leading zeros are decimal, so 007 is 7. """
+    try:
+        return int(value)
+    except ValueError:
+        return int(value, 0)
+
+
+def to_bool(value):
+    """ Convert to bool from one of :data:`BOOL_VALUES` """
+    try:
+        return BOOL_VALUES[value.strip().lower()]
+    except KeyError:
+        raise ValueError('%r is not a bool' % value)
+
+
+#: Converter function for each type
+CONVERTERS = {
+    str: str,
+    int: to_int,
+    float: float,
+    bool: to_bool,
+}
+
+
+class Schema(object):
+    """
+    Schema for a config, which is compiled when it is created::
+
+        schema = Schema({
+            'Web Server': {
+                'host': str,
+                'port': Key(int, default=80, min=1, max=65535),
+                'debug': Key(bool, default=False),
+            },
+        })
+        config = LocalConfig(schema=schema)
+
+    Sections and keys are matched by their dot notation names. Keys that are not in the schema keep their guessed
+    types.
+    """
+
+    def __init__(self, sections):
+        """
+        :param dict sections: Dict of section to a dict of key to :class:`Key` or type, which is the same as
+                              `Key(type)`.
+        """
+        #: A dict that maps dot notation section to its compiled table, which is a list of (dot notation key, key,
+        #: converter, :class:`Key`)
+        self._tables = {}
+
+        for section, keys in sections.items():
+            table = self._tables.setdefault(to_dot_key(section), [])
+            for name, key in keys.items():
+                key = key if isinstance(key, Key) else Key(key)
+                table.append((to_dot_key(name), name, key.converter(), key))
+
+        #: A dict that maps section name as given to its compiled table, or None if it is not in the schema.
+        self._names = {}
+
+    @property
+    def sections(self):
+        """ Dot notation names of sections in the schema """
+        return list(self._tables)
+
+    def table(self, section):
+        """
+        :param str section: Section name or its dot notation name
+        :return: Compiled table for the section, or None if it is not in the schema.
+        """
+        if section not in self._names:
+            self._names[section] = self._tables.get(to_dot_key(section))
+        return self._names[section]
+
+    def apply(self, section, items):
+        """
+        Convert and validate the values of a section
+
+        :param str section: Section name
+        :param dict items: Dict of key to string value for the section
+        :return: Dict of key to converted value for keys in the schema, including defaults for keys that are not set.
+        :raise SchemaError: with all values that are invalid and required keys that are not set.
+        """
+        table = self.table(section)
+        if not table:
+            return {}
+
+        dot_items = dict((to_dot_key(key), key) for key in items)
+        values = {}
+        errors = []
+
+        for dot_key, name, convert, key in table:
+            actual_key = dot_items.get(dot_key)
+
+            if actual_key is None:
+                if key.required:
+                    errors.append('%s.%s: required key is not set' % (section, name))
+                else:
+                    values[name.lower()] = key.default
+                continue
+
+            try:
+                values[actual_key] = convert(items[actual_key])
+            except (TypeError, ValueError) as e:
+                errors.append('%s.%s: %s' % (section, actual_key, e))
+
+        if errors:
+            raise SchemaError(errors)
+
+        return values
+
+    def convert(self, section, key, value):
+        """
+        Convert and validate a value
+
+        :param str section: Section name
+        :param str key: Key name
+        :param str value: Value to convert
+        :return: Converted value, or the value as is if the key is not in the schema.
+        :raise SchemaError: if the value is invalid.
+        """
+        convert = self.converter(section, key)
+        if not convert:
+            return value
+
+        try:
+            return convert(value)
+        except (TypeError, ValueError) as e:
+            raise SchemaError(['%s.%s: %s' % (section, key, e)])
+
+    def converter(self, section, key):
+        """
+        :param str section: Section name
+        :param str key: Key name
+        :return: Converter for the key, or None if it is not in the schema.
+        """
+        row = self._row(section, key)
+        return row and row[2]
+
+    def key_name(self, section, key):
+        """
+        :param str section: Section name or its dot notation name
+        :param str key: Key name or its dot notation name
+        :return: Name of the key as given in the schema, which :meth:`apply` uses for its default, or None if it is not
+                 in the schema.
+        """
+        row = self._row(section, key)
+        return row and row[1]
+
+    def _row(self, section, key):
+        """ :return: Row for the key from the compiled table of the section, or None if it is not in the schema. """
+        dot_key = to_dot_key(key)
+        return next((row for row in self.table(section) or () if row[0] == dot_key), None)
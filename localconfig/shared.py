@@ -0,0 +1,475 @@
+"""
+Compiled config in shared memory, so worker processes can read the config that their parent published without parsing
+its sources or keeping a copy of it each.
+
+The parent publishes with :class:`SharedPublisher` and each worker attaches a :class:`SharedConfig` by the same name.
+Keys are found with a binary search over sorted tables in the shared buffer, and only values that are read are copied
+out of it. Each publish bumps a generation counter, which workers check on access to pick up the new version.
+"""
+
+from configparser import DEFAULTSECT, NoSectionError
+from multiprocessing import resource_tracker, shared_memory
+import struct
+import threading
+
+from localconfig.utils import to_dot_key
+
+MAGIC = b'LCSHM001'
+
+#: Control segment: magic, generation of the data segment that was published last
+CONTROL = struct.Struct('<8sQ')
+
+#: Data segment header: magic, generation, number of sections, number of entries
+HEADER = struct.Struct('<8sQII')
+
+#: Index of a section in the section table, for each section in the original order
+ORDER = struct.Struct('<I')
+
+#: Section, sorted by dot notation name: dot name offset/length, name offset/length, first entry, number of entries
+SECTION = struct.Struct('<IIIIII')
+
+#: Entry, sorted by dot notation key within its section: dot key offset/length, key offset/length, value
+#: offset/length, value type
+ENTRY = struct.Struct('<IIIIIIB')
+
+#: Value types
+NONE, TRUE, FALSE, INT, FLOAT, STR = range(6)
+
+#: Float value
+DOUBLE = struct.Struct('<d')
+
+_attach_lock = threading.Lock()
+
+
+def data_name(name, generation):
+    """ Name of the data segment for the generation """
+    return '%s_%d' % (name, generation)
+
+
+def compile_config(sections, generation=0):
+    """
+    Compile the config into the layout that :class:`SharedConfig` reads
+
+    :param dict sections: Dict of section to a dict of key to typed value, such as from
+                          :meth:`localconfig.manager.LocalConfig.as_dict`
+    :param int generation: Generation of the config
+    :rtype: bytes
+    """
+    names = list(sections)
+    sorted_names = sorted(names, key=lambda name: to_dot_key(name).encode('ascii'))
+    entry_count = sum(len(keys) for keys in sections.values())
+
+    base = HEADER.size + len(names) * (ORDER.size + SECTION.size) + entry_count * ENTRY.size
+    strings = bytearray()
+    offsets = {}
+
+    def add(value):
+        """ :return: Tuple of offset and length of the string """
+        if value not in offsets:
+            offsets[value] = base + len(strings)
+            strings.extend(value)
+        return offsets[value], len(value)
+
+    section_rows = []
+    entry_rows = []
+
+    for name in sorted_names:
+        items = sorted(sections[name].items(), key=lambda item: to_dot_key(item[0]).encode('ascii'))
+        dot_name, name_string = add(to_dot_key(name).encode('ascii')), add(_encode(name))
+        section_rows.append(SECTION.pack(*dot_name + name_string + (len(entry_rows), len(items))))
+
+        for key, value in items:
+            value_type, value = _encode_value(value)
+            dot_key, key_string, value = add(to_dot_key(key).encode('ascii')), add(_encode(key)), add(value)
+            entry_rows.append(ENTRY.pack(*dot_key + key_string + value + (value_type,)))
+
+    positions = dict((name, i) for i, name in enumerate(sorted_names))
+    order = b''.join(ORDER.pack(positions[name]) for name in names)
+
+    header = HEADER.pack(MAGIC, generation, len(names), entry_count)
+    return b''.join([header, order] + section_rows + entry_rows + [bytes(strings)])
+
+
+def _encode(value):
+    return value.encode('utf-8', 'surrogatepass')
+
+
+def _encode_value(value):
+    """ :return: Tuple of value type and the value as bytes """
+    if value is None:
+        return NONE, b''
+    if value is True:
+        return TRUE, b''
+    if value is False:
+        return FALSE, b''
+    if isinstance(value, int):
+        return INT, str(value).encode('ascii')
+    if isinstance(value, float):
+        return FLOAT, DOUBLE.pack(value)
+    return STR, _encode(str(value))
+
+
+def _decode_value(value_type, value):
+    """ Reverse of :func:`_encode_value` """
+    if value_type == STR:
+        return str(value, 'utf-8', 'surrogatepass')
+    if value_type == INT:
+        return int(bytes(value))
+    if value_type == FLOAT:
+        return DOUBLE.unpack(value)[0]
+    if value_type == TRUE:
+        return True
+    if value_type == FALSE:
+        return False
+    return None
+
+
+def _attach(name):
+    """ Attach to the shared memory segment without registering it to be unlinked when this process exits """
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        pass
+
+    # Before Python 3.13, attaching registers the segment with the resource tracker, which unlinks it when this
+    # process exits even though the publisher owns it.
+    with _attach_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None
+        try:
+            return shared_memory.SharedMemory(name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedPublisher(object):
+    """
+    Publishes configs into shared memory for :class:`SharedConfig` to attach to. The segments are owned by the
+    publisher, so call :meth:`close` to remove them when the workers are done.
+    """
+
+    def __init__(self, name):
+        """
+        :param str name: Name of the shared config. The control segment has this name and each published config gets
+                         a data segment named `<name>_<generation>`.
+        """
+        #: Name of the shared config
+        self.name = name
+
+        #: Generation of the config that was published last, or 0 if none was published.
+        self.generation = 0
+
+        self._control = None
+        self._data = None
+
+    def publish(self, config):
+        """
+        Publish the config. Attached workers switch to it the next time they access their config, and the data segment
+        of the previous config is removed.
+
+        :param LocalConfig config: Config to publish
+        :return: Generation of the published config
+        """
+        content = compile_config(config.as_dict(), self.generation + 1)
+
+        if not self._control:
+            self._control = shared_memory.SharedMemory(self.name, create=True, size=CONTROL.size)
+
+        data = shared_memory.SharedMemory(data_name(self.name, self.generation + 1), create=True, size=len(content))
+        data.buf[:len(content)] = content
+
+        self.generation += 1
+        CONTROL.pack_into(self._control.buf, 0, MAGIC, self.generation)
+
+        if self._data:
+            self._unlink(self._data)
+        self._data = data
+
+        return self.generation
+
+    def close(self):
+        """ Remove the shared memory segments """
+        for segment in (self._data, self._control):
+            if segment:
+                self._unlink(segment)
+        self._data = self._control = None
+
+    @staticmethod
+    def _unlink(segment):
+        segment.close()
+        segment.unlink()
+
+
+class _Segment(object):
+    """
+    Data segment of a published config that :class:`SharedConfig` is attached to. Each read holds a reference to the
+    segment that it started with, and the segment is closed when it is garbage collected, so a newer one can be
+    attached by another thread without releasing the buffer that is being read.
+    """
+
+    def __init__(self, data, generation):
+        """
+        :param SharedMemory data: Attached data segment
+        :param int generation: Generation of the config in it
+        """
+        #: Attached data segment
+        self.data = data
+
+        #: Buffer of the data segment
+        self.buf = data.buf
+
+        #: Generation of the config
+        self.generation = generation
+
+        #: Number of sections
+        self.section_count = HEADER.unpack_from(self.buf)[2]
+
+        #: A dict that maps section name as given to its row in the section table, or None if it doesn't exist.
+        #: It is only as big as the number of sections, so it is kept per process to skip their binary search.
+        self.sections = {}
+
+    def string(self, offset, length):
+        return self.buf[offset:offset + length]
+
+    def search(self, table_offset, row, start, end, name):
+        """
+        Binary search for the row with the name in the table, which is sorted by dot notation name. Rows with the same
+        dot notation name are next to each other in their original order, so the row with the exact name is picked
+        from them, or else the row with the name in dot notation format, or the last one (like
+        :mod:`localconfig.frozen` does).
+
+        :param str name: Name of the section/key, or its dot notation name
+        :return: Row that was found, or None
+        """
+        buf = self.buf
+        dot_name = to_dot_key(name).encode('ascii')
+        limit = end
+
+        while start < end:
+            middle = (start + end) // 2
+            values = row.unpack_from(buf, table_offset + middle * row.size)
+
+            if bytes(buf[values[0]:values[0] + values[1]]) < dot_name:
+                start = middle + 1
+            else:
+                end = middle
+
+        exact_name = _encode(name)
+        found = None
+
+        for i in range(start, limit):
+            values = row.unpack_from(buf, table_offset + i * row.size)
+            if bytes(buf[values[0]:values[0] + values[1]]) != dot_name:
+                break
+
+            row_name = bytes(buf[values[2]:values[2] + values[3]])
+            if row_name == exact_name:
+                return values
+            if row_name == dot_name or not found or bytes(buf[found[2]:found[2] + found[3]]) != dot_name:
+                found = values
+
+        return found
+
+    def section(self, section):
+        """ :return: Row from the section table, or None if section doesn't exist """
+        if section not in self.sections:
+            self.sections[section] = self.search(HEADER.size + self.section_count * ORDER.size, SECTION, 0,
+                                                 self.section_count, section)
+
+        return self.sections[section]
+
+    def entries_offset(self):
+        return HEADER.size + self.section_count * (ORDER.size + SECTION.size)
+
+    def entry(self, section_row, key):
+        """ :return: Row from the entry table for the key in the section row, or None if key doesn't exist """
+        # Keys are in lower case like ConfigParser stores them
+        return self.search(self.entries_offset(), ENTRY, section_row[4], section_row[4] + section_row[5], key.lower())
+
+    def section_items(self, section_row):
+        """ Generator of (key, value) for the section row """
+        buf = self.buf
+        offset = self.entries_offset()
+
+        for i in range(section_row[4], section_row[4] + section_row[5]):
+            _, _, key_offset, key_length, value_offset, value_length, value_type = ENTRY.unpack_from(
+                buf, offset + i * ENTRY.size)
+            yield (str(self.string(key_offset, key_length), 'utf-8', 'surrogatepass'),
+                   _decode_value(value_type, self.string(value_offset, value_length)))
+
+    def section_rows(self):
+        """ Generator of section rows in the original order """
+        buf = self.buf
+        offset = HEADER.size + self.section_count * ORDER.size
+
+        for i in range(self.section_count):
+            position = ORDER.unpack_from(buf, HEADER.size + i * ORDER.size)[0]
+            yield SECTION.unpack_from(buf, offset + position * SECTION.size)
+
+    def section_name(self, section_row):
+        return str(self.string(section_row[2], section_row[3]), 'utf-8', 'surrogatepass')
+
+
+class SharedConfig(object):
+    """
+    Read-only config attached to the shared memory that :class:`SharedPublisher` published to. It has the same read
+    methods as :class:`localconfig.manager.LocalConfig`, including access thru dot notation, and it can be shared
+    between threads.
+    """
+
+    class SectionAccessor(object):
+        """ Provides read access for a config section """
+
+        def __init__(self, config, section):
+            object.__setattr__(self, '_config', config)
+            object.__setattr__(self, '_section', section)
+
+        def __getattr__(self, key):
+            return self._config.get(self._section, key)
+
+        def __setattr__(self, key, value):
+            raise AttributeError('SharedConfig is read-only')
+
+        def __iter__(self):
+            return self._config.items(self._section)
+
+    def __init__(self, name):
+        """
+        :param str name: Name of the shared config that was given to :class:`SharedPublisher`
+        :raise FileNotFoundError: if no config has been published with the name
+        """
+        self._name = name
+        self._control = _attach(name)
+
+        #: Lock held to attach to a new data segment
+        self._lock = threading.Lock()
+
+        #: :class:`_Segment` that was attached last
+        self._segment = None
+
+        self._refresh()
+
+    @property
+    def generation(self):
+        """ Generation of the attached config """
+        return self._refresh().generation
+
+    def _refresh(self):
+        """
+        Attach to the data segment that was published last if it is not attached already
+
+        :return: :class:`_Segment` to read from, which stays usable as long as it is referenced.
+        """
+        generation = CONTROL.unpack_from(self._control.buf)[1]
+        segment = self._segment
+        if segment and segment.generation == generation:
+            return segment
+
+        with self._lock:
+            while True:
+                generation = CONTROL.unpack_from(self._control.buf)[1]
+                if self._segment and self._segment.generation == generation:
+                    return self._segment
+
+                try:
+                    data = _attach(data_name(self._name, generation))
+                except FileNotFoundError:  # Replaced by a newer generation in the meantime
+                    continue
+
+                # The previous segment is closed when the reads that still use it are done with it.
+                self._segment = _Segment(data, generation)
+                return self._segment
+
+    def close(self):
+        """ Detach from the shared memory """
+        segment, self._segment = self._segment, None
+        if segment:
+            try:
+                segment.data.close()
+            except BufferError:  # A value that is being read still references the buffer
+                pass
+        self._control.close()
+
+    def get(self, section, key, default=None):
+        """
+        Get config value
+
+        :param str section: Section to get config for. It can be in dot notation format.
+        :param str key: Key to get config for. It can be in dot notation format.
+        :param default: Default value for key if key was not found.
+        """
+        segment = self._refresh()
+
+        section_row = segment.section(section)
+        if not section_row:
+            return default
+
+        entry = segment.entry(section_row, key)
+        if not entry:
+            return default
+
+        return _decode_value(entry[6], segment.string(entry[4], entry[5]))
+
+    def items(self, section):
+        """
+        Items for section
+
+        :param str section: Section to get items for.
+        :return: Generator of (key, value) for the section
+        :raise NoSectionError: if section doesn't exist.
+        """
+        segment = self._refresh()
+
+        section_row = segment.section(section)
+        if not section_row:
+            raise NoSectionError(section)
+
+        return segment.section_items(section_row)
+
+    def section_dict(self, section):
+        """
+        :param str section: Section to get items for.
+        :return: Dict of key to value, including keys from DEFAULTSECT, or None if section doesn't exist.
+        """
+        segment = self._refresh()
+
+        section_row = segment.section(section)
+        return dict(segment.section_items(section_row)) if section_row else None
+
+    def get_many(self, keys, default=None):
+        """
+        :param iter keys: Iterable of (section, key)
+        :param default: Default value for keys that were not found.
+        :return: Dict of (section, key) as given to its value
+        """
+        return dict((section_key, self.get(section_key[0], section_key[1], default)) for section_key in keys)
+
+    def as_dict(self):
+        """
+        :return: Dict of section to a dict of key to value, which includes keys from DEFAULTSECT. DEFAULTSECT is only
+                 included if it has keys.
+        """
+        segment = self._refresh()
+        return dict((segment.section_name(row), dict(segment.section_items(row))) for row in segment.section_rows())
+
+    def __iter__(self):
+        segment = self._refresh()
+        for row in segment.section_rows():
+            section = segment.section_name(row)
+            if section != DEFAULTSECT:
+                yield section
+
+    def __getattr__(self, section):
+        """
+        Get a section or a key from DEFAULTSECT
+
+        :param str section: Section to get
+        :rtype: :class:`SharedConfig.SectionAccessor` or value of the key from DEFAULTSECT
+        """
+        if section.startswith('_'):
+            raise AttributeError(section)
+
+        if section != DEFAULTSECT and self._refresh().section(section):
+            return self.SectionAccessor(self, section)
+
+        return self.get(DEFAULTSECT, section)
@@ -0,0 +1,76 @@
+"""
+Compiled snapshot of a config's merged state, so it can be loaded with one read instead of re-parsing its sources.
+
+Snapshots are pickled, so only use them from a location that is as trusted as the config sources.
+"""
+
+import hashlib
+import os
+
+#: Bump when the snapshot content changes
+FORMAT_VERSION = 2
+
+
+def source_key(source, is_file):
+    """
+    Key that identifies the source content
+
+    :param str source: Config string or file path
+    :param bool is_file: True if source is a file path
+    :return: Tuple of file path, mtime, size and inode for file source, or content hash for string source.
+    """
+    if not is_file:
+        return ('str', hashlib.sha1(source.encode('utf-8', 'surrogatepass')).hexdigest())
+
+    path = os.path.abspath(source)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ('file', path, None)
+
+    return ('file', path, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def load_snapshot(path, key):
+    """
+    Load snapshot if it matches the key
+
+    :param str path: Snapshot file
+    :param key: Key for the sources that the snapshot is expected to be created from
+    :return: Dict of snapshot content or None if it does not exist or does not match the key.
+    """
+    import pickle  # Only needed with snapshot, so it is not imported up front.
+
+    try:
+        with open(path, 'rb') as fp:
+            snapshot = pickle.load(fp)
+    except Exception:
+        return None
+
+    if not isinstance(snapshot, dict) or snapshot.get('version') != FORMAT_VERSION or snapshot.get('key') != key:
+        return None
+
+    return snapshot
+
+
+def save_snapshot(path, key, **content):
+    """
+    Save a snapshot atomically, so a concurrent reader never sees a partial file.
+
+    :param str path: Snapshot file
+    :param key: Key for the sources that the snapshot is created from
+    :param content: Content for the snapshot
+    """
+    import pickle
+    import tempfile
+
+    content.update(version=FORMAT_VERSION, key=key)
+
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump(content, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
@@ -0,0 +1,209 @@
+"""
+Reading config sources into intermediate results without changing any config, so they can be read concurrently and
+added to a config later in the order they were queued.
+"""
+
+from configparser import DEFAULTSECT
+from io import StringIO
+import locale
+import os
+import stat
+
+from localconfig.compression import detect_compression, open_source
+from localconfig.index import index_file, index_text, parse_span
+from localconfig.parser import parse
+from localconfig.snapshot import source_key
+from localconfig.utils import is_config
+
+
+def read_file(path):
+    """
+    :param str path: Path to config file
+    :return: Content of the file, which is decompressed if it is compressed, or None if it does not exist.
+    """
+    try:
+        with open_source(path) as fp:
+            return fp.read()
+    except FileNotFoundError:
+        return None
+
+
+#: Number of characters to buffer before writing them in :func:`write_lines`
+WRITE_CHUNK_SIZE = 65536
+
+
+def write_lines(fp, lines, encoding=None):
+    """
+    Write the lines separated by newlines, in chunks of about :data:`WRITE_CHUNK_SIZE` characters.
+
+    :param file fp: File object to write to. Opened in binary mode if `encoding` is set, otherwise text mode.
+    :param iter lines: Iterable of lines without line endings
+    :param str encoding: Encoding to encode the lines with
+    :return: Number of characters, or bytes if `encoding` is set, written
+    """
+    written = 0
+    chunk = []
+    size = 0
+
+    for line in lines:
+        if chunk or written:
+            chunk.append('\n')
+        chunk.append(line)
+        size += len(line) + 1
+
+        if size >= WRITE_CHUNK_SIZE:
+            written += _write_chunk(fp, chunk, encoding)
+            chunk = []
+            size = 0
+
+    if chunk:
+        written += _write_chunk(fp, chunk, encoding)
+
+    return written
+
+
+def _write_chunk(fp, chunk, encoding):
+    text = ''.join(chunk)
+    return fp.write(text.encode(encoding) if encoding else text)
+
+
+def write_file(path, content):
+    """
+    Write the content atomically: it is written to a temp file in the same directory, synced to disk, and then
+    renamed over the file, so the file is never left truncated. The file keeps its permissions, and a symlink is
+    followed so it is kept.
+
+    :param str path: Path to write to
+    :param str|callable content: Content to write, or a function that writes it to the file object it is called
+                                 with, which is opened in binary mode.
+    """
+    path = os.path.realpath(path)
+
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = None  # The temp file is created with the permissions of a new file already
+
+    fd, temp_path = _create_temp_file(path)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            if callable(content):
+                content(fp)
+            else:
+                fp.write(content.encode(locale.getpreferredencoding(False)))
+            fp.flush()
+            os.fsync(fp.fileno())
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except Exception:
+        os.unlink(temp_path)
+        raise
+
+
+def _create_temp_file(path):
+    """
+    Create a temp file in the same directory as the path. Unlike :func:`tempfile.mkstemp`, it gets the permissions of
+    a new file (0666 without the umask), as the umask can't be read without changing it for all threads.
+
+    :param str path: Path of the file that the temp file is for
+    :return: Tuple of file descriptor opened for writing and path of the temp file
+    """
+    directory, name = os.path.split(path)
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+    while True:
+        temp_path = os.path.join(directory, '.%s-%s' % (name, os.urandom(4).hex()))
+        try:
+            return os.open(temp_path, flags, 0o666), temp_path
+        except FileExistsError:
+            continue
+
+
+def parse_spans(spans, comments=True):
+    """
+    :param list spans: List of :class:`localconfig.index.Span` to parse
+    :param bool comments: Collect comments
+    :return: List of :class:`localconfig.parser.ParsedSource` for the spans
+    """
+    return [parse_span(span, comments=comments) for span in spans]
+
+
+def index_source(source, is_file, comments=True):
+    """
+    Index the section headers in the source, and parse the spans that are merged right away in lazy mode
+    (DEFAULTSECT and the part before the first header).
+
+    :param str source: Config source string or file name
+    :param bool is_file: Source is a file name
+    :param bool comments: Collect comments from the parsed spans
+    :return: Tuple of (list of spans, dict of span to its parsed source), or None if the file does not exist.
+    """
+    if is_file and detect_compression(source):  # Compressed files can't be indexed by their byte offsets
+        source, is_file = read_file(source), False
+
+    try:
+        spans = index_file(source) if is_file else index_text(source)
+    except FileNotFoundError:
+        return None
+
+    return spans, dict((span, parse_span(span, comments=comments))
+                       for span in spans if span.section in (None, DEFAULTSECT))
+
+
+def parse_content(content, name=None, comments=True):
+    """
+    Parse the config content
+
+    :param str content: Config content
+    :param str name: Name of the source, used in error messages.
+    :param bool comments: Collect comments
+    :rtype: localconfig.parser.ParsedSource
+    """
+    return parse(StringIO(content), name, comments)
+
+
+def cached_result(cache, source, signature):
+    """
+    :param dict cache: Dict of file name to a tuple that starts with (signature, parsed source), like the parse cache
+                       of :class:`localconfig.manager.LocalConfig`
+    :param str source: File name
+    :param tuple signature: Signature of the file from :func:`localconfig.snapshot.source_key`
+    :return: The cached :class:`localconfig.parser.ParsedSource` if the file has not changed since, otherwise None.
+    """
+    cached = cache.get(source) if cache else None
+    if cached and cached[0] == signature:
+        return cached[1]
+
+
+def read_source(source, lazy=False, parse_func=parse_content, comments=True, cache=None):
+    """
+    Read and parse the config source
+
+    :param str source: Config source string or file name
+    :param bool lazy: Only index the section headers, like :class:`localconfig.manager.LocalConfig` in lazy mode.
+    :param callable parse_func: Function to parse the content with, which has the same signature as
+                                :func:`parse_content`
+    :param bool comments: Collect comments
+    :param dict cache: Parse cache from :func:`cached_result`. A file that is in it is not read again.
+    :return: Tuple of (signature, result). Signature is from :func:`localconfig.snapshot.source_key` for file
+             source, otherwise None. Result is None if the file does not exist, or the result of
+             :func:`index_source` in lazy mode, otherwise :class:`localconfig.parser.ParsedSource`
+    """
+    if isinstance(source, str) and is_config(source):
+        return None, index_source(source, False, comments) if lazy else parse_func(source, comments=comments)
+
+    signature = source_key(source, True)
+
+    if lazy:
+        return signature, index_source(source, True, comments)
+
+    cached = cached_result(cache, source, signature)
+    if cached:
+        return signature, cached
+
+    content = read_file(source)
+    if content is None:
+        return signature, None
+
+    return signature, parse_func(content, source, comments)
@@ -0,0 +1,79 @@
+"""
+Counters for where a config spends its time, such as reading sources and saving, for :meth:`LocalConfig.stats`.
+"""
+
+from localconfig.utils import is_config
+
+#: Name of string sources in stats, as the content can be big
+STRING_SOURCE = '<string>'
+
+
+class Stats(object):
+    """ Timings and counters for reading and saving a config. Times are in seconds. """
+
+    def __init__(self):
+        #: Total time spent reading sources, including parsing them and loading snapshot
+        self.read_time = 0.0
+
+        #: List of dict of source, time, bytes and lines for each source read, in the order they were read
+        self.sources = []
+
+        #: Total bytes of sources read
+        self.bytes_read = 0
+
+        #: Total lines parsed, including sections parsed on first access in lazy mode
+        self.lines_parsed = 0
+
+        #: Number of saves
+        self.saves = 0
+
+        #: Total time spent saving
+        self.save_time = 0.0
+
+    def add_source(self, source, seconds, size, lines):
+        """
+        Record a source that was read
+
+        :param str source: Config source string or file name
+        :param float seconds: Time to read and parse the source
+        :param int size: Size of the source in bytes
+        :param int lines: Number of lines parsed
+        :return: Dict of stats for the source
+        """
+        name = STRING_SOURCE if isinstance(source, str) and is_config(source) else source
+        source_stats = {'source': name, 'time': seconds, 'bytes': size, 'lines': lines}
+
+        self.sources.append(source_stats)
+        self.bytes_read += size
+
+        return source_stats
+
+    def add_save(self, seconds):
+        """
+        Record a save
+
+        :param float seconds: Time to save
+        """
+        self.saves += 1
+        self.save_time += seconds
+
+    def as_dict(self):
+        """ :return: Dict of the stats """
+        return {'read_time': self.read_time, 'sources': [dict(source) for source in self.sources],
+                'bytes_read': self.bytes_read, 'lines_parsed': self.lines_parsed, 'saves': self.saves,
+                'save_time': self.save_time}
+
+
+def source_size(source, signature=None):
+    """
+    :param str source: Config source string or file name
+    :param tuple signature: Signature of file source from :func:`localconfig.snapshot.source_key`
+    :return: Size of the source in bytes, or 0 if it is a file that does not exist.
+    """
+    if isinstance(source, str) and is_config(source):
+        return len(source.encode('utf-8', 'surrogatepass'))
+
+    if signature and len(signature) > 3:
+        return signature[3]
+
+    return 0
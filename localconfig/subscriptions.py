@@ -0,0 +1,97 @@
+"""
+Subscriptions to config changes, indexed by key so dispatching a change only looks at matching subscriptions.
+"""
+
+from localconfig.utils import to_dot_key
+
+#: Pattern that matches any section or key
+WILDCARD = '*'
+
+
+class Subscription(object):
+    """ A callback subscribed to keys that match a pattern """
+
+    def __init__(self, pattern, callback):
+        """
+        :param str pattern: Key pattern in `section.key` format, where section or key can be `*` to match any.
+        :param callable callback: Function to call with a dict of `section.key` to (old value, new value)
+        """
+        section, _, key = pattern.rpartition('.')
+        if not section:
+            section, key = key, WILDCARD
+
+        #: Pattern as given
+        self.pattern = pattern
+
+        #: Section in dot notation format, or `*`
+        self.section = section if section == WILDCARD else to_dot_key(section)
+
+        #: Key in dot notation format, or `*`
+        self.key = key if key == WILDCARD else to_dot_key(key)
+
+        #: Function to call with changes
+        self.callback = callback
+
+    def __repr__(self):
+        return '<Subscription %s>' % self.pattern
+
+
+class Subscriptions(object):
+    """
+    Registry of subscriptions. Subscriptions are stored in a dict by the (section, key) in their pattern, so only the
+    subscriptions for a changed key, its section, its key in any section, or everything are looked at.
+    """
+
+    def __init__(self):
+        self._index = {}
+
+    def subscribe(self, pattern, callback):
+        """
+        Subscribe to changes for keys that match the pattern
+
+        :param str pattern: Key pattern in `section.key` format, where section or key can be `*` to match any, such as
+                            `web_server.port`, `web_server.*`, `*.port` or `*`. Names can be in dot notation format.
+        :param callable callback: Function to call with a dict of `section.key` (in dot notation format) to
+                                  (old value, new value) for the matching keys that changed in a batch of changes.
+        :rtype: Subscription
+        """
+        subscription = Subscription(pattern, callback)
+        self._index.setdefault((subscription.section, subscription.key), []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """
+        Unsubscribe from changes
+
+        :param Subscription subscription: Subscription from :meth:`subscribe`
+        """
+        index_key = (subscription.section, subscription.key)
+        subscriptions = self._index.get(index_key, [])
+
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self._index[index_key]
+
+    def dispatch(self, changes):
+        """
+        Call the callbacks of subscriptions that match the changes, once per subscription.
+
+        :param dict changes: Dict of (section, key) in dot notation format to (old value, new value)
+        """
+        matched = {}
+        index = self._index
+
+        for (section, key), change in changes.items():
+            for index_key in ((section, key), (section, WILDCARD), (WILDCARD, key), (WILDCARD, WILDCARD)):
+                for subscription in index.get(index_key, ()):
+                    matched.setdefault(subscription, {})['%s.%s' % (section, key)] = change
+
+        for subscription, subscription_changes in matched.items():
+            subscription.callback(subscription_changes)
+
+    def __bool__(self):
+        return bool(self._index)
+
+    def __len__(self):
+        return sum(len(subscriptions) for subscriptions in self._index.values())
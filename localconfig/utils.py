@@ -1,6 +1,37 @@
 import re
 
 CONFIG_KEY_RE = re.compile(r'[A-Za-z0-9\-\_\.]+\s*=')
+NON_ALPHA_NUM = re.compile('[^A-Za-z0-9]')
+# Digits with optional single underscores between them, as accepted by int() and float()
+_DIGITS = r'\d(?:_?\d)*'
+# Whitespace that int() and float() strip, which does not include the ASCII separators \x1c - \x1f
+_SPACE = r'[^\S\x1c-\x1f]*'
+TYPED_VALUE_RE = re.compile(r'''
+    %(space)s
+    [+-]?
+    (?:
+        (?P<int_base_n>0(?:[xX](?:_?[0-9a-fA-F])+|[oO](?:_?[0-7])+|[bB](?:_?[01])+))
+      | (?P<int>%(digits)s)(?P<fraction>(?:\.(?:%(digits)s)?)?(?:[eE][+-]?%(digits)s)?)
+      | \.%(digits)s(?:[eE][+-]?%(digits)s)?
+      | [iI][nN][fF](?:[iI][nN][iI][tT][yY])?
+      | [nN][aA][nN]
+    )
+    %(space)s\Z
+''' % {'digits': _DIGITS, 'space': _SPACE}, re.VERBOSE)
+#: Base-N literal that may have non-ASCII digits, which int() also accepts, such as '0x١'. It is a superset of the
+#: digits that are valid for the base, so values that match it are checked by int().
+UNICODE_INT_BASE_N_RE = re.compile(r'%(space)s[+-]?0[xXoObB](?:_?[\da-fA-F])+%(space)s\Z' % {'space': _SPACE})
+#: ASCII characters that a number can start with. Anything else can skip :data:`TYPED_VALUE_RE`
+NUMBER_START_CHARS = frozenset('0123456789+-.iInN \t\n\r\x0b\x0c')
+CONSTANT_VALUES = {
+    'true': True,
+    'false': False,
+    'yes': True,
+    'no': False,
+    'on': True,
+    'off': False,
+    str(None).lower(): None,
+}
 
 
 def is_float(value):
@@ -38,11 +69,51 @@ def to_bool(value):
     return value.lower() in ['true', 'yes', 'on']
 
 
+def typed_value(value):
+    """
+    Transform string value to an actual data type of the same value.
+
+    It is the same as checking with :func:`is_int`, :func:`is_int_base_n`, :func:`is_float`, :func:`is_bool` and
+    :func:`is_none` in that order, but with at most one regex match and without raising any exception for ASCII
+    values. Base-N literals with non-ASCII digits, such as '0x١', are checked by int() after a second match.
+    """
+    if value.isdecimal():
+        return int(value)
+
+    first_char = value[:1]
+    if first_char in NUMBER_START_CHARS or first_char > '\x7f':
+        match = TYPED_VALUE_RE.match(value)
+
+        if match:
+            if match.group('int') and not match.group('fraction'):
+                return int(value)
+            elif match.group('int_base_n'):
+                return int(value, 0)
+            else:
+                return float(value)
+
+        if not value.isascii() and UNICODE_INT_BASE_N_RE.match(value):
+            try:
+                return int(value, 0)
+            except ValueError:
+                pass
+
+    return CONSTANT_VALUES.get(value.lower(), value)
+
+
 def is_config(value):
     """ Checks if the value is possible config content """
     return '\n' in value or CONFIG_KEY_RE.match(value)
 
 
+def to_dot_key(section, key=None):
+    """ Return the section and key in dot notation format. """
+    if key:
+        return (NON_ALPHA_NUM.sub('_', section.lower()), NON_ALPHA_NUM.sub('_', key.lower()))
+    else:
+        return NON_ALPHA_NUM.sub('_', section.lower())
+
+
 def _is_type(value, type):
     try:
         type(value)
@@ -0,0 +1,219 @@
+"""
+Background watcher that reloads a config when its file sources change.
+"""
+
+import ctypes
+import ctypes.util
+from fnmatch import fnmatch
+import logging
+import os
+import select
+import struct
+import threading
+
+from localconfig.include import is_directory
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_EVENTS = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+#: struct inotify_event without the variable length name: wd, mask, cookie, len
+EVENT_HEADER = struct.Struct('iIII')
+
+log = logging.getLogger(__name__)
+
+
+class Inotify(object):
+    """ Minimal inotify binding using ctypes, which only exists on Linux. """
+
+    def __init__(self):
+        """ :raise OSError: if inotify is not available """
+        libc_name = ctypes.util.find_library('c')
+        if not libc_name:
+            raise OSError('libc is not available')
+
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+    def add_watch(self, path, mask=WATCH_EVENTS):
+        """ Watch the path for the events in mask """
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_add_watch failed for %s' % path)
+        return wd
+
+    def read(self, timeout):
+        """
+        Wait for events
+
+        :param float timeout: Max seconds to wait
+        :return: List of (watch descriptor from :meth:`add_watch`, file name) from the events
+        """
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, _, _, name_len = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            events.append((wd, os.fsdecode(data[offset:offset + name_len].rstrip(b'\0'))))
+            offset += name_len
+
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher(threading.Thread):
+    """
+    Daemon thread that calls :meth:`LocalConfig.reload` when a file source changes.
+
+    The directories of the file sources are watched with inotify when available, so files that are replaced by a
+    rename or created later are also noticed, and so are directory/glob sources for files that are added or removed.
+    Sources that the config reads later, such as from new include directives, are watched within `interval` seconds.
+    Otherwise, it polls every `interval` seconds, which is cheap as :meth:`LocalConfig.reload` only stats the files
+    unless they have changed. Glob sources with a pattern in their directory name are polled too.
+    """
+
+    def __init__(self, config, interval=1.0, callback=None, error_callback=None):
+        """
+        :param LocalConfig config: Config to reload
+        :param float interval: Seconds between polls, or the max delay to notice a stop or new sources to watch when
+                               inotify is used.
+        :param callable callback: Function to call with the set of (section, key) that changed after a reload.
+        :param callable error_callback: Function to call with the exception when a reload fails, such as when a file
+                                        is broken or half written. Defaults to logging it. The config is unchanged and
+                                        the files are reloaded again when they change.
+        """
+        super(Watcher, self).__init__(name='localconfig-watcher')
+        self.daemon = True
+
+        self._config = config
+        self._interval = interval
+        self._callback = callback
+        self._error_callback = error_callback
+        self._stopped = threading.Event()
+
+        #: A dict that maps watch descriptor to the set of file names in its directory that are file sources
+        self._names = {}
+
+        #: A dict that maps watch descriptor to the list of glob patterns for names of files in its directory that are
+        #: from directory/glob sources
+        self._patterns = {}
+
+        #: Tuple of the file sources and directory/glob sources that are watched, to notice when they change.
+        self._sources = None
+
+        try:
+            self._inotify = Inotify()
+        except OSError:
+            self._inotify = None
+        else:
+            self._update_watches()
+
+    @property
+    def uses_inotify(self):
+        """ True if inotify is used to watch the files, otherwise they are polled. """
+        return self._inotify is not None
+
+    def run(self):
+        try:
+            while not self._stopped.is_set():
+                if self._inotify:
+                    events = self._inotify.read(self._interval)
+                    # Files that became sources since the last reload may have changed before they were watched
+                    if not any(self._is_source(wd, name) for wd, name in events) and not self._update_watches():
+                        continue
+                elif self._stopped.wait(self._interval):
+                    break
+
+                try:
+                    self.check()
+                except Exception as e:
+                    if self._error_callback:
+                        self._error_callback(e)
+                    else:
+                        log.exception('Failed to reload config')
+        finally:
+            if self._inotify:
+                self._inotify.close()
+
+    def _update_watches(self):
+        """
+        Watch the directories of the sources of the config if they changed since they were watched, such as after a
+        reload read new include directives or after more sources were read. It falls back to polling if a directory
+        can't be watched.
+
+        :return: True if the sources changed
+        """
+        config = self._config
+        with config._lock:
+            sources = (tuple(config._file_signatures), tuple(config._expanded))
+        if sources == self._sources:
+            return False
+        self._sources = sources
+
+        names = {}
+        patterns = {}
+        try:
+            for path in sources[0]:
+                directory, name = os.path.split(os.path.abspath(path))
+                names.setdefault(self._inotify.add_watch(directory), set()).add(name)
+
+            for source in sources[1]:
+                if is_directory(source):
+                    directory, pattern = source, '*'
+                else:
+                    directory, pattern = os.path.split(os.path.expanduser(source))
+                patterns.setdefault(self._inotify.add_watch(os.path.abspath(directory)), []).append(pattern)
+        except OSError:
+            self._inotify.close()
+            self._inotify = None
+        else:
+            self._names = names
+            self._patterns = patterns
+
+        return True
+
+    def _is_source(self, wd, name):
+        """
+        :param int wd: Watch descriptor of the directory from the event
+        :param str name: Name of the file from the event
+        :return: True if the file is a file source, or matches a directory/glob source.
+        """
+        return name in self._names.get(wd, ()) or any(fnmatch(name, pattern) for pattern in self._patterns.get(wd, ()))
+
+    def check(self):
+        """ Reload the config and call the callback if anything changed """
+        changes = self._config.reload()
+        if changes and self._callback:
+            self._callback(changes)
+
+    def stop(self, timeout=None):
+        """
+        Stop watching
+
+        :param float timeout: Max seconds to wait for the thread to stop
+        """
+        self._stopped.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
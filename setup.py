@@ -23,7 +23,7 @@ setuptools.setup(
   packages=setuptools.find_packages(),
   include_package_data=True,
 
-  python_requires='>=3.6',
+  python_requires='>=3.8',
   setup_requires=['setuptools-git', 'wheel'],
 
   classifiers=[
@@ -35,7 +35,7 @@ setuptools.setup(
     'License :: OSI Approved :: MIT License',
 
     'Programming Language :: Python :: 3',
-    'Programming Language :: Python :: 3.6',
+    'Programming Language :: Python :: 3.8',
   ],
 
   keywords='configuration config ConfigParser data type support',
@@ -0,0 +1,225 @@
+import asyncio
+import os
+import time
+
+from localconfig import aio
+from localconfig.manager import LocalConfig
+from localconfig.parser import parse
+from test_manager import TEST_CONFIG
+
+
+def run(coro):
+    return asyncio.get_event_loop().run_until_complete(coro) if not hasattr(asyncio, 'run') else asyncio.run(coro)
+
+
+def test_parse_text(monkeypatch):
+    yields = []
+    sleep = asyncio.sleep
+
+    async def count_sleep(delay):
+        yields.append(delay)
+        await sleep(delay)
+
+    monkeypatch.setattr(asyncio, 'sleep', count_sleep)
+
+    parsed = run(aio.parse_text(TEST_CONFIG, chunk_lines=5))
+    expected = parse(TEST_CONFIG.splitlines(True))
+
+    assert parsed.sections == expected.sections
+    assert parsed.comments == expected.comments
+    assert parsed.dot_keys == expected.dot_keys
+    assert len(yields) == len(TEST_CONFIG.splitlines()) // 5 + 1
+
+
+def test_aread(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('[types]\nint = 2\n')
+
+    for kwargs in ({}, {'native_parser': True}, {'lazy': True}):
+        config = LocalConfig(path, **kwargs)
+        config.read(TEST_CONFIG)
+
+        assert run(config.aread()) is True
+        assert config._sources_read
+        assert config.types.int == 2
+        assert str(config) == str(_read(path, **kwargs))
+
+        assert run(config.aread(['[new]\nkey = value', path + '-missing'])) is False
+        assert config.new.key == 'value'
+
+
+def _read(path, **kwargs):
+    config = LocalConfig(path, **kwargs)
+    config.read(TEST_CONFIG)
+    return config
+
+
+def test_aread_shared(monkeypatch):
+    reads = []
+    read_source = aio.read_source
+
+    async def count_read_source(source, lazy=False, **kwargs):
+        reads.append(source)
+        return await read_source(source, lazy, **kwargs)
+
+    monkeypatch.setattr('localconfig.manager.read_source', count_read_source)
+
+    config = LocalConfig()
+    config.read(TEST_CONFIG)
+
+    async def read_concurrently():
+        return await asyncio.gather(config.aread(), config.aread(), config.aget_section('types'))
+
+    _, _, section = run(read_concurrently())
+    assert reads[0] == TEST_CONFIG
+    assert len(reads) == len(config._all_sources())
+    assert section.int == 1
+
+
+def test_aget_section():
+    config = LocalConfig(lazy=True)
+    config.read(TEST_CONFIG)
+
+    section = run(config.aget_section('types'))
+    assert 'types' not in config._pending
+    assert 'another-section' in config._pending
+    assert section.float == 2.0
+    assert run(config.aget_section('missing')) is None
+
+
+def test_asave(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+    config = LocalConfig(path, lazy=True)
+    config.read(TEST_CONFIG)
+
+    run(config.asave())
+    assert open(path).read() == str(_read(None))
+    assert set(config._saved_spans) == {'types', 'another-section'}
+
+    config.types.int = 2
+    run(config.asave())
+    assert open(path).read() == str(config)
+    assert config.stats()['saves'] == 2
+
+
+def test_asave_concurrent(tmpdir):
+    path = str(tmpdir.join('config.cfg.gz'))
+    config = LocalConfig(path, concurrent=True)
+    config.read(TEST_CONFIG)
+
+    run(config.asave())
+    assert str(LocalConfig(path)) == str(config)
+
+
+def test_areload(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+
+    for kwargs in ({}, {'native_parser': True}, {'lazy': True}):
+        with open(path, 'w') as fp:
+            fp.write('[web]\nport = 80\n')
+
+        config = LocalConfig(path, **kwargs)
+        assert run(config.areload()) == set()
+        assert config.web.port == 80
+
+        config.add_section('runtime')
+        config.set('runtime', 'key', 1)
+
+        with open(path, 'w') as fp:
+            fp.write('[web]\nport = 8080\nhost = localhost\n')
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+        assert run(config.areload()) == {('web', 'port'), ('web', 'host')}
+        assert config.web.port == 8080
+        assert config.web.host == 'localhost'
+        assert config.runtime.key == 1
+
+
+def test_aread_snapshot(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('[types]\nint = 2\n')
+
+    config = LocalConfig(path, snapshot=True)
+    config.read(TEST_CONFIG)
+    run(config.aread())
+    assert os.path.exists(path + '.snapshot')
+
+    config = LocalConfig(path, snapshot=True)
+    config.read(TEST_CONFIG)
+    run(config.aread())
+    assert config._layers is None
+    assert config.types.int == 2
+
+
+def test_aread_includes(tmpdir, monkeypatch):
+    path = str(tmpdir.join('config.cfg'))
+    first = str(tmpdir.mkdir('include').join('first.cfg'))
+    second = str(tmpdir.join('include', 'second.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('# Main\n[web]\nport = 80\ninclude = include/first.cfg\n')
+    with open(first, 'w') as fp:
+        fp.write('# First\n[web]\nhost = localhost\ninclude = second.cfg\n')
+    with open(second, 'w') as fp:
+        fp.write('# Second\n[web]\nport = 8080\n')
+
+    reads = []
+    read_file = aio.read_file
+
+    def count_read_file(path):
+        reads.append(path)
+        return read_file(path)
+
+    def no_open_source(*args, **kwargs):
+        raise AssertionError('Files are read without blocking the event loop')
+
+    monkeypatch.setattr(aio, 'read_file', count_read_file)
+    monkeypatch.setattr('localconfig.manager.open_source', no_open_source)
+
+    config = LocalConfig(path, includes=True, read_only=True)
+    run(config.aread())
+    assert config.web.port == 8080
+    assert config.web.host == 'localhost'
+    assert reads == [path, first, second]
+    assert not any(parsed.comments for _, parsed, _ in config._parse_cache.values())
+
+    with open(second, 'w') as fp:
+        fp.write('[web]\nport = 443\n')
+    os.utime(second, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    assert run(config.areload()) == {('web', 'port')}
+    assert config.web.port == 443
+    assert reads == [path, first, second, second]
+
+
+def test_areload_unlocked(tmpdir, monkeypatch):
+    path = str(tmpdir.join('config.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('[web]\nport = 80\n')
+
+    config = LocalConfig(path, concurrent=True)
+    assert config.web.port == 80
+
+    with open(path, 'w') as fp:
+        fp.write('[web]\nport = 8080\n')
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    unlocked = []
+    read_source = aio.read_source
+
+    def try_lock():
+        if config._lock.acquire(blocking=False):
+            config._lock.release()
+            return True
+        return False
+
+    async def check_lock(*args, **kwargs):
+        unlocked.append(await aio.run_blocking(try_lock))
+        return await read_source(*args, **kwargs)
+
+    monkeypatch.setattr('localconfig.manager.read_source', check_lock)
+
+    assert run(config.areload()) == {('web', 'port')}
+    assert config.web.port == 8080
+    assert unlocked == [True]
@@ -0,0 +1,56 @@
+from localconfig.cache import LRUCache, NoCache, NOT_CACHED
+from localconfig.manager import LocalConfig
+from test_manager import TEST_CONFIG
+
+
+def test_lru_cache():
+    cache = LRUCache(maxsize=2)
+    cache.set('1', 1)
+    cache.set('2', 2)
+    assert cache.get('1') == 1
+    cache.set('3', 3)
+
+    assert cache.get('2') is NOT_CACHED
+    assert cache.get('3') == 3
+    assert len(cache) == 2
+    assert cache.stats() == {'hits': 2, 'misses': 1, 'evictions': 1, 'size': 2}
+
+    cache.discard('3')
+    assert cache.get('3', None) is None
+    cache.clear()
+    assert not len(cache)
+
+
+def test_no_cache():
+    cache = NoCache()
+    cache.set('1', 1)
+    assert cache.get('1') is NOT_CACHED
+    assert cache.stats() == {'hits': 0, 'misses': 1, 'evictions': 0, 'size': 0}
+
+
+def test_bounded_value_cache():
+    cache = LRUCache(maxsize=10)
+    config = LocalConfig(value_cache=cache)
+    config.read(TEST_CONFIG)
+
+    assert config.types.int == 1
+    assert config.types.int == 1
+    assert cache.stats()['hits'] == 1
+
+    for i in range(100):
+        config.types.timestamp = 'value %d' % i
+        assert config.types.timestamp == 'value %d' % i
+    assert len(cache) <= 2
+
+    assert cache.get('value 99') == 'value 99'
+    config.types.timestamp = 'new value'
+    assert cache.get('value 99') is NOT_CACHED
+
+
+def test_disabled_value_cache():
+    config = LocalConfig(value_cache=NoCache())
+    config.read(TEST_CONFIG)
+
+    assert config.types.int == 1
+    assert config.types.none is None
+    assert config._value_cache.stats()['misses'] == 2
@@ -0,0 +1,70 @@
+import asyncio
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from localconfig.compression import detect_compression, open_source, save_compression
+from localconfig.manager import LocalConfig
+from test_manager import TEST_CONFIG
+
+OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open,
+}
+
+
+@pytest.fixture(params=sorted(OPENERS))
+def compressed(request, tmpdir):
+    path = str(tmpdir.join('config.cfg.%s' % request.param))
+    with OPENERS[request.param](path, 'wt') as fp:
+        fp.write(TEST_CONFIG)
+    return request.param, path
+
+
+def test_detect_compression(compressed, tmpdir):
+    compression, path = compressed
+
+    assert detect_compression(path) == compression
+    assert detect_compression(str(tmpdir.join('no-such-file'))) is None
+    assert save_compression(path) == compression
+    assert save_compression(str(tmpdir.join('new.cfg.xz'))) == 'xz'
+    assert save_compression(str(tmpdir.join('new.cfg'))) is None
+
+    with open_source(path) as fp:
+        assert fp.read() == TEST_CONFIG
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'native_parser': True}, {'lazy': True}, {'parallel': 2},
+                                    {'lazy': True, 'parallel': 2}])
+def test_compressed_source(compressed, kwargs):
+    compression, path = compressed
+
+    config = LocalConfig(path, **kwargs)
+    expected = LocalConfig(**kwargs)
+    expected.read(TEST_CONFIG)
+
+    assert config.as_dict() == expected.as_dict()
+    assert str(config) == str(expected)
+
+
+def test_save_compressed(compressed, tmpdir):
+    compression, path = compressed
+
+    config = LocalConfig(path)
+    config.types.int = 2
+    config.save()
+
+    assert detect_compression(path) == compression
+    assert LocalConfig(path).types.int == 2
+
+    target = str(tmpdir.join('saved.cfg'))
+    config.save(target, compression=compression)
+    assert LocalConfig(target).types.int == 2
+
+    target = str(tmpdir.join('asaved.cfg'))
+    asyncio.run(config.asave(target, compression=compression))
+    assert detect_compression(target) == compression
+    assert str(LocalConfig(target)) == str(config)
@@ -0,0 +1,65 @@
+import pytest
+
+from localconfig.env import scan_environ
+from localconfig.manager import LocalConfig
+from localconfig.schema import Key
+
+CONFIG = '[DEFAULT]\nenv = dev\n\n[Web Server]\nhost = 0.0.0.0\nport = 80\nlog-level = info\n\n[App]\nenv = test\n'
+
+
+@pytest.fixture
+def environ(monkeypatch):
+    monkeypatch.setenv('MYAPP__WEB_SERVER__PORT', '8080')
+    monkeypatch.setenv('MYAPP__WEB_SERVER__LOG_LEVEL', 'debug')
+    monkeypatch.setenv('MYAPP__ENV', 'prod')
+    monkeypatch.setenv('MYAPP__NEW__KEY', '007')
+    monkeypatch.setenv('OTHER__WEB_SERVER__HOST', 'example.com')
+    return monkeypatch
+
+
+def test_scan_environ():
+    environ = {'MYAPP__WEB_SERVER__PORT': '1', 'MYAPP__DEFAULT__A': '2', 'MYAPP__B': '3', 'MYAPP__A__B__C': '4',
+               'MYAPP____B': '5', 'MYAPP__C__': '6', 'MYAPPX__D': '7'}
+    assert scan_environ('MYAPP', environ) == {'web_server': {'port': '1'}, 'DEFAULT': {'a': '2', 'b': '3'}}
+
+
+def test_env_prefix(environ):
+    config = LocalConfig(env_prefix='MYAPP')
+    config.read(CONFIG)
+
+    assert config.web_server.port == 8080
+    assert config.get('Web Server', 'log-level') == 'debug'
+    assert config.web_server.host == '0.0.0.0'
+    assert config.get('Web Server', 'env') == 'prod'
+    assert config.app.env == 'test'
+    assert config.env == 'prod'
+    assert config.get('new', 'key') == 7
+
+    assert dict(iter(config.web_server)) == {'env': 'prod', 'host': '0.0.0.0', 'port': 8080, 'log-level': 'debug'}
+    assert config.section_dict('app') == {'env': 'test'}
+    assert config.as_dict()['Web Server']['port'] == 8080
+    assert config.freeze().web_server.port == 8080
+
+    changes = []
+    config.subscribe('web_server.*', changes.append)
+
+    environ.setenv('MYAPP__WEB_SERVER__PORT', '443')
+    environ.delenv('MYAPP__ENV')
+    assert config.web_server.port == 8080
+    assert config.refresh_env() == {('web_server', 'port'), ('DEFAULT', 'env')}
+    assert config.web_server.port == 443
+    assert config.get('Web Server', 'env') == 'dev'
+    assert changes == [{'web_server.port': (8080, 443), 'web_server.env': ('prod', 'dev')}]
+    assert config.refresh_env() == set()
+
+    assert LocalConfig().refresh_env() == set()
+
+
+@pytest.mark.parametrize('kwargs', [{'lazy': True}, {'concurrent': True}])
+def test_env_prefix_modes(environ, kwargs):
+    config = LocalConfig(env_prefix='MYAPP', schema={'new': {'key': Key(str)}}, **kwargs)
+    config.read(CONFIG)
+
+    assert config.web_server.port == 8080
+    assert config.app.env == 'test'
+    assert config.get('new', 'key') == '007'
@@ -0,0 +1,77 @@
+import pytest
+
+from localconfig.manager import LocalConfig
+from test_manager import TEST_CONFIG
+
+
+@pytest.fixture
+def frozen():
+    config = LocalConfig()
+    config.read([TEST_CONFIG, '[DEFAULT]\nenv = prod\n[Web Server]\nport = 8080\n1st = first'])
+    return config.freeze()
+
+
+def test_freeze(frozen):
+    assert frozen.types.int == 1
+    assert frozen.types.int_hex == 0xabcd
+    assert frozen.types.float == 2.0
+    assert frozen.types.true is True
+    assert frozen.types.none is None
+    assert frozen.types.string_value == 'Value'
+    assert frozen.types.env == 'prod'
+    assert frozen.web_server.port == 8080
+    assert frozen.env == 'prod'
+
+    assert frozen.no_section is None
+    assert frozen.types.no_key is None
+
+    assert list(frozen) == ['types', 'another-section', 'Web Server']
+    assert dict(list(frozen.web_server)) == {'env': 'prod', 'port': 8080, '1st': 'first'}
+
+
+def test_get(frozen):
+    assert frozen.get('Web Server', 'port') == 8080
+    assert frozen.get('web_server', '1st') == 'first'
+    assert frozen.get('types', 'string-value') == 'Value'
+    assert frozen.get('types', 'none', 'default') is None
+    assert frozen.get('types', 'no_key', 'default') == 'default'
+    assert frozen.get('no_section', 'port', 'default') == 'default'
+    assert frozen.get('env', 'port', 'default') == 'default'
+
+
+@pytest.mark.parametrize('content', ['[b_c]\nk = 1\n[b-c]\nk = 2\n[a]\nx_y = 3\nx-y = 4\n',
+                                     '[b-c]\nk = 2\n[b_c]\nk = 1\n[a]\nx-y = 4\nx_y = 3\n'])
+def test_get_same_dot_name(content):
+    config = LocalConfig()
+    config.read(content)
+    frozen = config.freeze()
+
+    assert frozen.get('b-c', 'k') == 2
+    assert frozen.get('a', 'x-y') == 4
+    assert frozen.get('a', 'X-Y') == 4
+    assert frozen.get('a', 'x_y') == 3
+    assert frozen.a.x_y == 3
+
+
+def test_read_only(frozen):
+    with pytest.raises(AttributeError):
+        frozen.types.int = 2
+    with pytest.raises(AttributeError):
+        frozen.types.new_key = 2
+    with pytest.raises(AttributeError):
+        frozen.types = None
+    with pytest.raises(AttributeError):
+        del frozen.types.int
+
+    assert frozen.types.int == 1
+    assert not hasattr(frozen.types, '__dict__')
+
+
+def test_freeze_is_a_snapshot():
+    config = LocalConfig()
+    config.read(TEST_CONFIG)
+    frozen = config.freeze()
+
+    config.types.int = 2
+    assert frozen.types.int == 1
+    assert config.freeze().types.int == 2
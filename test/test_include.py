@@ -0,0 +1,105 @@
+import os
+
+import pytest
+
+from localconfig import manager
+from localconfig.include import expand_source, is_pattern, pop_includes
+from localconfig.manager import LocalConfig
+from localconfig.parser import parse
+from test_layers import write
+
+
+@pytest.fixture
+def conf_d(tmpdir):
+    conf_d = tmpdir.mkdir('conf.d')
+    write(str(conf_d.join('10-web.ini')), '[web]\nhost = 0.0.0.0\nport = 80\n')
+    write(str(conf_d.join('20-web.ini')), '[web]\nport = 8080\n')
+    write(str(conf_d.join('.hidden.ini')), '[web]\nport = 1\n')
+    write(str(conf_d.join('30-web.ini~')), '[web]\nport = 2\n')
+    conf_d.mkdir('sub')
+    return str(conf_d)
+
+
+def test_expand_source(conf_d):
+    names = ['10-web.ini', '20-web.ini']
+    assert expand_source(conf_d) == [os.path.join(conf_d, name) for name in names]
+    assert expand_source(os.path.join(conf_d, '*')) == [os.path.join(conf_d, name) for name in names + ['30-web.ini~']]
+    assert expand_source('[web]\nport = 80') == ['[web]\nport = 80']
+    assert is_pattern('/etc/app/*.ini')
+    assert not is_pattern('[web]\nport = 80')
+
+
+def test_file_with_glob_characters(tmpdir):
+    path = str(tmpdir.join('cfg[1].ini'))
+    write(path, '[web]\nport = 80\n')
+    assert not is_pattern(path)
+
+    config = LocalConfig()
+    assert config.read(path)
+    assert config.web.port == 80
+
+
+def test_pop_includes():
+    parsed = parse(['[DEFAULT]\n', '# Other configs\n', 'include = a.ini\n', '  ~/b.ini\n', '[web]\n', 'port = 80\n'])
+
+    assert pop_includes(parsed, '/etc/app/app.ini') == ['/etc/app/a.ini', os.path.expanduser('~/b.ini')]
+    assert parsed.sections == {'DEFAULT': {}, 'web': {'port': '80'}}
+    assert ('DEFAULT', 'include') not in parsed.comments
+    assert ('default', 'include') not in parsed.dot_keys
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'native_parser': True}, {'lazy': True}, {'parallel': 2}])
+def test_directory_source(conf_d, kwargs):
+    config = LocalConfig(**kwargs)
+    config.read([conf_d, os.path.join(conf_d, '1*.ini')])
+
+    assert config.web.host == '0.0.0.0'
+    assert config.web.port == 80
+
+    write(os.path.join(conf_d, '15-web.ini'), '[web]\nhost = localhost\n')
+    assert config.reload() == {('web', 'host')}
+    assert config.web.host == 'localhost'
+
+
+def test_parse_cache(conf_d, monkeypatch):
+    parsed = []
+
+    def counting_parse(fp, comments=True):
+        parsed.append(fp.name)
+        return parse(fp, comments=comments)
+
+    monkeypatch.setattr(manager, 'parse', counting_parse)
+
+    config = LocalConfig(includes=True)
+    config.read(conf_d)
+    assert config.web.port == 8080
+    assert len(parsed) == 2
+
+    write(os.path.join(conf_d, '20-web.ini'), '[web]\nport = 443\n')
+    assert config.reload() == {('web', 'port')}
+    assert config.web.port == 443
+    assert parsed[2:] == [os.path.join(conf_d, '20-web.ini')]
+
+
+def test_includes(tmpdir, conf_d):
+    main = str(tmpdir.join('main.ini'))
+    write(main, '[DEFAULT]\ninclude = conf.d\n    other.ini\n\n[web]\nhost = example.com\n')
+    write(str(tmpdir.join('other.ini')), '[web]\ninclude = other.ini\nport = 443\n')
+
+    with pytest.raises(ValueError) as e:
+        LocalConfig(main, includes=True).get('web', 'port')
+    assert str(e.value) == 'Include cycle: %s -> %s -> %s' % (main, tmpdir.join('other.ini'), tmpdir.join('other.ini'))
+
+    write(str(tmpdir.join('other.ini')), '[web]\nport = 443\n\n[new]\nkey = 1\n')
+    config = LocalConfig(main, includes=True)
+    assert config.web.host == '0.0.0.0'
+    assert config.web.port == 443
+    assert config.web.include is None
+    assert config.new.key == 1
+
+    write(str(tmpdir.join('other.ini')), '[web]\nport = 444\n')
+    assert config.reload() == {('web', 'port'), ('new', 'key')}
+    assert config.web.port == 444
+
+    with pytest.raises(ValueError):
+        LocalConfig(includes=True, lazy=True)
@@ -0,0 +1,123 @@
+from configparser import DuplicateOptionError, DuplicateSectionError, ExtendedInterpolation
+import os
+import tempfile
+
+import pytest
+
+from localconfig.index import index_file, index_text, read_span
+from localconfig.manager import LocalConfig
+from test_manager import TEST_CONFIG
+
+
+@pytest.fixture
+def config_file():
+    fd, path = tempfile.mkstemp(suffix='.cfg')
+    with os.fdopen(fd, 'w') as fp:
+        fp.write(TEST_CONFIG)
+    yield path
+    os.unlink(path)
+
+
+def test_index_text():
+    spans = index_text(TEST_CONFIG)
+
+    assert [span.section for span in spans] == ['types', 'another-section']
+    assert read_span(spans[0]).startswith('# Section used for type testing\n[types]')
+    assert read_span(spans[0]).endswith('string-value = Value\n\n')
+    assert read_span(spans[1]).startswith('# A commented out value\n# comment = value\n\n\n####')
+    assert ''.join(read_span(span) for span in spans) == TEST_CONFIG
+
+    assert [(span.section, span.start, span.end) for span in index_text('# Just a comment')] == [(None, 0, 16)]
+
+
+def test_index_file(config_file):
+    spans = index_file(config_file)
+
+    assert [span.section for span in spans] == ['types', 'another-section']
+    assert [read_span(span) for span in spans] == [read_span(span) for span in index_text(TEST_CONFIG)]
+
+
+def test_lazy(config_file):
+    config = LocalConfig(lazy=True)
+    config.read([config_file, '[DEFAULT]\nenv = prod\n[another-section]\nmulti_line = overridden\n[new]\nkey = 1'])
+
+    assert list(config) == ['types', 'another-section', 'new']
+    assert config.env == 'prod'
+    assert set(config._pending) == {'types', 'another-section', 'new'}
+
+    assert config.types.int == 1
+    assert set(config._pending) == {'another-section', 'new'}
+
+    assert config.another_section.multi_line == 'overridden'
+    assert list(config.items('new')) == [('env', 'prod'), ('key', 1)]
+    assert not config._pending
+
+
+def test_lazy_file_changed(config_file):
+    with open(config_file, 'w') as fp:
+        fp.write('[a]\nx = 1\n\n[b]\ny = 2\n')
+
+    config = LocalConfig(lazy=True)
+    config.read(config_file)
+    assert config.get('a', 'x') == 1
+
+    with open(config_file, 'w') as fp:
+        fp.write('# A new comment at the top\n[a]\nx = 1\n\n[b]\ny = 3\n')
+
+    assert config.get('b', 'y') == 3
+    assert not config._pending
+
+
+def test_lazy_parity(config_file):
+    eager = LocalConfig()
+    eager.read([config_file, '[types]\nint = 2'])
+
+    config = LocalConfig(lazy=True)
+    config.read([config_file, '[types]\nint = 2'])
+    assert config.types.int == 2
+    config.read('[another-section]\nkey = value')
+    eager.read('[another-section]\nkey = value')
+
+    assert str(config) == str(eager)
+    assert config._comments == eager._comments
+    assert config._dot_keys == eager._dot_keys
+
+
+def test_lazy_set():
+    config = LocalConfig(lazy=True)
+    config.read(TEST_CONFIG)
+
+    config.types.int = 2
+    assert config.types.int == 2
+    assert config.types.float == 2.0
+
+
+def test_lazy_extended_interpolation():
+    config = LocalConfig(interpolation=ExtendedInterpolation(), lazy=True)
+    config.read('[server]\nhost = 0.0.0.0\n[client]\nserver_host = ${server:host}')
+
+    assert config.client.server_host == '0.0.0.0'
+
+
+def test_lazy_duplicates(config_file):
+    with pytest.raises(DuplicateSectionError) as e:
+        index_text('[a]\nx=1\n[b]\ny=2\n[a]\nx=3\n')
+    assert e.value.lineno == 5
+
+    with open(config_file, 'a') as fp:
+        fp.write('\n[types]\nint = 2\n')
+    with pytest.raises(DuplicateSectionError) as e:
+        LocalConfig(config_file, lazy=True).types
+    assert e.value.source == config_file
+
+    assert [span.section for span in index_text('[DEFAULT]\nx=1\n[DEFAULT]\ny=2\n')] == ['DEFAULT', 'DEFAULT']
+
+    config = LocalConfig(lazy=True)
+    config.read('[a]\nx=1\n[b]\ny=2\n[a]\nx=3\n')
+    with pytest.raises(DuplicateSectionError):
+        config.b
+
+    config = LocalConfig(lazy=True)
+    config.read('[a]\nx=1\nx=2\n')
+    with pytest.raises(DuplicateOptionError):
+        config.a.x
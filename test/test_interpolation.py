@@ -0,0 +1,96 @@
+from configparser import ConfigParser, InterpolationDepthError
+
+import pytest
+
+from localconfig.interpolation import CachingInterpolation
+from localconfig.manager import LocalConfig
+
+CONFIG = """
+[DEFAULT]
+root = /srv
+
+[app]
+home = %(root)s/app
+logs = %(home)s/logs
+access_log = %(logs)s/access.log
+name = app
+percent = 100%%
+"""
+
+
+@pytest.fixture
+def config(monkeypatch):
+    config = LocalConfig(interpolation=True)
+    config.read(CONFIG)
+    return config
+
+
+def count_interpolations(monkeypatch):
+    interpolated = []
+    interpolate_some = CachingInterpolation._interpolate_some
+
+    def track_interpolate_some(self, parser, option, accum, rest, section, map, depth):
+        if depth == 1:
+            interpolated.append((section, option))
+        return interpolate_some(self, parser, option, accum, rest, section, map, depth)
+
+    monkeypatch.setattr(CachingInterpolation, '_interpolate_some', track_interpolate_some)
+    return interpolated
+
+
+def test_cache(config, monkeypatch):
+    interpolated = count_interpolations(monkeypatch)
+
+    assert config.app.access_log == '/srv/app/logs/access.log'
+    assert config.app.access_log == '/srv/app/logs/access.log'
+    assert config.app.percent == '100%'
+    assert interpolated == [('app', 'access_log'), ('app', 'percent')]
+
+    assert config.app.logs == '/srv/app/logs'
+    assert config.app.name == 'app'
+    del interpolated[:]
+
+    config.app.home = '/opt/app'
+    assert config.app.access_log == '/opt/app/logs/access.log'
+    assert config.app.logs == '/opt/app/logs'
+    assert config.app.name == 'app'
+    assert interpolated == [('app', 'access_log'), ('app', 'logs')]
+    del interpolated[:]
+
+    config.root = '/data'
+    config.app.logs = '%(root)s/logs'
+    assert config.app.access_log == '/data/logs/access.log'
+    assert config.app.name == 'app'
+    assert interpolated == [('app', 'access_log')]
+
+    assert dict(list(config.app))['logs'] == '/data/logs'
+
+
+def test_vars_not_cached():
+    parser = ConfigParser(interpolation=CachingInterpolation())
+    parser.read_string(CONFIG)
+
+    assert parser.get('app', 'logs') == '/srv/app/logs'
+    assert parser.get('app', 'logs', vars={'home': '/tmp'}) == '/tmp/logs'
+    assert parser.get('app', 'logs') == '/srv/app/logs'
+
+
+def test_cycles():
+    config = LocalConfig(interpolation=True)
+    config.read('[app]\na = %(b)s\nb = %(c)s\nc = %(a)s\n')
+    with pytest.raises(InterpolationDepthError):
+        config.app
+
+    config = LocalConfig(interpolation=True)
+    config.read(CONFIG)
+    with pytest.raises(InterpolationDepthError):
+        config.app.home = '%(access_log)s'
+    with pytest.raises(InterpolationDepthError):
+        config.root = '%(home)s'
+    assert config.app.home == '/srv/app'
+
+    config = LocalConfig(interpolation=True, lazy=True)
+    config.read(CONFIG + '\n[cycle]\na = %(a)s')
+    assert config.app.home == '/srv/app'
+    with pytest.raises(InterpolationDepthError):
+        config.cycle.a
@@ -0,0 +1,214 @@
+import os
+import time
+
+import pytest
+
+from localconfig.layers import Layer, parse_file, topmost_layer
+from localconfig.manager import LocalConfig
+from localconfig.parser import ParsedSource
+from test_manager import TEST_CONFIG
+
+
+def write(path, content):
+    """ Write content and make sure the mtime changes even on file systems with coarse timestamps """
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+    with open(path, 'w') as fp:
+        fp.write(content)
+    os.utime(path, ns=(time.time_ns(), max(time.time_ns(), mtime + 1000000)))
+
+
+@pytest.fixture
+def paths(tmpdir):
+    first = str(tmpdir.join('first.cfg'))
+    last = str(tmpdir.join('last.cfg'))
+    write(first, '[web]\nhost = 0.0.0.0\nport = 80\n\n# Timeout in seconds\ntimeout = 10\n\n[old]\nkey = 1\n')
+    return first, last
+
+
+@pytest.mark.parametrize('native_parser', [True, False])
+def test_reload(paths, native_parser):
+    first, last = paths
+    config = LocalConfig(last, native_parser=native_parser)
+    config.read([TEST_CONFIG, first, '[web]\nport = 8080'])
+
+    assert config.web.port == 8080
+    assert config.reload() == set()
+
+    write(first, '[web]\nhost = localhost\nport = 81\n\n# New timeout\ntimeout = 20\n\n[new]\nkey = 2\n')
+    assert config.reload() == {('web', 'host'), ('web', 'timeout'), ('old', 'key'), ('new', 'key')}
+
+    assert config.web.host == 'localhost'
+    assert config.web.port == 8080
+    assert config.web.timeout == 20
+    assert config.old is None or config.old.key is None
+    assert config.new.key == 2
+    assert config.types.int == 1
+    assert config._comments[('web', 'timeout')] == '# New timeout'
+
+    write(last, '[web]\nport = 443\n')
+    assert config.reload() == {('web', 'port')}
+    assert config.web.port == 443
+
+    os.unlink(last)
+    assert config.reload() == {('web', 'port')}
+    assert config.web.port == 8080
+
+    expected = LocalConfig(last, native_parser=native_parser)
+    expected.read([TEST_CONFIG, first, '[web]\nport = 8080'])
+    assert list(config) == list(expected)
+    assert str(config) == str(expected)
+    assert config._dot_keys == expected._dot_keys
+
+
+def test_reload_lazy(paths):
+    first, last = paths
+    config = LocalConfig(last, lazy=True)
+    config.read(first)
+    assert config.web.port == 80
+
+    write(first, '[web]\nport = 81\n')
+    assert config.reload() == {('web', 'port'), ('web', 'host'), ('web', 'timeout')}
+    assert list(config) == ['web']
+    assert config.web.port == 81
+
+
+def test_parse_file(paths):
+    first, last = paths
+
+    assert parse_file(first).sections['web']['port'] == '80'
+    assert parse_file(last).sections == {}
+
+
+def test_topmost_layer():
+    first = ParsedSource()
+    first.sections = {'a': {'b': '1', 'c': '2'}}
+    second = ParsedSource()
+    second.sections = {'a': {'b': '3'}}
+    layers = [Layer(None, False, first), Layer(None, False, second)]
+
+    assert topmost_layer(layers, 'a', 'b') is layers[1]
+    assert topmost_layer(layers, 'a', 'c') is layers[0]
+    assert topmost_layer(layers, 'a') is layers[1]
+    assert topmost_layer(layers, 'a', 'd') is None
+
+
+def test_overlay(paths):
+    first, last = paths
+    write(last, '[web]\nport = 443\n')
+    config = LocalConfig(last, overlay=True)
+    config.read([first, '[DEFAULT]\nenv = dev'])
+
+    assert config.source_of('web', 'port') == last
+    assert config.source_of('web', 'host') == first
+    assert config.source_of('web', 'env') == '<string>'
+    assert config.source_of('web', 'no_such_key') is None
+    assert config.source_of('no_such_section', 'key') is None
+
+    changes = []
+    config.subscribe('web.*', changes.append)
+
+    tenant = config.add_layer('[web]\nhost = tenant.example.com\ntimeout = 30', name='tenant')
+    assert repr(tenant) == '<Layer tenant>'
+    assert config.web.host == 'tenant.example.com'
+    assert config.web.timeout == 30
+    assert config.web.port == 443
+    assert config.source_of('web', 'host') == 'tenant'
+    assert changes == [{'web.host': ('0.0.0.0', 'tenant.example.com'), 'web.timeout': (10, 30)}]
+
+    assert config.remove_layer('tenant') == {('web', 'host'), ('web', 'timeout')}
+    assert config.web.host == '0.0.0.0'
+    assert config.web.timeout == 10
+    assert config.source_of('web', 'host') == first
+
+    assert config.remove_layer(last) == {('web', 'port')}
+    assert config.web.port == 80
+    assert last not in config._file_signatures
+
+    with pytest.raises(ValueError):
+        config.remove_layer('tenant')
+
+    config.web.port = 8080
+    assert config.source_of('web', 'port') is None
+
+    tenant = config.add_layer('[new]\nkey = 1')
+    assert config.new.key == 1
+    assert config.remove_layer(tenant) == {('new', 'key')}
+    assert list(config) == ['web', 'old']
+
+    with pytest.raises(ValueError):
+        LocalConfig(last, overlay=True, lazy=True)
+
+    with pytest.raises(ValueError):
+        LocalConfig(last).add_layer('[web]\nport = 1')
+
+
+def test_layer_changes_only_its_sections(paths):
+    first, last = paths
+    config = LocalConfig(last, overlay=True, interpolation=True)
+    config.read([first, '[db]\nhost = db.example.com\nurl = %(host)s:5432'])
+    config.save()
+    assert set(config._saved_spans) == {'web', 'old', 'db'}
+
+    tenant = config.add_layer('[db]\nhost = tenant.example.com', name='tenant')
+    assert config.db.url == 'tenant.example.com:5432'
+    assert set(config._saved_spans) == {'web', 'old'}
+
+    config.remove_layer(tenant)
+    assert config.db.url == 'db.example.com:5432'
+
+    tenant = config.add_layer('[db]\nport = 5432', name='tenant')
+    config.save()
+    config.remove_layer(tenant)
+    assert config.db.port is None
+    assert set(config._saved_spans) == {'web', 'old'}
+
+
+@pytest.mark.parametrize('native_parser', [True, False])
+def test_reload_broken(paths, native_parser):
+    first, last = paths
+    config = LocalConfig(last, native_parser=native_parser)
+    config.read(first)
+    assert config.web.port == 80
+
+    write(first, '[web]\nport = 81\nbroken line\n')
+    with pytest.raises(Exception):
+        config.reload()
+
+    assert config.web.port == 80
+    assert config.get('old', 'key') == 1
+    assert config._comments[('web', 'timeout')] == '# Timeout in seconds'
+
+    write(first, '[web]\nport = 81\n')
+    assert config.reload() == {('web', 'port'), ('web', 'host'), ('web', 'timeout'), ('old', 'key')}
+    assert config.web.port == 81
+
+
+@pytest.mark.parametrize('engine', ['default', 'native_parser', 'lazy', 'includes', 'snapshot'])
+def test_reload_set_keys(paths, engine):
+    first, last = paths
+    kwargs = {'snapshot': last + '.snapshot'} if engine == 'snapshot' else {engine: True} if engine != 'default' else {}
+    config = LocalConfig(last, **kwargs)
+    config.read(first)
+
+    config.set('web', 'port', 99)
+    config.set('web', 'timeout', 30)
+    config.add_section('runtime', comment='Added at runtime')
+    config.set('runtime', 'key', 'value', comment='Set at runtime')
+
+    write(last, '[web]\nhost = localhost\n')
+    assert config.reload() == {('web', 'host')}
+    assert config.web.host == 'localhost'
+    assert config.web.port == 99
+    assert config.web.timeout == 30
+    assert config.runtime.key == 'value'
+    assert config._comments['runtime'] == '# Added at runtime'
+    assert config._comments[('runtime', 'key')] == '# Set at runtime'
+
+    write(first, '[web]\nhost = 0.0.0.0\nport = 80\ntimeout = 20\n')
+    changed = {('web', 'port'), ('web', 'timeout')}
+    if engine != 'lazy':  # Sections that were not loaded are not reported in lazy mode
+        changed.add(('old', 'key'))
+    assert config.reload() == changed
+    assert config.web.port == 80
+    assert config.web.timeout == 20
+    assert config.runtime.key == 'value'
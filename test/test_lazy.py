@@ -0,0 +1,43 @@
+import os
+import subprocess
+import sys
+
+import localconfig
+from localconfig.lazy import LazyConfig
+from localconfig.manager import LocalConfig
+from test_manager import TEST_CONFIG
+
+#: Max microseconds for `import localconfig`
+IMPORT_TIME_BUDGET = 20000
+
+
+def test_lazy_config():
+    config = LazyConfig(last_source='/nonexistent')
+    assert config._lazy_instance is None
+
+    config.read(TEST_CONFIG)
+    assert isinstance(config._lazy_instance, LocalConfig)
+    assert config.types.int == 1
+    assert list(config) == ['types', 'another-section']
+
+    config.env = 'prod'
+    assert config.get('DEFAULT', 'env') == 'prod'
+    assert 'env = prod' in str(config)
+
+
+def test_module():
+    assert isinstance(localconfig.config, LazyConfig)
+    assert localconfig.LocalConfig is LocalConfig
+
+
+def test_import_time():
+    code = 'import sys, localconfig; print(" ".join(sorted(m for m in sys.modules if m.startswith("localconfig"))))'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, universal_newlines=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    assert result.stdout.split() == ['localconfig', 'localconfig.lazy']
+
+    import_times = dict((line.split('|')[2].strip(), int(line.split('|')[1])) for line in result.stderr.splitlines()
+                        if line.startswith('import time:') and line.count('|') == 2 and 'cumulative' not in line)
+    assert import_times['localconfig'] < IMPORT_TIME_BUDGET
@@ -3,6 +3,7 @@ from io import StringIO
 import os
 import re
 import tempfile
+import threading
 
 import pytest
 
@@ -197,6 +198,66 @@ def test_write(config):
             os.unlink(temp_file)
 
 
+def test_save_dirty_sections(tmpdir, monkeypatch):
+    path = str(tmpdir.join('config.cfg'))
+    config = LocalConfig(path)
+    config.read(TEST_CONFIG)
+    config.save()
+
+    serialized = []
+    iter_section_lines = LocalConfig._iter_section_lines
+
+    def track_iter_section_lines(self, section, proxy, as_template=False):
+        serialized.append(section)
+        return iter_section_lines(self, section, proxy, as_template)
+
+    monkeypatch.setattr(LocalConfig, '_iter_section_lines', track_iter_section_lines)
+
+    def assert_saved(sections, as_template=False):
+        del serialized[:]
+        config.save(as_template=as_template)
+        assert serialized == sections
+        assert open(path).read() == '\n'.join(config.iter_lines(as_template))
+
+    config.types.int = 5
+    assert_saved(['types'])
+
+    config.set('another-section', 'key', 'välue', comment='New key')
+    assert_saved(['another-section'])
+
+    config.add_section('new')
+    config.new.key = 1
+    assert_saved(['new'])
+
+    config.default_key = 'default'
+    assert_saved(['DEFAULT', 'types', 'another-section', 'new'])
+
+    assert_saved(['DEFAULT', 'types', 'another-section', 'new'], as_template=True)
+    assert_saved([], as_template=True)
+
+    with open(path, 'a') as fp:
+        fp.write('# Changed by someone else')
+    assert_saved(['DEFAULT', 'types', 'another-section', 'new'], as_template=True)
+
+
+def test_write_streaming(config, monkeypatch):
+    monkeypatch.setattr('localconfig.sources.WRITE_CHUNK_SIZE', 20)
+    writes = []
+
+    class File(object):
+        def write(self, text):
+            writes.append(text)
+            return len(text)
+
+    config.write(File())
+    assert ''.join(writes) == TEST_CONFIG
+    assert max(len(text) for text in writes) < 100
+
+    del writes[:]
+    config.write(File(), as_template=True)
+    assert ''.join(writes) == re.sub('^([^#\n])', '# \\1', TEST_CONFIG, flags=re.MULTILINE)
+
+
 def test_output_style():
     config = LocalConfig(kv_sep=': ', indent_spaces=2, compact_form=True)
     config.read(TEST_CONFIG)
@@ -285,3 +346,139 @@ server_port=${server:port}
 """)
     assert config.client.server_host == '0.0.0.0'
     assert config.client.server_port == 5000
+
+
+def test_section_dict(config):
+    config.default_key = 'default'
+
+    assert config.section_dict('types') == dict(list(config.types))
+    assert config.section_dict('another_section')['default_key'] == 'default'
+    assert config.section_dict('DEFAULT') == {'default_key': 'default'}
+    assert config.section_dict('missing') is None
+
+
+def test_get_many(config):
+    assert config.get_many([('types', 'int'), ('types', 'string_value'), ('another_section', 'multi_line'),
+                            ('types', 'missing'), ('missing', 'key')], default=0) == {
+        ('types', 'int'): 1,
+        ('types', 'string_value'): 'Value',
+        ('another_section', 'multi_line'): config.another_section.multi_line,
+        ('types', 'missing'): 0,
+        ('missing', 'key'): 0}
+
+
+def test_as_dict(config):
+    assert config.as_dict() == {'types': dict(list(config.types)),
+                                'another-section': dict(list(config.another_section))}
+
+    config = LocalConfig(interpolation=True, lazy=True)
+    config.read('[DEFAULT]\nhost = localhost\n[server]\nurl = http://%(host)s:%(port)s\nport = 80')
+    assert config.as_dict() == {'DEFAULT': {'host': 'localhost'},
+                                'server': {'host': 'localhost', 'url': 'http://localhost:80', 'port': 80}}
+    assert config.get_many([('server', 'url')]) == {('server', 'url'): 'http://localhost:80'}
+
+
+def test_concurrent(monkeypatch):
+    config = LocalConfig(concurrent=True, lazy=True)
+    config.read(TEST_CONFIG)
+
+    reads = []
+    read = config._read
+    monkeypatch.setattr(config, '_read', lambda source: reads.append(source) or read(source))
+
+    barrier = threading.Barrier(64)
+    values = []
+    errors = []
+
+    def reader():
+        try:
+            barrier.wait()
+            seen = [config.types.int for _ in range(200)]
+            assert seen == sorted(seen)
+            assert config.another_section.multi_line.startswith('This line spans')
+            values.extend(seen)
+        except Exception as e:
+            errors.append(e)
+
+    def writer():
+        barrier.wait()
+        for value in range(2, 100):
+            config.types.int = value
+
+    threads = [threading.Thread(target=reader) for _ in range(63)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert reads.count(TEST_CONFIG) == 1
+    assert set(values) <= set(range(1, 100))
+    assert config.types.int == 99
+    assert config.get('types', 'int') == 99
+
+    state = config.freeze()
+    config.types.float = 3.0
+    assert state.types.float == 2.0
+    assert state.another_section is config.freeze().another_section
+    assert config.section_dict('types')['float'] == 3.0
+
+
+@pytest.mark.parametrize('content', ['[b_c]\nk = 1\n[b-c]\nk = 2\n[a]\nx_y = 3\nx-y = 4\n',
+                                     '[b-c]\nk = 2\n[b_c]\nk = 1\n[a]\nx-y = 4\nx_y = 3\n'])
+def test_concurrent_same_dot_name(content):
+    config = LocalConfig(concurrent=True)
+    config.read(content)
+
+    expected = LocalConfig()
+    expected.read(content)
+
+    keys = [('b-c', 'k'), ('b_c', 'k'), ('a', 'x-y'), ('a', 'x_y'), ('a', 'X-Y'), ('B-C', 'k')]
+    assert config.get('b-c', 'k') == 2
+    assert config.get('a', 'x-y') == 4
+    assert [config.get(*key) for key in keys] == [expected.get(*key) for key in keys]
+    assert config.get_many(keys) == expected.get_many(keys)
+    for section in ['b-c', 'b_c']:
+        assert config.section_dict(section) == expected.section_dict(section)
+        assert list(config.items(section)) == list(expected.items(section))
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'native_parser': True}, {'lazy': True}])
+def test_read_only(kwargs):
+    config = LocalConfig(read_only=True, **kwargs)
+    config.read(TEST_CONFIG)
+
+    expected = LocalConfig(**kwargs)
+    expected.read(TEST_CONFIG)
+
+    assert config.as_dict() == expected.as_dict()
+    assert config.types.int == 1
+    assert config.another_section.multi_line == expected.another_section.multi_line
+    assert config._dot_keys.keys() == expected._dot_keys.keys()
+    assert config._comments == {}
+    assert '#' not in str(config)
+
+    with pytest.raises(AttributeError):
+        config.types.int = 2
+    with pytest.raises(AttributeError):
+        config.add_section('new')
+    with pytest.raises(AttributeError):
+        config.save(os.path.join(tempfile.gettempdir(), 'read_only.cfg'))
+    assert config.types.int == 1
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'native_parser': True}])
+def test_read_only_sources(kwargs):
+    sources = ['[DEFAULT]\nkey = 1', '[Web Server]\nport = 80', '[Web Server]\nhost = localhost\nport = 81',
+               '[DEFAULT]\nenv = dev\n\n[db]']
+    config = LocalConfig(read_only=True, **kwargs)
+    config.read(sources)
+
+    expected = LocalConfig(**kwargs)
+    expected.read(sources)
+
+    assert config._dot_keys == expected._dot_keys
+    assert config.default.key == 1
+    assert config.web_server.host == 'localhost'
+    assert config.web_server.port == 81
+    assert config.get('db', 'env') == 'dev'
@@ -0,0 +1,94 @@
+from configparser import ParsingError
+import os
+import time
+
+import pytest
+
+from localconfig.manager import LocalConfig
+from localconfig.parallel import read_sources
+from localconfig.sources import read_file, read_source
+from test_manager import TEST_CONFIG
+
+
+@pytest.fixture
+def sources(tmpdir):
+    sources = [TEST_CONFIG]
+    for i in range(10):
+        path = str(tmpdir.join('%s.cfg' % i))
+        with open(path, 'w') as fp:
+            fp.write('[types]\nint = %s\n[fragment-%s]\nkey = %s\n' % (i, i, i))
+        sources.append(path)
+    sources.append(str(tmpdir.join('missing.cfg')))
+    return sources
+
+
+@pytest.mark.parametrize('processes', [None, 2])
+def test_read_sources(sources, processes):
+    results = read_sources(sources, threads=4, processes=processes)
+
+    assert len(results) == len(sources)
+    for source, (signature, parsed) in zip(sources, results):
+        expected_signature, expected = read_source(source)
+        assert signature == expected_signature
+        if expected is None:
+            assert parsed is None
+        else:
+            assert parsed.sections == expected.sections
+            assert parsed.comments == expected.comments
+
+
+def test_read_sources_error():
+    with pytest.raises(ParsingError):
+        read_sources(['[section]\nkey = value\nbad line'])
+
+
+@pytest.mark.parametrize('kwargs', [{'parallel': True}, {'parallel': 3, 'lazy': True}, {'parse_processes': 2},
+                                    {'parallel': True, 'native_parser': True}])
+def test_parallel_config(sources, kwargs):
+    expected = LocalConfig(sources[-2])
+    expected.read(sources[:-2] + sources[-1:])
+
+    config = LocalConfig(sources[-2], **kwargs)
+    config.read(sources[:-2] + sources[-1:])
+
+    assert config.types.int == 9
+    assert config.fragment_0.key == 0
+    assert str(config) == str(expected)
+
+
+def test_parallel_includes(tmpdir, monkeypatch):
+    path = str(tmpdir.join('config.cfg'))
+    first = str(tmpdir.mkdir('include').join('first.cfg'))
+    second = str(tmpdir.join('include', 'second.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('# Main\n[web]\nport = 80\ninclude = include/first.cfg\n')
+    with open(first, 'w') as fp:
+        fp.write('# First\n[web]\nhost = localhost\ninclude = second.cfg\n')
+    with open(second, 'w') as fp:
+        fp.write('# Second\n[web]\nport = 8080\n')
+
+    reads = []
+
+    def count_read_file(path):
+        reads.append(path)
+        return read_file(path)
+
+    def no_open_source(*args, **kwargs):
+        raise AssertionError('Files are read in parallel')
+
+    monkeypatch.setattr('localconfig.sources.read_file', count_read_file)
+    monkeypatch.setattr('localconfig.manager.open_source', no_open_source)
+
+    config = LocalConfig(path, includes=True, parallel=2, read_only=True)
+    assert config.web.port == 8080
+    assert config.web.host == 'localhost'
+    assert reads == [path, first, second]
+    assert not any(parsed.comments for _, parsed, _ in config._parse_cache.values())
+
+    with open(second, 'w') as fp:
+        fp.write('[web]\nport = 443\n')
+    os.utime(second, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    assert config.reload() == {('web', 'port')}
+    assert config.web.port == 443
+    assert reads == [path, first, second, second]
@@ -0,0 +1,117 @@
+from configparser import DuplicateOptionError, DuplicateSectionError, MissingSectionHeaderError, ParsingError
+from io import StringIO
+
+import pytest
+
+from localconfig.manager import LocalConfig
+from localconfig.parser import parse, SourceParser
+from test_manager import TEST_CONFIG, COMPACT_TEST_CONFIG
+
+
+EDGE_CONFIG = """\
+; Semicolon comment
+[DEFAULT]
+env = prod
+
+[Mixed Case]
+Some.Key = Value
+colon: separated
+   # Indented comment
+multi =
+    line 1
+
+    line 2
+    # Comment inside value
+    line 3
+
+
+spaced key = value
+
+[empty]
+# Comment at the end"""
+
+
+def assert_parity(content):
+    config = LocalConfig()
+    config.read(content)
+    native = LocalConfig(native_parser=True)
+    native.read(content)
+
+    assert list(config) == list(native)
+    for section in list(config) + ['DEFAULT']:
+        assert list(config.items(section)) == list(native.items(section))
+    assert config._comments == native._comments
+    assert config._dot_keys == native._dot_keys
+    assert str(config) == str(native)
+
+
+@pytest.mark.parametrize('content', [TEST_CONFIG, COMPACT_TEST_CONFIG, EDGE_CONFIG])
+def test_parity(content):
+    assert_parity(content)
+
+
+def test_parity_multiple_sources():
+    config = LocalConfig()
+    native = LocalConfig(native_parser=True)
+    for c in config, native:
+        c.read([TEST_CONFIG, EDGE_CONFIG, '[types]\nint = 2\n[new]\nkey = value'])
+
+    assert list(config) == list(native)
+    assert config.types.int == native.types.int == 2
+    assert config._comments == native._comments
+    assert config._dot_keys == native._dot_keys
+    assert str(config) == str(native)
+
+
+@pytest.mark.parametrize('kwargs', [{'native_parser': True}, {'lazy': True}, {'overlay': True}])
+def test_parity_percent_value(kwargs):
+    content = '[discount]\nrate = 100%\nname = half\nlabel = %(name)s off'
+    config = LocalConfig(interpolation=True)
+    config.read(content)
+    native = LocalConfig(interpolation=True, **kwargs)
+    native.read(content)
+
+    for c in config, native:
+        assert c.discount.rate is None
+        assert c.discount.name == 'half'
+        assert c.discount.label == 'half off'
+
+
+def test_parse():
+    parsed = parse(StringIO(EDGE_CONFIG))
+
+    assert parsed.sections == {
+        'DEFAULT': {'env': 'prod'},
+        'Mixed Case': {'some.key': 'Value', 'colon': 'separated', 'multi': '\nline 1\n\nline 2\nline 3',
+                       'spaced key': 'value'},
+        'empty': {}}
+    assert parsed.dot_keys[('mixed_case', 'some_key')] == ('Mixed Case', 'Some.Key')
+    assert parsed.comments['LAST_COMMENT_KEY'] == '# Comment at the end\n'
+    assert parsed.lines == 20
+
+
+def test_feed_in_chunks():
+    lines = TEST_CONFIG.splitlines(True)
+    parser = SourceParser()
+    for i in range(0, len(lines), 3):
+        parser.feed(lines[i:i + 3])
+    parsed = parser.close()
+
+    expected = parse(StringIO(TEST_CONFIG))
+    assert parsed.sections == expected.sections
+    assert parsed.comments == expected.comments
+    assert parsed.dot_keys == expected.dot_keys
+
+
+@pytest.mark.parametrize('content, error', [
+    ('key = value', MissingSectionHeaderError),
+    ('[a]\nkey = 1\n[a]', DuplicateSectionError),
+    ('[a]\nkey = 1\nKEY = 2', DuplicateOptionError),
+    ('[a]\nno delimiter', ParsingError),
+])
+def test_errors(content, error):
+    for native_parser in (False, True):
+        config = LocalConfig(native_parser=native_parser)
+        config.read(content)
+        with pytest.raises(error):
+            str(config)
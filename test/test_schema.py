@@ -0,0 +1,93 @@
+import pytest
+
+from localconfig.manager import LocalConfig
+from localconfig.schema import Key, Schema, SchemaError, to_bool, to_int
+from test_manager import TEST_CONFIG
+
+SCHEMA = {
+    'web_server': {
+        'host': str,
+        'port': Key(int, default=80, min=1, max=65535),
+        'debug': Key(bool, default=False),
+        'log-level': Key(str, default='info', choices=['debug', 'info']),
+    },
+}
+
+
+def test_schema():
+    config = LocalConfig(schema=SCHEMA)
+    config.read('[Web Server]\nhost = 007\nport = 008080\nlog-level = debug')
+
+    assert config.web_server.host == '007'
+    assert config.get('Web Server', 'port') == 8080
+    assert config.web_server.debug is False
+    assert config.web_server.log_level == 'debug'
+    assert config.section_dict('web_server') == {'host': '007', 'port': 8080, 'debug': False, 'log-level': 'debug'}
+    assert list(config.items('Web Server')) == [('host', '007'), ('port', 8080), ('log-level', 'debug'),
+                                                ('debug', False)]
+    assert config.as_dict() == {'Web Server': {'host': '007', 'port': 8080, 'debug': False, 'log-level': 'debug'}}
+    assert config.freeze().web_server.host == '007'
+
+    config.web_server.port = 443
+    assert config.web_server.port == 443
+
+    with pytest.raises(SchemaError) as e:
+        config.web_server.port = '80a'
+    assert e.value.errors == ["Web Server.port: invalid literal for int() with base 0: '80a'"]
+    assert config.web_server.port == 443
+
+
+def test_schema_errors():
+    schema = Schema(dict(SCHEMA, types={'int': Key(int, required=True)}))
+    config = LocalConfig(schema=schema)
+    config.read(['[Web Server]\nport = 80a\ndebug = maybe\nlog-level = trace', TEST_CONFIG])
+
+    with pytest.raises(SchemaError) as e:
+        config.get('types', 'int')
+
+    assert e.value.errors == ["Web Server.port: invalid literal for int() with base 0: '80a'",
+                              "Web Server.debug: 'maybe' is not a bool",
+                              "Web Server.log-level: 'trace' is not one of 'debug', 'info'"]
+
+    config = LocalConfig(schema=schema)
+    config.read('[web_server]\nport = 0')
+    with pytest.raises(SchemaError) as e:
+        config.web_server
+    assert e.value.errors == ['web_server.port: 0 is less than 1', 'types.int: required key is not set']
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'lazy': True}, {'concurrent': True}])
+def test_schema_modes(kwargs):
+    config = LocalConfig(schema=SCHEMA, **kwargs)
+    config.read([TEST_CONFIG, '[web_server]\nport = 0x50'])
+
+    assert config.web_server.port == 80
+    assert config.web_server.debug is False
+    assert config.types.int == 1
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'concurrent': True}])
+def test_schema_default_dot_key(kwargs):
+    config = LocalConfig(schema={'web_server': {'max-conn': Key(int, default=5)}}, **kwargs)
+    config.read('[Web Server]\nhost = localhost')
+
+    assert config.web_server.max_conn == 5
+    assert config.get('web_server', 'max-conn') == 5
+    assert config.get_many([('web_server', 'max_conn')]) == {('web_server', 'max_conn'): 5}
+    assert Schema(SCHEMA).key_name('Web Server', 'log_level') == 'log-level'
+    assert Schema(SCHEMA).key_name('web_server', 'missing') is None
+
+
+def test_converters():
+    assert to_int('007') == 7
+    assert to_int('0x1F') == 31
+    assert to_bool(' On') is True
+    assert to_bool('0') is False
+
+    with pytest.raises(ValueError):
+        to_bool('none')
+
+    schema = Schema({'a': {'b': float, 'c': lambda value: value.split(',')}})
+    assert schema.apply('a', {'b': '1', 'c': 'x,y'}) == {'b': 1.0, 'c': ['x', 'y']}
+    assert schema.convert('A', 'd', 'value') == 'value'
+    assert schema.table('no_such_section') is None
@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from localconfig.manager import LocalConfig
+from localconfig.shared import SharedConfig, SharedPublisher, compile_config
+from test_manager import TEST_CONFIG
+
+
+@pytest.fixture
+def config():
+    config = LocalConfig()
+    config.read([TEST_CONFIG, '[DEFAULT]\nenv = prod\n[Web Server]\nport = 8080\nratio = 1.5'])
+    return config
+
+
+@pytest.fixture
+def publisher():
+    publisher = SharedPublisher('localconfig_test_%d' % os.getpid())
+    yield publisher
+    publisher.close()
+
+
+def test_shared_config(config, publisher):
+    assert publisher.publish(config) == 1
+
+    shared = SharedConfig(publisher.name)
+    try:
+        assert shared.types.int == 1
+        assert shared.types.float == 2.0
+        assert shared.types.true is True
+        assert shared.types.none is None
+        assert shared.types.string_value == 'Value'
+        assert shared.web_server.port == 8080
+        assert shared.get('Web Server', 'ratio') == 1.5
+        assert shared.get('types', 'no_key', 'default') == 'default'
+        assert shared.env == 'prod'
+        assert shared.no_section is None
+
+        assert list(shared) == list(config)
+        assert dict(list(shared.web_server)) == dict(list(config.web_server))
+        assert shared.section_dict('types') == config.section_dict('types')
+        assert shared.as_dict() == config.as_dict()
+
+        with pytest.raises(AttributeError):
+            shared.types.int = 2
+
+        config.types.int = 2
+        assert publisher.publish(config) == 2
+        assert shared.types.int == 2
+        assert shared.generation == 2
+    finally:
+        shared.close()
+
+
+@pytest.mark.parametrize('content', ['[b_c]\nk = 1\n[b-c]\nk = 2\n[a]\nx_y = 3\nx-y = 4\n',
+                                     '[b-c]\nk = 2\n[b_c]\nk = 1\n[a]\nx-y = 4\nx_y = 3\n'])
+def test_same_dot_name(publisher, content):
+    config = LocalConfig()
+    config.read(content)
+    publisher.publish(config)
+
+    shared = SharedConfig(publisher.name)
+    try:
+        assert shared.get('b-c', 'k') == 2
+        assert shared.get('b_c', 'k') == 1
+        assert shared.get('a', 'x-y') == 4
+        assert shared.get('a', 'X-Y') == 4
+        assert shared.get('a', 'x_y') == 3
+        assert shared.b_c.k == 1
+        assert shared.section_dict('b-c') == {'k': 2}
+    finally:
+        shared.close()
+
+
+def _read_port(name, queue):
+    queue.put(SharedConfig(name).web_server.port)
+
+
+def test_worker_process(config, publisher):
+    publisher.publish(config)
+
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    worker = context.Process(target=_read_port, args=(publisher.name, queue))
+    worker.start()
+    worker.join()
+
+    assert queue.get(timeout=1) == 8080
+
+    # Worker exiting does not remove the segment
+    shared = SharedConfig(publisher.name)
+    assert shared.web_server.port == 8080
+    shared.close()
+
+
+def test_compile_config():
+    content = compile_config({'DEFAULT': {'key': 'value'}, 'section': {'key': 'value', 'int': 1}})
+    assert content.count(b'value') == 1
+
+
+def test_not_published():
+    with pytest.raises(FileNotFoundError):
+        SharedConfig('localconfig_test_missing')
+
+
+def test_threads(config, publisher):
+    publisher.publish(config)
+    shared = SharedConfig(publisher.name)
+    errors = []
+    done = threading.Event()
+
+    def read():
+        try:
+            while not done.is_set():
+                assert shared.web_server.port == 8080
+                assert dict(list(shared.items('types')))['int'] in (1, 2)
+                assert len(shared.as_dict()) == len(config.as_dict())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        for i in range(100):
+            config.types.int = i % 2 + 1
+            publisher.publish(config)
+    finally:
+        done.set()
+        for thread in threads:
+            thread.join()
+        shared.close()
+
+    assert errors == []
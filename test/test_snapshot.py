@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from localconfig.manager import LocalConfig
+from localconfig.snapshot import load_snapshot, save_snapshot, source_key
+from test_manager import TEST_CONFIG
+
+
+@pytest.fixture
+def last_source(tmpdir):
+    path = str(tmpdir.join('program'))
+    with open(path, 'w') as fp:
+        fp.write('[types]\nint = 2\n')
+    return path
+
+
+def test_snapshot(last_source, monkeypatch):
+    config = LocalConfig(last_source, snapshot=True)
+    config.read(TEST_CONFIG)
+    assert config.types.int == 2
+    assert os.path.exists(last_source + '.snapshot')
+
+    def fail_read(self, source):
+        raise AssertionError('Source should not be parsed when snapshot is up to date')
+
+    with monkeypatch.context() as m:
+        m.setattr(LocalConfig, '_read', fail_read)
+
+        snapshot_config = LocalConfig(last_source, snapshot=True)
+        snapshot_config.read(TEST_CONFIG)
+        assert snapshot_config.types.int == 2
+        assert snapshot_config.types.float == 2.0
+        assert str(snapshot_config) == str(config)
+        assert snapshot_config._comments == config._comments
+        assert snapshot_config._dot_keys == config._dot_keys
+
+    with open(last_source, 'a') as fp:
+        fp.write('float = 3.0\n')
+
+    config = LocalConfig(last_source, snapshot=True)
+    config.read(TEST_CONFIG)
+    assert config.types.float == 3.0
+
+
+def test_snapshot_sources_changed(last_source, tmpdir):
+    config = LocalConfig(last_source, snapshot=str(tmpdir))
+    config.read(TEST_CONFIG)
+    assert config.types.int == 2
+    assert os.path.exists(str(tmpdir.join('program.snapshot')))
+
+    config = LocalConfig(last_source, snapshot=str(tmpdir))
+    config.read([TEST_CONFIG, '[types]\nstring-value = changed'])
+    assert config.types.string_value == 'changed'
+
+
+def test_snapshot_read_only(last_source):
+    with open(last_source, 'w') as fp:
+        fp.write('# Important comment\n[types]\nint = 2\n')
+
+    config = LocalConfig(last_source, snapshot=True, read_only=True)
+    assert config.types.int == 2
+    assert not config._comments
+
+    config = LocalConfig(last_source, snapshot=True)
+    config.types.int = 3
+    config.save()
+
+    with open(last_source) as fp:
+        assert fp.read() == '# Important comment\n[types]\n\nint = 3\n'
+
+
+def test_snapshot_includes(last_source, tmpdir):
+    include = str(tmpdir.join('include.cfg'))
+    conf_d = tmpdir.mkdir('conf.d')
+    with open(last_source, 'w') as fp:
+        fp.write('[types]\nint = 2\ninclude = include.cfg\n    conf.d\n')
+    with open(include, 'w') as fp:
+        fp.write('[types]\nint = 3\n')
+
+    config = LocalConfig(last_source, snapshot=True, includes=True)
+    assert config.types.int == 3
+    assert os.path.exists(last_source + '.snapshot')
+
+    config = LocalConfig(last_source, snapshot=True, includes=True)
+    assert config.types.int == 3
+    assert config._layers is None
+
+    with open(include, 'w') as fp:
+        fp.write('[types]\nint = 4\n')
+    os.utime(include, ns=(os.stat(include).st_mtime_ns + 10 ** 9,) * 2)
+
+    assert config.reload() == {('types', 'int')}
+    assert config.types.int == 4
+
+    config = LocalConfig(last_source, snapshot=True, includes=True)
+    assert config.types.int == 4
+
+    conf_d.join('10.cfg').write('[types]\nint = 5\n')
+    config = LocalConfig(last_source, snapshot=True, includes=True)
+    assert config.types.int == 5
+
+
+def test_snapshot_requires_location(monkeypatch):
+    monkeypatch.setattr('sys.argv', [''])
+    with pytest.raises(ValueError):
+        LocalConfig(snapshot=True)
+
+
+def test_save_load_snapshot(tmpdir):
+    path = str(tmpdir.join('snapshot'))
+    key = (source_key(TEST_CONFIG, False), source_key(path, True))
+
+    save_snapshot(path, key, sections={'a': {'b': 'c'}})
+
+    assert load_snapshot(path, key)['sections'] == {'a': {'b': 'c'}}
+    assert load_snapshot(path, key[:1]) is None
+    assert load_snapshot(path + '-missing', key) is None
@@ -0,0 +1,51 @@
+import os
+
+import pytest
+
+from localconfig.sources import read_source, write_file
+from test_manager import TEST_CONFIG
+
+
+def test_read_source(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+    with open(path, 'w') as fp:
+        fp.write(TEST_CONFIG)
+
+    signature, parsed = read_source(path)
+    assert signature[:2] == ('file', path)
+    assert parsed.sections == read_source(TEST_CONFIG)[1].sections
+
+    spans, parsed_spans = read_source(path, lazy=True)[1]
+    assert [span.section for span in spans] == ['types', 'another-section']
+    assert parsed_spans == {}
+
+    assert read_source(path + '-missing')[1] is None
+
+
+def test_write_file(tmpdir, monkeypatch):
+    path = str(tmpdir.join('config.cfg'))
+    umask = os.umask(0o027)
+    try:
+        write_file(path, 'content')
+    finally:
+        os.umask(umask)
+    assert open(path).read() == 'content'
+    assert os.stat(path).st_mode & 0o777 == 0o640
+
+    os.chmod(path, 0o600)
+    link = str(tmpdir.join('link.cfg'))
+    os.symlink(path, link)
+
+    write_file(link, 'new content')
+    assert os.path.islink(link)
+    assert open(path).read() == 'new content'
+    assert os.stat(path).st_mode & 0o777 == 0o600
+
+    def fail_replace(src, dst):
+        raise OSError('Disk is full')
+
+    monkeypatch.setattr(os, 'replace', fail_replace)
+    with pytest.raises(OSError):
+        write_file(path, 'partial')
+    assert open(path).read() == 'new content'
+    assert sorted(os.listdir(str(tmpdir))) == ['config.cfg', 'link.cfg']
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import pathlib
+import time
+
+from localconfig.manager import LocalConfig
+from localconfig.stats import source_size, Stats, STRING_SOURCE
+from test_manager import TEST_CONFIG
+
+
+def test_stats(tmpdir):
+    path = str(tmpdir.join('program'))
+    with open(path, 'w') as fp:
+        fp.write('# Comment\n[types]\nint = 2\n')
+
+    events = []
+    config = LocalConfig(path, stats_hook=lambda event, stats: events.append((event, stats)))
+    config.read(TEST_CONFIG)
+    assert config.stats()['sources'] == []
+
+    assert config.types.int == 2
+    assert config.types.int == 2
+
+    stats = config.stats()
+    assert [source['source'] for source in stats['sources']] == [STRING_SOURCE, path]
+    assert [source['bytes'] for source in stats['sources']] == [len(TEST_CONFIG), 26]
+    assert [source['lines'] for source in stats['sources']] == [TEST_CONFIG.count('\n'), 3]
+    assert stats['bytes_read'] == len(TEST_CONFIG) + 26
+    assert stats['lines_parsed'] == TEST_CONFIG.count('\n') + 3
+    assert stats['read_time'] >= sum(source['time'] for source in stats['sources'])
+    assert stats['dot_keys'] == len(config._dot_keys)
+    assert stats['comments'] == len(config._comments)
+    assert stats['value_cache']['hits'] == 1
+    assert stats['saves'] == 0
+
+    config.save()
+    stats = config.stats()
+    assert stats['saves'] == 1
+    assert stats['save_time'] > 0
+
+    assert [event for event, _ in events] == ['read', 'save']
+    assert events[0][1]['sources'] == stats['sources']
+    assert events[1][1]['file'] == path
+
+
+def test_stats_reload(tmpdir):
+    path = str(tmpdir.join('program'))
+    config = LocalConfig(path)
+    config.read([TEST_CONFIG])
+    assert config.types.int == 1
+
+    for i in range(3):
+        with open(path, 'w') as fp:
+            fp.write('[types]\nint = %d\n' % i)
+        os.utime(path, ns=(time.time_ns() + i * 10 ** 9,) * 2)
+        assert config.reload() == {('types', 'int')}
+        asyncio.run(config.aread('[new]\nkey = %d' % i))
+
+        assert [source['source'] for source in config.stats()['sources']] == (
+            [STRING_SOURCE, path] + [STRING_SOURCE] * (i + 1))
+
+
+def test_stats_native_and_lazy():
+    config = LocalConfig(native_parser=True)
+    config.read(TEST_CONFIG)
+    config._read_sources()
+    assert config.stats()['lines_parsed'] == TEST_CONFIG.count('\n')
+
+    config = LocalConfig(lazy=True)
+    config.read(TEST_CONFIG)
+    config._read_sources()
+    lines = config.stats()['lines_parsed']
+
+    config.types.int
+    assert config.stats()['lines_parsed'] > lines
+
+
+def test_stats_aread():
+    config = LocalConfig()
+    asyncio.run(config.aread(TEST_CONFIG))
+
+    stats = config.stats()
+    assert stats['lines_parsed'] == TEST_CONFIG.count('\n')
+    assert stats['sources'][0] == dict(stats['sources'][0], source=STRING_SOURCE, lines=TEST_CONFIG.count('\n'))
+
+
+def test_source_size(tmpdir):
+    assert source_size('[types]\nname = é') == 17
+    assert source_size('missing', ('file', 'missing', None)) == 0
+    assert source_size('program', ('file', 'program', 0, 10, 1)) == 10
+
+    stats = Stats()
+    stats.add_source('[types]\nint = 1', 0.5, 15, 1)
+    stats.add_save(0.25)
+    assert stats.as_dict() == {'read_time': 0.0, 'sources': [{'source': STRING_SOURCE, 'time': 0.5, 'bytes': 15,
+                                                              'lines': 1}],
+                               'bytes_read': 15, 'lines_parsed': 0, 'saves': 1, 'save_time': 0.25}
+
+
+def test_path_source(tmpdir):
+    path = tmpdir.join('program.cfg')
+    path.write('[types]\nint = 1\n')
+
+    config = LocalConfig(str(tmpdir.join('program')), snapshot=True)
+    config.read(pathlib.Path(str(path)))
+
+    assert config.types.int == 1
+    assert config.stats()['sources'][0]['source'] == pathlib.Path(str(path))
@@ -0,0 +1,88 @@
+import os
+import time
+
+from localconfig.manager import LocalConfig
+from localconfig.subscriptions import Subscriptions
+from test_manager import TEST_CONFIG
+
+
+def test_subscriptions():
+    subscriptions = Subscriptions()
+    calls = []
+
+    port = subscriptions.subscribe('Web Server.port', lambda changes: calls.append(('port', changes)))
+    subscriptions.subscribe('web_server.*', lambda changes: calls.append(('web_server', changes)))
+    subscriptions.subscribe('*.host', lambda changes: calls.append(('host', changes)))
+    subscriptions.subscribe('*', lambda changes: calls.append(('all', changes)))
+    assert len(subscriptions) == 4
+
+    subscriptions.dispatch({('web_server', 'port'): (80, 8080), ('db', 'host'): ('a', 'b')})
+    assert sorted(calls) == sorted([
+        ('port', {'web_server.port': (80, 8080)}),
+        ('web_server', {'web_server.port': (80, 8080)}),
+        ('host', {'db.host': ('a', 'b')}),
+        ('all', {'web_server.port': (80, 8080), 'db.host': ('a', 'b')})])
+
+    subscriptions.unsubscribe(port)
+    subscriptions.unsubscribe(port)
+    assert len(subscriptions) == 3
+
+
+def test_subscribe():
+    config = LocalConfig()
+    config.read(TEST_CONFIG)
+    calls = []
+    subscription = config.subscribe('types.int', calls.append)
+    config.subscribe('another_section', lambda changes: calls.append(('section', changes)))
+
+    config.types.int = 2
+    config.types.int = 2
+    config.types.float = 3.0
+    assert calls == [{'types.int': (1, 2)}]
+
+    with config.batch():
+        config.types.int = 3
+        config.types.int = 4
+        config.another_section.new_key = 'value'
+        assert len(calls) == 1
+    assert calls[1:] == [{'types.int': (2, 4)}, ('section', {'another_section.new_key': (None, 'value')})]
+
+    config.unsubscribe(subscription)
+    config.types.int = 5
+    assert len(calls) == 3
+
+
+def test_subscribe_default_section():
+    config = LocalConfig()
+    config.read('[DEFAULT]\nenv = dev\n[web]\nport = 80\n[db]\nenv = test')
+    calls = []
+    config.subscribe('*.env', calls.append)
+
+    config.env = 'prod'
+    assert calls == [{'default.env': ('dev', 'prod'), 'web.env': ('dev', 'prod')}]
+
+    config.add_section('cache')
+    assert calls[1:] == [{'cache.env': (None, 'prod')}]
+
+
+def test_subscribe_reload(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('[web]\nport = 80\nhost = localhost\n')
+
+    for native_parser in (True, False):
+        config = LocalConfig(path, native_parser=native_parser)
+        calls = []
+        config.subscribe('web.*', calls.append)
+        assert config.web.port == 80
+
+        with open(path + '.tmp', 'w') as fp:
+            fp.write('[web]\nport = 8080\nhost = localhost\ndebug = on\n')
+        os.replace(path + '.tmp', path)
+        os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+        config.reload()
+        assert calls == [{'web.port': (80, 8080), 'web.debug': (None, True)}]
+
+        with open(path, 'w') as fp:
+            fp.write('[web]\nport = 80\nhost = localhost\n')
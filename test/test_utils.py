@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from localconfig.utils import is_bool, is_float, is_int, is_int_base_n, is_none, to_bool, to_dot_key, typed_value
+
+
+def guess_typed_value(value):
+    """ The exception based type guessing that :func:`typed_value` replaces """
+    if is_int(value):
+        return int(value)
+    elif is_int_base_n(value):
+        return int(value, 0)
+    elif is_float(value):
+        return float(value)
+    elif is_bool(value):
+        return to_bool(value)
+    elif is_none(value):
+        return None
+    return value
+
+
+VALUES = [
+    '1', '-1', '+1', ' 1 ', '1\n', '007', '0', '00', '1_000', '1__000', '_1', '1_', '0_7',
+    '0b11', '0B11', '0o77', '0O77', '0xabcd', '0XABCD', '-0x1', '0x_1', '0x', '0b2', '0o8', '0xg', '08',
+    '2.0', '.5', '5.', '-.5', '1e5', '1E-5', '5.e3', '1_0.5', '1e1_0', '1_e5', 'inf', '-Infinity', 'nan', '+NaN',
+    'infinit', '1.2.3', '1e', 'e1', '.', '',
+    'True', 'false', 'YES', 'no', 'On', 'off', 'None', 'none', ' true', 'nope',
+    'Value', 'This line spans multiple lines\nand more', '1\n2', '0.0.0.0:5000',
+    '١٢', '١.٥', ' 1 ', 'é', '１',
+    '0x١', '-0X_١f', ' 0o٧ ', '0o٩', '0b١٠', '0b٢', '0x\u3000', '0x١g',
+]
+
+
+@pytest.mark.parametrize('value', VALUES)
+def test_typed_value(value):
+    expected = guess_typed_value(value)
+    actual = typed_value(value)
+
+    assert type(actual) is type(expected)
+    assert actual == expected or (actual != actual and expected != expected)  # nan
+
+
+def test_typed_value_fuzz():
+    chars = '0123456789_.+-eExXoObBaAfF infINFnaNtrueyso\n١\u3000\xa0\x1f²'
+    rng = random.Random(0)
+
+    for _ in range(20000):
+        value = ''.join(rng.choice(chars) for _ in range(rng.randint(0, 6)))
+        expected = guess_typed_value(value)
+        actual = typed_value(value)
+        assert type(actual) is type(expected), value
+        assert actual == expected or (actual != actual and expected != expected), value
+
+
+def test_to_dot_key():
+    assert to_dot_key('Web Server') == 'web_server'
+    assert to_dot_key('Web Server', 'Some.Key') == ('web_server', 'some_key')
@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+
+import pytest
+
+from localconfig.manager import LocalConfig
+from localconfig.watch import Inotify, Watcher
+
+
+@pytest.fixture
+def path(tmpdir):
+    path = str(tmpdir.join('config.cfg'))
+    with open(path, 'w') as fp:
+        fp.write('[web]\nport = 80\n')
+    return path
+
+
+def replace(path, content):
+    """ Atomically replace the file as a config push would """
+    with open(path + '.tmp', 'w') as fp:
+        fp.write(content)
+    os.replace(path + '.tmp', path)
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watch(path, monkeypatch, use_inotify):
+    if use_inotify:
+        try:
+            Inotify().close()
+        except OSError:
+            pytest.skip('inotify is not available')
+    else:
+        def no_inotify():
+            raise OSError('inotify is not available')
+        monkeypatch.setattr('localconfig.watch.Inotify', no_inotify)
+
+    config = LocalConfig(path, native_parser=True)
+    assert config.web.port == 80
+
+    changed = threading.Event()
+    changes = []
+
+    def callback(keys):
+        changes.append(keys)
+        changed.set()
+
+    watcher = config.watch(interval=0.05, callback=callback)
+    try:
+        assert watcher.uses_inotify is use_inotify
+
+        time.sleep(0.05)
+        replace(path, '[web]\nport = 8080\n')
+
+        assert changed.wait(5)
+        assert changes == [{('web', 'port')}]
+        assert config.web.port == 8080
+    finally:
+        watcher.stop(5)
+
+    assert not watcher.is_alive()
+
+
+def test_check(path):
+    config = LocalConfig(path, native_parser=True)
+    assert config.web.port == 80
+
+    changes = []
+    watcher = Watcher(config, callback=changes.append)
+    watcher.check()
+    assert changes == []
+
+    replace(path, '[web]\nport = 8080\nhost = localhost\n')
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+    watcher.check()
+    assert changes == [{('web', 'port'), ('web', 'host')}]
+
+
+def test_watch_broken(path, monkeypatch):
+    def no_inotify():
+        raise OSError('inotify is not available')
+    monkeypatch.setattr('localconfig.watch.Inotify', no_inotify)
+
+    config = LocalConfig(path)
+    assert config.web.port == 80
+
+    changed = threading.Event()
+    failed = threading.Event()
+    errors = []
+
+    def error_callback(e):
+        errors.append(e)
+        failed.set()
+
+    watcher = config.watch(interval=0.05, callback=lambda keys: changed.set(), error_callback=error_callback)
+    try:
+        replace(path, '[web]\nport = 8080\nbroken line\n')
+        assert failed.wait(5)
+        assert watcher.is_alive()
+        assert config.web.port == 80
+
+        replace(path, '[web]\nport = 8080\n')
+        assert changed.wait(5)
+        assert config.web.port == 8080
+    finally:
+        watcher.stop(5)
+
+
+@pytest.mark.parametrize('pattern', ['', '*.ini'])
+def test_watch_directory(tmpdir, pattern):
+    try:
+        Inotify().close()
+    except OSError:
+        pytest.skip('inotify is not available')
+
+    conf_d = tmpdir.mkdir('conf.d')
+    replace(str(conf_d.join('10.ini')), '[web]\nport = 80\n')
+
+    config = LocalConfig(str(tmpdir.join('config.cfg')), native_parser=True)
+    config.read(os.path.join(str(conf_d), pattern))
+    assert config.web.port == 80
+
+    changed = threading.Event()
+    watcher = config.watch(interval=0.5, callback=lambda keys: changed.set())
+    try:
+        assert watcher.uses_inotify
+
+        replace(str(conf_d.join('20.ini')), '[web]\nport = 8080\n')
+        assert changed.wait(5)
+        assert config.web.port == 8080
+    finally:
+        watcher.stop(5)
+
+
+def test_watch_readers(path):
+    config = LocalConfig(path)
+    assert config.web.port == 80
+
+    changed = threading.Event()
+    watcher = config.watch(interval=0.01, callback=lambda keys: changed.set())
+    assert config._concurrent
+
+    stopped = threading.Event()
+    errors = []
+
+    def read():
+        while not stopped.is_set():
+            try:
+                assert config.web.port in (80, 8080)
+                assert dict(config.items('web'))
+            except Exception as e:
+                errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+
+    try:
+        for port in (8080, 80) * 5:
+            changed.clear()
+            replace(path, '[web]\nport = %d\n' % port)
+            assert changed.wait(5)
+    finally:
+        stopped.set()
+        for reader in readers:
+            reader.join(5)
+        watcher.stop(5)
+
+    assert not errors
+    assert config.web.port == 80
+
+
+def test_watch_new_sources(tmpdir):
+    try:
+        Inotify().close()
+    except OSError:
+        pytest.skip('inotify is not available')
+
+    path = str(tmpdir.join('config.cfg'))
+    include = str(tmpdir.mkdir('include').join('web.cfg'))
+    replace(path, '[web]\nport = 80\n')
+    replace(include, '[web]\nport = 8080\n')
+
+    config = LocalConfig(path, includes=True)
+    assert config.web.port == 80
+
+    changes = []
+    changed = threading.Event()
+
+    def callback(keys):
+        changes.append(keys)
+        changed.set()
+
+    watcher = config.watch(interval=0.05, callback=callback)
+    try:
+        assert watcher.uses_inotify
+
+        replace(path, '[web]\nport = 80\ninclude = %s\n' % include)
+        assert changed.wait(5)
+        assert config.web.port == 8080
+
+        changed.clear()
+        replace(include, '[web]\nport = 443\n')
+        assert changed.wait(5)
+        assert config.web.port == 443
+        assert watcher.uses_inotify
+    finally:
+        watcher.stop(5)